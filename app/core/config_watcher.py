@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+from utils.config_compiler import CONFIG_FILES, ConfigError, compile_config, compile_sources
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher:
+    """
+    Watches the config files from a background thread and recompiles them
+    when they change. A successfully compiled bundle is left in a one-slot
+    mailbox that the brain loop takes between ticks with `take_pending()`,
+    so the swap itself happens on the loop thread. `current_version` is
+    the version the loop has taken, so a change back to it cancels an
+    intermediate bundle that is still waiting.
+    """
+
+    def __init__(self, current_version, paths=None, poll_interval=1.0, on_error=None, on_unchanged=None):
+        self.paths = paths or CONFIG_FILES
+        self.poll_interval = poll_interval
+        self.on_error = on_error
+        self.on_unchanged = on_unchanged
+        self.current_version = current_version
+        self._pending = None
+        self._submitted = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._stamps = self._read_stamps()
+        self.thread = None
+
+    def _read_stamps(self):
+        stamps = {}
+        for name, path in self.paths.items():
+            try:
+                stat = os.stat(path)
+                stamps[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(f"[ConfigWatcher] Watching {list(self.paths.values())}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def submit(self, documents):
+        """
+        Compile config documents received at runtime (name -> YAML/JSON text),
+        using the files on disk for any document not given.
+        """
+        with self._lock:
+            self._submitted = documents
+        self._wake.set()
+
+    def take_pending(self):
+        """
+        Return (bundle, compile_seconds, source) of a newer compiled config,
+        or None. Called by the loop, which applies what it takes.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is not None:
+                self.current_version = pending[0].version
+        return pending
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+
+            with self._lock:
+                submitted, self._submitted = self._submitted, None
+            if submitted is not None:
+                self._compile(submitted, "mqtt")
+                continue
+
+            stamps = self._read_stamps()
+            if stamps != self._stamps:
+                changed = [name for name in stamps if stamps[name] != self._stamps.get(name)]
+                self._stamps = stamps
+                self._compile(None, "files:" + ",".join(changed))
+
+    def _compile(self, documents, source):
+        started = time.perf_counter()
+        try:
+            if documents is None:
+                bundle = compile_config(self.paths)
+            else:
+                sources = {}
+                for name, path in self.paths.items():
+                    if name in documents:
+                        content = documents[name]
+                        sources[name] = content.encode("utf-8") if isinstance(content, str) else content
+                    else:
+                        with open(path, "rb") as f:
+                            sources[name] = f.read()
+                bundle, _ = compile_sources(sources)
+        except (ConfigError, OSError) as e:
+            logger.error(f"[ConfigWatcher] Rejected config change ({source}): {e}")
+            if self.on_error:
+                self.on_error(str(e), source)
+            return
+
+        duration = time.perf_counter() - started
+        with self._lock:
+            unchanged = bundle.version == self.current_version
+            # Back to the running config: an intermediate bundle not taken yet no longer applies
+            self._pending = None if unchanged else (bundle, duration, source)
+        if unchanged:
+            if self.on_unchanged and source == "mqtt":
+                self.on_unchanged(bundle.version, source)
+            return
+        logger.info(f"[ConfigWatcher] Compiled config {bundle.version[:12]} ({source}) in {duration * 1000:.1f} ms")
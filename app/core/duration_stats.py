@@ -0,0 +1,135 @@
+import bisect
+import math
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _log_buckets(minimum=0.5, maximum=3600.0, growth=1.15):
+    """Bucket upper bounds growing geometrically, so percentiles have ~7% relative error."""
+    bounds = []
+    bound = minimum
+    while bound < maximum:
+        bounds.append(round(bound, 4))
+        bound *= growth
+    bounds.append(maximum)
+    return tuple(bounds)
+
+
+# Shared by every histogram; durations of a few seconds up to an hour
+DURATION_BUCKETS = _log_buckets()
+
+
+class StreamingStats:
+    """
+    Constant-memory running statistics of one duration stream: Welford
+    mean/variance plus a fixed-bucket histogram for approximate percentiles.
+    """
+    __slots__ = ("count", "mean", "_m2", "minimum", "maximum", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._buckets = [0] * (len(DURATION_BUCKETS) + 1)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self._buckets[bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100), interpolated inside the bucket."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = DURATION_BUCKETS[index - 1] if index > 0 else 0.0
+                upper = DURATION_BUCKETS[index] if index < len(DURATION_BUCKETS) else self.maximum
+                fraction = (rank - seen) / bucket_count
+                value = lower + (upper - lower) * fraction
+                # Never report outside the observed range
+                return min(max(value, self.minimum), self.maximum)
+            seen += bucket_count
+        return self.maximum
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "stddev": round(self.stddev, 2),
+            "p50": round(self.percentile(50), 2),
+            "p90": round(self.percentile(90), 2),
+            "p99": round(self.percentile(99), 2),
+        }
+
+
+class DurationTracker:
+    """Duration statistics per subtask id and per product, with queue ETA forecasting."""
+
+    def __init__(self):
+        self.overall = StreamingStats()
+        self.by_subtask = {}
+        self.by_product = {}
+        self.by_subtask_product = {}
+
+    def record(self, subtask_id, product, duration):
+        self.overall.add(duration)
+        self.by_subtask.setdefault(subtask_id, StreamingStats()).add(duration)
+        if product is not None:
+            self.by_product.setdefault(product, StreamingStats()).add(duration)
+            self.by_subtask_product.setdefault((subtask_id, product), StreamingStats()).add(duration)
+
+    def expected_duration(self, subtask_id, product=None):
+        """Best available mean: subtask+product, then subtask, then overall (None if no data)."""
+        for stats in (self.by_subtask_product.get((subtask_id, product)),
+                      self.by_subtask.get(subtask_id), self.overall):
+            if stats is not None and stats.count:
+                return stats.mean
+        return None
+
+    def forecast(self, pending, elapsed_current=0.0):
+        """
+        Forecast the seconds needed to finish `pending` (iterable of queue
+        entries, head first). Time already spent on the head is subtracted.
+        """
+        eta = 0.0
+        unknown = 0
+        for index, entry in enumerate(pending):
+            expected = self.expected_duration(entry.subtask_id, entry.product)
+            if expected is None:
+                unknown += 1
+                continue
+            if index == 0:
+                expected = max(expected - elapsed_current, 0.0)
+            eta += expected
+        return {"eta_seconds": round(eta, 1), "unestimated": unknown}
+
+    def summary(self):
+        return {
+            "overall": self.overall.summary() if self.overall.count else None,
+            "by_subtask": {key: stats.summary() for key, stats in self.by_subtask.items()},
+            "by_product": {key: stats.summary() for key, stats in self.by_product.items()},
+        }
@@ -1,5 +1,9 @@
 import logging
 
+from core.temporal import rewrite_condition
+from utils.flight_recorder import FLIGHT_RECORDER, RULE
+from utils.metrics import METRICS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -7,10 +11,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+RULE_EVALUATION_SECONDS = METRICS.histogram(
+    "brain_rule_evaluation_seconds", "Time spent evaluating one rule condition")
+
 class RuleEvaluator:
+    def __init__(self, compiled_rules=None, temporal=None):
+        # Condition source -> code object, precompiled by the config compiler
+        self.compiled_rules = dict(compiled_rules or {})
+        # Temporal operators (stable, absent, count_changes) available to conditions
+        self.temporal = temporal
+        self.globals = temporal.functions() if temporal else {}
+
     def evaluate_rule(self, condition: str, state) -> bool:
-        try:
-            return eval(condition, {}, state.to_dict())
-        except Exception as e:
-            logger.info(f"Error evaluating rule '{condition}': {e}")
-            return False
+        with RULE_EVALUATION_SECONDS.time():
+            try:
+                code = self.compiled_rules.get(condition)
+                if code is None:
+                    code = self.compiled_rules[condition] = compile(rewrite_condition(condition), "<rule>", "eval")
+                result = eval(code, self.globals, state.to_dict())
+            except Exception as e:
+                logger.info(f"Error evaluating rule '{condition}': {e}")
+                result = False
+            FLIGHT_RECORDER.record(RULE, condition, b"1" if result else b"0")
+            return result
@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import deque
+
+from utils.metrics import METRICS
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+GESTURES_DETECTED = METRICS.counter("brain_gestures_total", "Gestures detected", ["gesture"])
+
+HANDS = ("handL", "handR")
+
+
+def _cell(value):
+    return tuple(value) if value is not None else None
+
+
+class DwellGesture:
+    """A hand stays in `cell` for `ms` milliseconds. Fires once per visit."""
+
+    def __init__(self, name, cell, ms=600, hands=HANDS):
+        self.name = name
+        self.cell = _cell(cell)
+        self.duration = ms / 1000.0
+        self.hands = tuple(hands)
+        self._fired = {hand: False for hand in HANDS}
+        self._armed_at = float("-inf")
+
+    def arm(self, now):
+        """A new subscriber: a hand already in the cell has to dwell again from `now`."""
+        self._fired = {hand: False for hand in HANDS}
+        self._armed_at = now
+
+    def on_cell(self, hand, cell, now, tracker):
+        self._fired[hand] = False
+
+    def check(self, hand, now, tracker):
+        if hand not in self.hands or self._fired[hand] or tracker.cells[hand] != self.cell:
+            return None
+        if now - max(tracker.entered_at[hand], self._armed_at) >= self.duration:
+            self._fired[hand] = True
+            return {"hand": hand, "cell": self.cell}
+        return None
+
+
+class SwipeGesture:
+    """A hand visits `cells` in order within `max_ms` milliseconds."""
+
+    def __init__(self, name, cells, max_ms=1000, hands=HANDS):
+        self.name = name
+        self.cells = tuple(_cell(cell) for cell in cells)
+        self.max_duration = max_ms / 1000.0
+        self.hands = tuple(hands)
+        self._progress = {hand: 0 for hand in HANDS}
+        self._started_at = {hand: 0.0 for hand in HANDS}
+
+    def arm(self, now):
+        """Swipes are completed by moves, which always come after the subscription."""
+
+    def on_cell(self, hand, cell, now, tracker):
+        if hand not in self.hands:
+            return None
+        progress = self._progress[hand]
+        if progress and now - self._started_at[hand] > self.max_duration:
+            progress = 0
+        if cell == self.cells[progress]:
+            if progress == 0:
+                self._started_at[hand] = now
+            progress += 1
+        elif cell == self.cells[0]:
+            self._started_at[hand] = now
+            progress = 1
+        elif cell is not None:
+            progress = 0
+        if progress == len(self.cells):
+            self._progress[hand] = 0
+            return {"hand": hand, "cells": self.cells, "ms": round((now - self._started_at[hand]) * 1000)}
+        self._progress[hand] = progress
+        return None
+
+    def check(self, hand, now, tracker):
+        return None
+
+
+class TwoHandHoldGesture:
+    """Both hands are held in their cells (or any same cells) together for `ms` milliseconds."""
+
+    def __init__(self, name, cells=None, ms=1000):
+        self.name = name
+        self.cells = {hand: _cell(cell) for hand, cell in (cells or {}).items()}
+        self.duration = ms / 1000.0
+        self._held_since = None
+        self._fired = False
+
+    def arm(self, now):
+        """A new subscriber: hands already held have to hold again from `now`."""
+        self._fired = False
+        if self._held_since is not None:
+            self._held_since = max(self._held_since, now)
+
+    def _holding(self, tracker):
+        left, right = tracker.cells["handL"], tracker.cells["handR"]
+        if left is None or right is None:
+            return False
+        if self.cells:
+            return left == self.cells.get("handL") and right == self.cells.get("handR")
+        return True
+
+    def on_cell(self, hand, cell, now, tracker):
+        # Any move restarts the hold
+        self._fired = False
+        self._held_since = max(tracker.entered_at.values()) if self._holding(tracker) else None
+        return None
+
+    def check(self, hand, now, tracker):
+        if self._fired or self._held_since is None or now - self._held_since < self.duration:
+            return None
+        self._fired = True
+        return {"hand": "both", "cells": {h: tracker.cells[h] for h in HANDS}}
+
+
+GESTURE_TYPES = {
+    "dwell": DwellGesture,
+    "swipe": SwipeGesture,
+    "two_hand_hold": TwoHandHoldGesture,
+}
+
+
+class Subscription:
+    __slots__ = ("engine", "name", "callback")
+
+    def __init__(self, engine, name, callback):
+        self.engine = engine
+        self.name = name
+        self.callback = callback
+
+    def cancel(self):
+        callbacks = self.engine.subscribers.get(self.name, [])
+        if self.callback in callbacks:
+            callbacks.remove(self.callback)
+
+
+class GestureEngine:
+    """
+    Detects gestures from hand grid-cell updates. Each update costs O(1)
+    per configured gesture: the engine keeps the current cell and entry
+    time of each hand, and every gesture keeps its own small progress
+    state. Detected events are queued and delivered to subscribers by
+    `dispatch()`, which the brain calls on its own thread every tick.
+    """
+
+    def __init__(self, gestures=(), clock=time.monotonic):
+        self.clock = clock
+        self.gestures = {gesture.name: gesture for gesture in gestures}
+        self.cells = {hand: None for hand in HANDS}
+        self.entered_at = {hand: 0.0 for hand in HANDS}
+        self.subscribers = {}
+        self._events = deque()
+        # Hand updates arrive on the MQTT thread, time checks run on the brain thread
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, clock=time.monotonic):
+        """Build from the `gestures` config section: {name: {type: ..., **options}}."""
+        gestures = []
+        for name, options in (config or {}).items():
+            options = dict(options)
+            kind = options.pop("type", "dwell")
+            if kind not in GESTURE_TYPES:
+                logger.warning(f"[Gestures] Unknown gesture type {kind!r} for {name}, ignored")
+                continue
+            gestures.append(GESTURE_TYPES[kind](name, **options))
+        return cls(gestures, clock)
+
+    def on_state_update(self, key, value):
+        """WorkstationState listener: feed hand cell changes."""
+        if key.endswith("_GridCell"):
+            hand = key[:-len("_GridCell")]
+            if hand in self.cells:
+                self.on_hand_cell(hand, value)
+
+    def on_hand_cell(self, hand, cell, now=None):
+        now = self.clock() if now is None else now
+        cell = _cell(cell)
+        with self._lock:
+            if cell != self.cells[hand]:
+                self.cells[hand] = cell
+                self.entered_at[hand] = now
+                for gesture in self.gestures.values():
+                    self._emit(gesture, gesture.on_cell(hand, cell, now, self), now)
+            self._check(hand, now)
+
+    def _check(self, hand, now):
+        for gesture in self.gestures.values():
+            self._emit(gesture, gesture.check(hand, now, self), now)
+
+    def _emit(self, gesture, event, now):
+        if event is not None:
+            event["gesture"] = gesture.name
+            event["at"] = now
+            GESTURES_DETECTED.inc(gesture=gesture.name)
+            self._events.append(event)
+
+    def subscribe(self, name, callback, now=None):
+        """
+        Call `callback(event)` for gesture `name` ("*" for every gesture)
+        until cancelled. The gestures are re-armed, so a hand that was
+        already there (e.g. left in the confirmation cell) does not fire
+        right away, and events detected before subscribing are dropped.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            for gesture in self.gestures.values():
+                if name in ("*", gesture.name):
+                    gesture.arm(now)
+            if name != "*":
+                self._events = deque(event for event in self._events if event["gesture"] != name)
+        self.subscribers.setdefault(name, []).append(callback)
+        return Subscription(self, name, callback)
+
+    def dispatch(self, now=None):
+        """Complete time-based gestures and deliver queued events. Call from the brain loop."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            for hand in HANDS:
+                self._check(hand, now)
+        while self._events:
+            event = self._events.popleft()
+            logger.info(f"[Gestures] {event['gesture']} detected ({event.get('hand')})")
+            for callback in list(self.subscribers.get(event["gesture"], [])) + list(self.subscribers.get("*", [])):
+                callback(event)
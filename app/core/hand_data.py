@@ -0,0 +1,113 @@
+from array import array
+
+# MediaPipe hand landmark order, as named in the hand tracker payload keys
+# ("<hand>_<Landmark>_x" / "_y" / "_z", normalized image coordinates)
+HAND_LANDMARKS = (
+    "Wrist",
+    "Thumb_CMC", "Thumb_MCP", "Thumb_IP", "Thumb_Tip",
+    "Index_Finger_MCP", "Index_Finger_PIP", "Index_Finger_DIP", "Index_Finger_Tip",
+    "Middle_Finger_MCP", "Middle_Finger_PIP", "Middle_Finger_DIP", "Middle_Finger_Tip",
+    "Ring_Finger_MCP", "Ring_Finger_PIP", "Ring_Finger_DIP", "Ring_Finger_Tip",
+    "Pinky_MCP", "Pinky_PIP", "Pinky_DIP", "Pinky_Tip",
+)
+
+
+class HandData:
+    """
+    Landmarks of one hand in preallocated fixed-size arrays, overwritten in
+    place on every frame so the hand stream doesn't allocate per message.
+    Truthy while the hand is present. `bbox` is (min_x, min_y, max_x, max_y)
+    in normalized coordinates; `confidence` is the tracker score when the
+    payload has one, else the fraction of landmarks received.
+    """
+    __slots__ = ("label", "names", "xs", "ys", "zs", "valid", "count", "present",
+                 "confidence", "bbox", "_keys", "_score_keys")
+
+    def __init__(self, label, names=HAND_LANDMARKS):
+        size = len(names)
+        self.label = label
+        self.names = tuple(names)
+        self.xs = array("d", bytes(8 * size))
+        self.ys = array("d", bytes(8 * size))
+        self.zs = array("d", bytes(8 * size))
+        self.valid = bytearray(size)
+        self.count = 0
+        self.present = False
+        self.confidence = 0.0
+        self.bbox = array("d", bytes(8 * 4))
+        self._keys = tuple((f"{label}_{name}_x", f"{label}_{name}_y", f"{label}_{name}_z") for name in self.names)
+        self._score_keys = (f"{label}_confidence", f"{label}_score")
+
+    def update(self, payload):
+        """Read this hand's landmarks from a tracker payload. Returns whether the hand is present."""
+        xs, ys, zs, valid = self.xs, self.ys, self.zs, self.valid
+        count = 0
+        min_x = min_y = float("inf")
+        max_x = max_y = float("-inf")
+        for i, (x_key, y_key, z_key) in enumerate(self._keys):
+            x = payload.get(x_key)
+            y = payload.get(y_key)
+            if x is None or y is None:
+                valid[i] = 0
+                continue
+            x = float(x)
+            y = float(y)
+            xs[i] = x
+            ys[i] = y
+            zs[i] = float(payload.get(z_key, 0.0))
+            valid[i] = 1
+            count += 1
+            if x < min_x:
+                min_x = x
+            if x > max_x:
+                max_x = x
+            if y < min_y:
+                min_y = y
+            if y > max_y:
+                max_y = y
+
+        self.count = count
+        self.present = count > 0
+        if not self.present:
+            self.confidence = 0.0
+            return False
+
+        bbox = self.bbox
+        bbox[0], bbox[1], bbox[2], bbox[3] = min_x, min_y, max_x, max_y
+        score = payload.get(self._score_keys[0], payload.get(self._score_keys[1]))
+        self.confidence = float(score) if score is not None else count / len(self.names)
+        return True
+
+    def clear(self):
+        self.valid[:] = bytes(len(self.valid))
+        self.count = 0
+        self.present = False
+        self.confidence = 0.0
+
+    def landmark(self, name):
+        """(x, y, z) of a landmark from the last frame, or None if it was missing."""
+        i = self.names.index(name)
+        return (self.xs[i], self.ys[i], self.zs[i]) if self.valid[i] else None
+
+    def anchor(self):
+        """Normalized point used to place the hand on the grid: the wrist, else the bbox center."""
+        if self.valid[0]:
+            return self.xs[0], self.ys[0]
+        return (self.bbox[0] + self.bbox[2]) / 2, (self.bbox[1] + self.bbox[3]) / 2
+
+    def __bool__(self):
+        return self.present
+
+    def to_dict(self):
+        return {
+            "present": self.present,
+            "confidence": round(self.confidence, 3),
+            "bbox": list(self.bbox) if self.present else None,
+            "landmarks": {
+                name: [self.xs[i], self.ys[i], self.zs[i]]
+                for i, name in enumerate(self.names) if self.valid[i]
+            },
+        }
+
+    def __repr__(self):
+        return f"HandData({self.label}, present={self.present}, landmarks={self.count})"
@@ -0,0 +1,177 @@
+import time
+from array import array
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+NO_CELL = -1.0
+
+
+def encode_cell(cell):
+    """Grid cell (row, col) as a number so it fits a numeric series; None -> NO_CELL."""
+    return NO_CELL if cell is None else float(cell[0] * 1000 + cell[1])
+
+
+def decode_cell(value):
+    return None if value == NO_CELL else (int(value) // 1000, int(value) % 1000)
+
+
+class RingSeries:
+    """
+    The last `capacity` (time, value) samples of one numeric signal, in
+    preallocated arrays. Appends are O(1) plus an O(log n) segment tree
+    update. Windows are located by binary search over the (monotonic)
+    sample times; min/max use the segment trees, mean and change counts use
+    running totals, so every query is O(log n).
+    """
+    __slots__ = ("capacity", "times", "values", "_sums", "_changes", "_size", "_min", "_max",
+                 "count", "last_change")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        # Running sum of values / number of value changes, including the sample itself
+        self._sums = array("d", bytes(8 * capacity))
+        self._changes = array("q", bytes(8 * capacity))
+        size = 1
+        while size < capacity:
+            size *= 2
+        self._size = size
+        self._min = array("d", [float("inf")]) * (2 * size)
+        self._max = array("d", [float("-inf")]) * (2 * size)
+        self.count = 0  # Samples appended since creation
+        self.last_change = None  # Time the current value was first seen
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, t, value):
+        capacity = self.capacity
+        pos = self.count % capacity
+        if self.count:
+            prev = (self.count - 1) % capacity
+            changed = value != self.values[prev]
+            self._sums[pos] = self._sums[prev] + value
+            self._changes[pos] = self._changes[prev] + changed
+        else:
+            changed = True
+            self._sums[pos] = value
+            self._changes[pos] = 0
+        if changed:
+            self.last_change = t
+        self.times[pos] = t
+        self.values[pos] = value
+        self.count += 1
+
+        i = pos + self._size
+        self._min[i] = self._max[i] = value
+        i //= 2
+        while i:
+            self._min[i] = min(self._min[2 * i], self._min[2 * i + 1])
+            self._max[i] = max(self._max[2 * i], self._max[2 * i + 1])
+            i //= 2
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self.count - 1) % self.capacity]
+
+    def stable_since(self):
+        """Time since which the latest value hasn't changed (None if empty)."""
+        return self.last_change
+
+    def _window(self, seconds, now):
+        """Logical sample indices [start, end) within the last `seconds` before `now`."""
+        end = self.count
+        lo = self.count - len(self)
+        hi = end
+        cutoff = now - seconds
+        times, capacity = self.times, self.capacity
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[mid % capacity] < cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo, end
+
+    def _range(self, tree, combine, start, end, empty):
+        """Combine segment tree leaves over logical indices [start, end)."""
+        result = empty
+        capacity, size = self.capacity, self._size
+        first, last = start % capacity, (end - 1) % capacity
+        spans = [(first, last)] if first <= last else [(first, capacity - 1), (0, last)]
+        for lo, hi in spans:
+            lo += size
+            hi += size + 1
+            while lo < hi:
+                if lo & 1:
+                    result = combine(result, tree[lo])
+                    lo += 1
+                if hi & 1:
+                    hi -= 1
+                    result = combine(result, tree[hi])
+                lo //= 2
+                hi //= 2
+        return result
+
+    def window_min(self, seconds, now):
+        start, end = self._window(seconds, now)
+        return self._range(self._min, min, start, end, float("inf")) if end > start else None
+
+    def window_max(self, seconds, now):
+        start, end = self._window(seconds, now)
+        return self._range(self._max, max, start, end, float("-inf")) if end > start else None
+
+    def window_mean(self, seconds, now):
+        start, end = self._window(seconds, now)
+        if end <= start:
+            return None
+        capacity = self.capacity
+        first, last = start % capacity, (end - 1) % capacity
+        total = self._sums[last] - self._sums[first] + self.values[first]
+        return total / (end - start)
+
+    def window_changes(self, seconds, now):
+        """Number of value changes between samples inside the window."""
+        start, end = self._window(seconds, now)
+        if end - start < 2:
+            return 0
+        capacity = self.capacity
+        return self._changes[(end - 1) % capacity] - self._changes[start % capacity]
+
+    def window_count(self, seconds, now):
+        start, end = self._window(seconds, now)
+        return end - start
+
+
+class StateHistory:
+    """
+    Fixed-memory history of the state signals: one RingSeries per signal,
+    each sized for `seconds` of samples at up to `rate_hz`.
+    """
+
+    def __init__(self, seconds=30.0, rate_hz=60, clock=time.monotonic):
+        self.seconds = seconds
+        self.capacity = max(1, int(seconds * rate_hz))
+        self.clock = clock
+        self.series = {}
+
+    def record(self, name, value, now=None):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = RingSeries(self.capacity)
+        series.append(self.clock() if now is None else now, float(value))
+
+    def get(self, name):
+        return self.series.get(name)
+
+    def now(self):
+        return self.clock()
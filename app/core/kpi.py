@@ -0,0 +1,177 @@
+import time
+from collections import deque
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class KpiWindow:
+    """Counters of one time window: units and seconds per product, seconds per state, rule failures."""
+
+    __slots__ = ("start", "units", "products", "state_seconds", "rule_failures")
+
+    def __init__(self, start):
+        self.start = start
+        self.units = 0
+        self.products = {}  # product -> [units, seconds]
+        self.state_seconds = {}
+        self.rule_failures = {}
+
+    def add_completion(self, product, seconds):
+        self.units += 1
+        entry = self.products.setdefault(product, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def add_state(self, state, seconds):
+        self.state_seconds[state] = self.state_seconds.get(state, 0.0) + seconds
+
+    def add_rule_failure(self, rule_id):
+        self.rule_failures[rule_id] = self.rule_failures.get(rule_id, 0) + 1
+
+    def merge(self, other):
+        self.units += other.units
+        for product, (units, seconds) in other.products.items():
+            entry = self.products.setdefault(product, [0, 0.0])
+            entry[0] += units
+            entry[1] += seconds
+        for state, seconds in other.state_seconds.items():
+            self.add_state(state, seconds)
+        for rule_id, count in other.rule_failures.items():
+            self.rule_failures[rule_id] = self.rule_failures.get(rule_id, 0) + count
+        return self
+
+    def as_dict(self, start, end):
+        elapsed = max(end - start, 0.0)
+        return {
+            "start": start,
+            "end": end,
+            "units": self.units,
+            "throughput_per_hour": round(self.units / elapsed * 3600, 1) if elapsed else 0.0,
+            "by_product": {
+                str(product): {"units": units, "seconds": round(seconds, 1),
+                               "mean_seconds": round(seconds / units, 2) if units else None}
+                for product, (units, seconds) in self.products.items()
+            },
+            "state_seconds": {state: round(seconds, 1) for state, seconds in self.state_seconds.items()},
+            "rule_failures": dict(self.rule_failures),
+        }
+
+
+class KpiAggregator:
+    """
+    Shift KPIs in constant memory. Events land in the current bucket
+    (`bucket_seconds`, a minute by default); closed buckets are kept for
+    the sliding window (the last `sliding_buckets`) and folded into the
+    tumbling hour and shift windows. Shifts are `shift_hours` long and
+    start at `shift_start_hour` local time. Time per state is accrued
+    up to every bucket boundary, so long states are split correctly.
+    Everything runs on the loop thread.
+    """
+
+    def __init__(self, clock=time.time, bucket_seconds=60, sliding_buckets=60, shift_hours=8, shift_start_hour=6):
+        self.clock = clock
+        self.bucket_seconds = bucket_seconds
+        self.shift_seconds = shift_hours * 3600
+        self.shift_offset = shift_start_hour * 3600
+        now = clock()
+        self.started = now
+        self.current = KpiWindow(now - now % bucket_seconds)
+        self.closed = deque(maxlen=max(sliding_buckets - 1, 0))
+        self.last_closed = None
+        self.hour = KpiWindow(self._hour_start(self.current.start))
+        self.shift = KpiWindow(self._shift_start(self.current.start))
+        self.state = None
+        self.state_since = now
+        self._rule_passing = {}
+        self._rule_subtask = None
+
+    def _hour_start(self, t):
+        return t - t % 3600
+
+    def _shift_start(self, t):
+        local = t + time.localtime(t).tm_gmtoff - self.shift_offset
+        return t - local % self.shift_seconds
+
+    def _accrue(self, t):
+        if self.state is not None and t > self.state_since:
+            self.current.add_state(self.state, t - self.state_since)
+        self.state_since = max(self.state_since, t)
+
+    def _advance(self, now):
+        """Close every bucket that ended before `now`."""
+        while now >= self.current.start + self.bucket_seconds:
+            end = self.current.start + self.bucket_seconds
+            self._accrue(end)
+            closed = self.current
+            for name, start_of in (("hour", self._hour_start), ("shift", self._shift_start)):
+                window = getattr(self, name)
+                start = start_of(closed.start)
+                if window.start != start:
+                    window = KpiWindow(start)
+                    setattr(self, name, window)
+                window.merge(closed)
+            self.closed.append(closed)
+            self.last_closed = closed
+            self.current = KpiWindow(end)
+        self._accrue(now)
+
+    # Events
+    def on_state(self, state):
+        now = self.clock()
+        self._advance(now)
+        self.state = state
+
+    def record_completion(self, product, seconds):
+        self._advance(self.clock())
+        self.current.add_completion(product, seconds)
+
+    def record_rule(self, rule_id, passed, subtask=None):
+        """
+        Count a failure each time a rule goes from passing to failing within
+        one subtask. Every subtask starts with its rules failing (nothing is
+        assembled yet), so that alone is not a failure.
+        """
+        if subtask != self._rule_subtask:
+            self._rule_subtask = subtask
+            self._rule_passing = {}
+        if not passed and self._rule_passing.get(rule_id, False):
+            self._advance(self.clock())
+            self.current.add_rule_failure(rule_id)
+        self._rule_passing[rule_id] = passed
+
+    # Rollups
+    def _tumbling(self, window, start):
+        """The tumbling window starting at `start`, including the open bucket."""
+        view = KpiWindow(start)
+        if window.start == start:
+            view.merge(window)
+        return view.merge(self.current)
+
+    def rollup(self):
+        """
+        {"minute": the last closed bucket, "last_hour": the sliding window,
+        "hour": the current clock hour, "shift": the current shift}; open
+        windows include the time up to now.
+        """
+        now = self.clock()
+        self._advance(now)
+        sliding = KpiWindow(self.closed[0].start if self.closed else self.current.start)
+        for window in self.closed:
+            sliding.merge(window)
+        sliding.merge(self.current)
+        hour = self._tumbling(self.hour, self._hour_start(self.current.start))
+        shift = self._tumbling(self.shift, self._shift_start(self.current.start))
+        last = self.last_closed
+        return {
+            "minute": last.as_dict(max(last.start, self.started), last.start + self.bucket_seconds) if last else None,
+            "last_hour": sliding.as_dict(max(sliding.start, self.started), now),
+            "hour": hour.as_dict(max(hour.start, self.started), now),
+            "shift": shift.as_dict(max(shift.start, self.started), now),
+        }
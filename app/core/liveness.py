@@ -0,0 +1,96 @@
+import time
+
+from utils.metrics import METRICS
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STREAM_FPS = METRICS.gauge("brain_stream_fps", "Inbound message rate per sensor stream (EWMA)", ["stream"])
+STREAM_STALE = METRICS.gauge("brain_stream_stale", "1 while a sensor stream is stale", ["stream"])
+
+
+class RateMeter:
+    """
+    Message rate of one stream as an EWMA of inter-arrival times. `mark()`
+    runs on the consumer thread for every message, so it is a few float
+    operations and no lock.
+    """
+
+    def __init__(self, clock=time.monotonic, alpha=0.2):
+        self.clock = clock
+        self.alpha = alpha
+        self.interval = None  # EWMA of the gap between messages, seconds
+        self.last_seen = None
+        self.count = 0
+
+    def mark(self):
+        now = self.clock()
+        if self.last_seen is not None:
+            gap = now - self.last_seen
+            self.interval = gap if self.interval is None else self.alpha * gap + (1 - self.alpha) * self.interval
+        self.last_seen = now
+        self.count += 1
+
+    @property
+    def fps(self):
+        return 1.0 / self.interval if self.interval else 0.0
+
+
+class LivenessWatchdog:
+    """
+    Marks a stream stale when no message arrived for `max_gap` seconds (a
+    stream never heard from counts from when the watchdog started), and
+    live again on the next message. `check()` runs on the loop thread and
+    calls `on_change(name, stale, status)` on every flip.
+    """
+
+    def __init__(self, clock=time.monotonic, on_change=None, alpha=0.2):
+        self.clock = clock
+        self.on_change = on_change
+        self.alpha = alpha
+        self.started = clock()
+        self.streams = {}  # name -> (RateMeter, max_gap)
+        self.stale = set()
+
+    def add_stream(self, name, max_gap):
+        meter = RateMeter(self.clock, self.alpha)
+        self.streams[name] = (meter, max_gap)
+        return meter
+
+    def status(self, name):
+        meter, max_gap = self.streams[name]
+        last_seen = meter.last_seen if meter.last_seen is not None else self.started
+        return {
+            "fps": round(meter.fps, 2),
+            "gap": round(self.clock() - last_seen, 3),
+            "max_gap": max_gap,
+            "messages": meter.count,
+            "stale": name in self.stale,
+        }
+
+    def check(self):
+        now = self.clock()
+        for name, (meter, max_gap) in self.streams.items():
+            last_seen = meter.last_seen if meter.last_seen is not None else self.started
+            stale = now - last_seen > max_gap
+            STREAM_FPS.set(meter.fps, stream=name)
+            STREAM_STALE.set(1 if stale else 0, stream=name)
+            if stale == (name in self.stale):
+                continue
+            if stale:
+                self.stale.add(name)
+                logger.warning(f"[Liveness] Stream {name} is stale: no message for {now - last_seen:.1f} s")
+            else:
+                self.stale.discard(name)
+                logger.info(f"[Liveness] Stream {name} is live again ({meter.fps:.1f} fps)")
+            if self.on_change is not None:
+                self.on_change(name, stale, self.status(name))
+
+    def rates(self):
+        return {name: self.status(name) for name in self.streams}
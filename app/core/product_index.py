@@ -0,0 +1,101 @@
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ProductIndex:
+    """
+    Index over the products.yaml configs, stored as count vectors over a
+    fixed color order (from the compiled config bundle). Maps a detected
+    combination to the exact product with a hash lookup, or to the nearest
+    one by L1 distance (total number of candies to add or remove).
+    """
+
+    def __init__(self, colors, product_vectors):
+        self.colors = tuple(colors)
+        self._positions = {color: i for i, color in enumerate(self.colors)}
+        self._vectors = dict(product_vectors)
+        self._products = sorted(self._vectors.items())
+        self._exact = {}
+        for product_id, vector in self._products:
+            # Two products with the same config: the first by id wins
+            self._exact.setdefault(tuple(vector), product_id)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(bundle.colors, bundle.product_vectors)
+
+    def vector(self, counts):
+        """Split a {color: count} dict into a count vector and the counts of unknown colors."""
+        vector = [0] * len(self.colors)
+        unknown = {}
+        for color, count in counts.items():
+            position = self._positions.get(color)
+            if position is None:
+                if count:
+                    unknown[color] = count
+            else:
+                vector[position] = count
+        return tuple(vector), unknown
+
+    def lookup(self, counts):
+        """Product id whose config is exactly `counts`, or None."""
+        vector, unknown = self.vector(counts)
+        return None if unknown else self._exact.get(vector)
+
+    def nearest(self, counts):
+        """(product id, distance) of the closest product; distance 0 is an exact match."""
+        vector, unknown = self.vector(counts)
+        extra = sum(unknown.values())
+        if not unknown:
+            product_id = self._exact.get(vector)
+            if product_id is not None:
+                return product_id, 0
+
+        best_id, best_distance = None, None
+        for product_id, product_vector in self._products:
+            distance = extra + sum(abs(a - b) for a, b in zip(vector, product_vector))
+            if best_distance is None or distance < best_distance:
+                best_id, best_distance = product_id, distance
+        return best_id, best_distance
+
+    @staticmethod
+    def deficits(detected, target):
+        """Per-color change needed to turn `detected` into `target` (positive = add)."""
+        changes = {}
+        for color in set(detected) | set(target):
+            delta = target.get(color, 0) - detected.get(color, 0)
+            if delta:
+                changes[color] = delta
+        return dict(sorted(changes.items()))
+
+    @staticmethod
+    def describe(deficits):
+        """Human readable guidance, e.g. "add 2 Red, remove 1 Blue"."""
+        adds = [f"add {delta} {color}" for color, delta in deficits.items() if delta > 0]
+        removes = [f"remove {-delta} {color}" for color, delta in deficits.items() if delta < 0]
+        return ", ".join(adds + removes)
+
+    def identify(self, detected, expected=None):
+        """
+        Identify the product on the tray and what must change to reach
+        `expected` (or the nearest product when nothing is expected).
+        """
+        product_id, distance = self.nearest(detected)
+        if expected:
+            target = expected
+        else:
+            target = dict(zip(self.colors, self._vectors[product_id])) if product_id else {}
+        deficits = self.deficits(detected, target)
+        return {
+            "product": product_id,
+            "exact": distance == 0,
+            "distance": distance,
+            "deficits": deficits,
+            "guidance": self.describe(deficits),
+        }
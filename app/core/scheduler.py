@@ -0,0 +1,181 @@
+import heapq
+import itertools
+import math
+import time
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """Handle returned by the scheduler so a pending timer can be cancelled."""
+    __slots__ = ("deadline", "callback", "cancelled")
+
+    def __init__(self, deadline, callback):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TickStats:
+    """Running jitter and overrun statistics for the main loop."""
+
+    def __init__(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self._jitter_sum = 0.0
+        self._jitter_sq_sum = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def record(self, lateness, duration):
+        """Record how late a tick started and how long it took to execute."""
+        self.ticks += 1
+        self.last_jitter = lateness
+        self.max_jitter = max(self.max_jitter, lateness)
+        self._jitter_sum += lateness
+        self._jitter_sq_sum += lateness * lateness
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def record_overrun(self, missed):
+        """Record a tick that ran past the next deadline, missing `missed` slots."""
+        self.overruns += 1
+        self.skipped += missed
+
+    @property
+    def mean_jitter(self):
+        return self._jitter_sum / self.ticks if self.ticks else 0.0
+
+    @property
+    def stddev_jitter(self):
+        if self.ticks < 2:
+            return 0.0
+        mean = self.mean_jitter
+        variance = max(self._jitter_sq_sum / self.ticks - mean * mean, 0.0)
+        return math.sqrt(variance)
+
+    def as_dict(self):
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "mean_jitter_ms": round(self.mean_jitter * 1000, 3),
+            "stddev_jitter_ms": round(self.stddev_jitter * 1000, 3),
+            "max_jitter_ms": round(self.max_jitter * 1000, 3),
+            "max_duration_ms": round(self.max_duration * 1000, 3),
+        }
+
+
+class TickScheduler:
+    """
+    Fixed-cadence loop driver based on absolute deadlines.
+
+    Each tick is scheduled at `previous_deadline + interval`, so time spent
+    inside the tick does not push the following ticks back. The interval is
+    asked again after every tick, which lets the current state choose its own
+    rate. One-shot timers run on the loop thread between ticks.
+    """
+
+    def __init__(self, default_interval=0.1, clock=time.monotonic, sleep=time.sleep):
+        self.default_interval = default_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = TickStats()
+        self._timers = []
+        self._counter = itertools.count()
+        self._running = False
+
+    def call_later(self, delay, callback):
+        """Run `callback()` on the loop thread once `delay` seconds have passed."""
+        handle = TimerHandle(self.clock() + delay, callback)
+        heapq.heappush(self._timers, (handle.deadline, next(self._counter), handle))
+        return handle
+
+    def call_every(self, interval, callback):
+        """Run `callback()` every `interval` seconds until the returned handle is cancelled."""
+        if not interval > 0:
+            raise ValueError(f"call_every interval must be positive, got {interval!r}")
+        handle = TimerHandle(self.clock() + interval, None)
+
+        def _repeat():
+            # Reschedule even if the callback raises, so one failure doesn't stop the timer
+            try:
+                callback()
+            finally:
+                if not handle.cancelled:
+                    handle.deadline += interval
+                    heapq.heappush(self._timers, (handle.deadline, next(self._counter), handle))
+
+        handle.callback = _repeat
+        heapq.heappush(self._timers, (handle.deadline, next(self._counter), handle))
+        return handle
+
+    def run_due_timers(self, now=None):
+        """Fire every timer whose deadline has passed."""
+        now = self.clock() if now is None else now
+        while self._timers and self._timers[0][0] <= now:
+            _, _, handle = heapq.heappop(self._timers)
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback()
+            except Exception as e:
+                logger.error(f"[Scheduler] Timer callback failed: {e}")
+
+    def stop(self):
+        self._running = False
+
+    def run(self, tick, get_interval=None):
+        """
+        Call `tick()` on a fixed cadence until `stop()` is called.
+        `get_interval()` returns the period for the next tick (None = default).
+        """
+        self._running = True
+        deadline = self.clock()
+
+        while self._running:
+            self.run_due_timers()
+
+            start = self.clock()
+            tick()
+            end = self.clock()
+            self.stats.record(max(start - deadline, 0.0), end - start)
+
+            interval = (get_interval() if get_interval else None) or self.default_interval
+            deadline += interval
+
+            # Tick ran past the next slot: skip the missed slots instead of bursting
+            if end > deadline:
+                overrun = end - deadline
+                missed = int(overrun // interval) + 1
+                self.stats.record_overrun(missed)
+                deadline += missed * interval
+                logger.debug(f"[Scheduler] Tick overrun by {overrun * 1000:.1f} ms, skipped {missed} slot(s)")
+
+            self._wait_until(deadline)
+
+    def _wait_until(self, deadline):
+        """Sleep until `deadline`, waking up for any timer due before it."""
+        while self._running:
+            now = self.clock()
+            target = deadline
+            if self._timers and self._timers[0][0] < target:
+                target = self._timers[0][0]
+            if target > now:
+                self.sleep(target - now)
+            if self.clock() >= deadline:
+                return
+            self.run_due_timers()
@@ -1,6 +1,10 @@
+from collections import deque
 from typing import Dict
 import logging
 
+from core.hand_data import HandData
+from core.history import StateHistory, encode_cell
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -9,22 +13,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class WorkstationState:
-    def __init__(self, expected_config: Dict[str, int] = None):
+    def __init__(self, expected_config: Dict[str, int] = None, history: StateHistory = None, max_defects: int = 100):
         self.data = {
             "CandiesWrapped": False,
             "CombinationValid": False,
             "DetectedCandies": {},
             "CandiesData": {},
             "ExpectedConfig": expected_config or {},  # From product definition
-            "Defects": [],  # List of detected defects
+            "Defects": deque(maxlen=max_defects),  # Most recent detected defects
             "handL_GridCell": None,  # Grid cell for left hand
             "handR_GridCell": None,  # Grid cell for right hand
             "handL_Present": False,  # Presence of left hand
             "handR_Present": False,  # Presence of right hand
-            "handL_data": {},
-            "handR_data": {},
-            "SubtaskConfigs": {}
+            "handL_data": HandData("handL"),  # Landmarks, bbox and confidence, updated in place
+            "handR_data": HandData("handR"),
+            "IdentifiedProduct": None,  # Product whose config matches the tray, if any
+            "ProductMatch": {},  # Nearest product, per-color deficits and guidance text
+            "StaleStreams": []  # Sensor streams the liveness watchdog considers stale
         }
+        # Set by the brain from the config bundle (core.product_index.ProductIndex)
+        self.product_index = None
+        # Last seconds of hand cells, presence, candy counts and validity
+        self.history = history or StateHistory()
+        # Called as listener(key, value) after every update (on the updating thread)
+        self._listeners = []
+        # Trace of the most recent inbound frame, picked up by the brain loop
+        self.latest_trace = None
         self.base_products = {
             'T1A': {'Red': 1},
             'T1B': {'Green': 1},
@@ -33,22 +47,51 @@ class WorkstationState:
 
     def update(self, key, value):
         self.data[key] = value
+        self._record(key, value)
         if key == "DetectedCandies":
-            if value != {} and self.data["ExpectedConfig"] != {}:
-                self.validate_combination()
+            self._on_candies(value)
 
     def bulk_update(self, updates: dict):
         for key, value in updates.items():
             self.data[key] = value
+            self._record(key, value)
         if "DetectedCandies" in updates:
-            if value != {} and self.data["ExpectedConfig"] != {}:
-                self.validate_combination()
+            self._on_candies(updates["DetectedCandies"])
+
+    def _on_candies(self, candies):
+        if candies != {} and self.data["ExpectedConfig"] != {}:
+            self.validate_combination()
+        else:
+            # An empty tray (or no subtask yet) still changes what the tray looks like
+            self.identify_product()
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _record(self, key, value):
+        """Append history samples for the signals that are tracked over time."""
+        if key.endswith("_GridCell"):
+            self.history.record(key, encode_cell(value))
+        elif key.endswith("_Present") or key == "CombinationValid":
+            self.history.record(key, 1.0 if value else 0.0)
+        elif key == "DetectedCandies":
+            now = self.history.now()
+            self.history.record("CandyCount", sum(value.values()), now)
+            if self.product_index is not None:
+                for color in self.product_index.colors:
+                    self.history.record(f"CandyCount_{color}", value.get(color, 0), now)
+        for listener in self._listeners:
+            listener(key, value)
 
     def add_defect(self, defect_description):
         self.data["Defects"].append(defect_description)
 
     def reset_defects(self):
-        self.data["Defects"] = []
+        self.data["Defects"].clear()
 
     def validate_combination(self):
         """Check if the detected candies match the expected configuration."""
@@ -62,14 +105,31 @@ class WorkstationState:
         )
         logger.info(f"\033[92m[State] Expected Config: {self.data['ExpectedConfig']}\033[0m")
         logger.info(f"\033[93m[State] Detected Candies: {self.data['DetectedCandies']}\033[0m")
+        self._record("CombinationValid", self.data["CombinationValid"])
         if self.data["CombinationValid"]:
             self.data["CandiesWrapped"] = True
         else:
             self.data["CandiesWrapped"] = False
+        self.identify_product()
+
+    def identify_product(self):
+        """Record which product is on the tray and how to get to the expected one."""
+        if self.product_index is None:
+            return
+        match = self.product_index.identify(self.data["DetectedCandies"], self.data["ExpectedConfig"])
+        previous = self.data["ProductMatch"]
+        self.data["IdentifiedProduct"] = match["product"] if match["exact"] else None
+        self.data["ProductMatch"] = match
+        # Detections arrive several times a second; only log when the advice changes
+        changed = (match["product"], match["guidance"]) != (previous.get("product"), previous.get("guidance"))
+        if changed and not self.data["CombinationValid"]:
+            logger.info(f"[State] Tray looks like {match['product']} (distance {match['distance']}): "
+                        f"{match['guidance']}")
 
     def register_hand_presence(self, hand_label, present):
         """Register the presence of a hand."""
         self.data[f"{hand_label}_Present"] = present
+        self._record(f"{hand_label}_Present", present)
 
     def get_hand_presence(self):
         return self.data['handL_Present'] or self.data['handR_Present']
@@ -1,9 +1,20 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 import logging
+import time
+
+from utils.flight_recorder import FLIGHT_RECORDER, TRANSITION
+from utils.metrics import METRICS
+from utils.tracing import TRACER
 
 logger = logging.getLogger(__name__)
 
+STATE_TRANSITIONS = METRICS.counter(
+    "brain_state_transitions_total", "State machine transitions", ["from_state", "to_state"])
+STATE_DWELL_SECONDS = METRICS.histogram(
+    "brain_state_dwell_seconds", "Time spent in a state before leaving it", ["state"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+
 class WorkstationStates(Enum):
     IDLE = "idle"
     WAITING_FOR_TASK = "waiting_for_task"
@@ -19,6 +30,9 @@ class StateTransition:
         self.condition_func = condition_func
 
 class State(ABC):
+    # Seconds between ticks while this state is active (None = scheduler default)
+    tick_interval = None
+
     def __init__(self, name: WorkstationStates):
         self.name = name
         
@@ -38,10 +52,17 @@ class State(ABC):
         pass
 
 class StateMachine:
-    def __init__(self, initial_state: WorkstationStates):
+    def __init__(self, initial_state: WorkstationStates, clock=time.monotonic):
+        self.clock = clock
         self.current_state = initial_state
         self.states = {}
         self.transitions = []
+        self.state_entered_at = clock()
+        # Called as listener(from_state, to_state) on every transition, before the new state is entered
+        self._listeners = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
         
     def add_state(self, state: State):
         self.states[state.name] = state
@@ -49,19 +70,33 @@ class StateMachine:
     def add_transition(self, transition: StateTransition):
         self.transitions.append(transition)
         
+    def get_tick_interval(self):
+        """Return the tick interval requested by the current state."""
+        state = self.states.get(self.current_state)
+        return state.tick_interval if state else None
+
     def transition_to(self, new_state: WorkstationStates, context):
         if new_state not in self.states:
             logger.error(f"State {new_state} not found")
             return False
             
         logger.info(f"Transitioning from {self.current_state} to {new_state}")
-        
+
         # Exit current state
         if self.current_state in self.states:
             self.states[self.current_state].exit(context)
             
+        now = self.clock()
+        STATE_DWELL_SECONDS.observe(now - self.state_entered_at, state=self.current_state.value)
+        STATE_TRANSITIONS.inc(from_state=self.current_state.value, to_state=new_state.value)
+        TRACER.mark_decision(f"{self.current_state.value}->{new_state.value}")
+        FLIGHT_RECORDER.record(TRANSITION, f"{self.current_state.value}->{new_state.value}")
+        self.state_entered_at = now
+
         # Enter new state
-        self.current_state = new_state
+        previous_state, self.current_state = self.current_state, new_state
+        for listener in self._listeners:
+            listener(previous_state, new_state)
         self.states[new_state].enter(context)
         
         return True
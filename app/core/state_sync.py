@@ -0,0 +1,105 @@
+import json
+import threading
+from collections import deque
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def to_plain(value):
+    """JSON-friendly copy of a state value (HandData, deques and tuples included)."""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {str(key): to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, deque, set)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class StateSync:
+    """
+    Versioned view of WorkstationState.data for dashboards. `flush()` diffs
+    the state against the last version by encoded value and, if any key
+    changed, bumps the version and hands `publish_delta` only the changed
+    and removed keys; calling it on an interval coalesces everything that
+    changed in between. The last `history` deltas are kept so a client can
+    resync from a version it already has (`since`); older clients get a
+    full `snapshot()`.
+    """
+
+    def __init__(self, state, publish_delta=None, history=240, exclude=()):
+        self.state = state
+        self.publish_delta = publish_delta
+        self.exclude = set(exclude)
+        self.version = 0
+        self._encoded = {}  # key -> JSON of the value at self.version, for diffing
+        self._values = {}  # key -> plain value at self.version
+        self._deltas = deque(maxlen=history)  # (version, changes, removed)
+        self._lock = threading.Lock()
+
+    def flush(self):
+        """Publish a delta if the state changed since the last version; returns it (or None)."""
+        with self._lock:
+            changes = {}
+            seen = set()
+            # The consumers update the dict from their own threads; iterate over a copy
+            for key, value in list(self.state.data.items()):
+                if key in self.exclude:
+                    continue
+                seen.add(key)
+                plain = to_plain(value)
+                encoded = json.dumps(plain, sort_keys=True, default=str)
+                if self._encoded.get(key) != encoded:
+                    self._encoded[key] = encoded
+                    self._values[key] = plain
+                    changes[key] = plain
+            removed = [key for key in self._encoded if key not in seen]
+            for key in removed:
+                del self._encoded[key]
+                del self._values[key]
+            if not changes and not removed:
+                return None
+            self.version += 1
+            self._deltas.append((self.version, changes, removed))
+            delta = {"base": self.version - 1, "version": self.version, "changes": changes, "removed": removed}
+        if self.publish_delta is not None:
+            self.publish_delta(delta)
+        return delta
+
+    def snapshot(self):
+        """The full state at the current version (after flushing pending changes)."""
+        self.flush()
+        with self._lock:
+            return {"version": self.version, "state": dict(self._values)}
+
+    def since(self, version):
+        """
+        One merged delta from `version` to the current version, or None if
+        `version` is older than the kept history (or unknown): resync with
+        a snapshot then.
+        """
+        self.flush()
+        with self._lock:
+            if version == self.version:
+                return {"base": version, "version": version, "changes": {}, "removed": []}
+            if not self._deltas or version > self.version or version < self._deltas[0][0] - 1:
+                return None
+            changes = {}
+            removed = set()
+            for delta_version, delta_changes, delta_removed in self._deltas:
+                if delta_version <= version:
+                    continue
+                for key, value in delta_changes.items():
+                    changes[key] = value
+                    removed.discard(key)
+                for key in delta_removed:
+                    changes.pop(key, None)
+                    removed.add(key)
+            return {"base": version, "version": self.version, "changes": changes, "removed": sorted(removed)}
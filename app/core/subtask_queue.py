@@ -0,0 +1,233 @@
+import heapq
+import math
+from collections import deque
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+
+class SubtaskInstance:
+    """
+    One queued execution of a subtask for a product. The same subtask id can
+    be queued for several products; each instance keeps its own resolved
+    config and timestamps. `__slots__` keeps deep queues cheap in memory.
+    """
+    __slots__ = ("instance_id", "seq", "task_id", "subtask_id", "product", "config",
+                 "priority", "deadline", "enqueued_at", "started_at", "completed_at", "config_version")
+
+    def __init__(self, instance_id, seq, task_id, subtask_id, product=None, config=None,
+                 priority=0, deadline=None, enqueued_at=None, started_at=None, completed_at=None,
+                 config_version=None):
+        self.instance_id = instance_id
+        self.seq = seq
+        self.task_id = task_id
+        self.subtask_id = subtask_id
+        self.product = product
+        self.config = config if config is not None else {}
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.started_at = started_at
+        self.completed_at = completed_at
+        self.config_version = config_version  # Config bundle the subtask started with
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{slot: data.get(slot) for slot in cls.__slots__})
+
+    def __repr__(self):
+        return f"SubtaskInstance({self.instance_id}, {self.task_id}/{self.subtask_id}, {self.product})"
+
+
+def as_sort_number(value):
+    """
+    A priority or deadline from an assignment as a finite number (None stays
+    None). Raises ValueError for anything the queue ordering can't compare.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"expected a number, got {value!r}")
+    number = float(value) if isinstance(value, str) else value
+    if not math.isfinite(number):
+        raise ValueError(f"expected a finite number, got {value!r}")
+    return number
+
+
+def changeover_group(entry):
+    """Subtasks in the same group can follow each other without a changeover."""
+    config = tuple(sorted((entry.config or {}).items()))
+    return entry.task_id, entry.subtask_id, config
+
+
+class FifoSubtaskQueue:
+    """Subtasks are executed in arrival order."""
+
+    def __init__(self):
+        self._queue = deque()
+
+    def push(self, entry, head=False):
+        if head:
+            self._queue.appendleft(entry)
+        else:
+            self._queue.append(entry)
+
+    def peek(self):
+        return self._queue[0] if self._queue else None
+
+    def pop(self):
+        return self._queue.popleft() if self._queue else None
+
+    def remove(self, entry):
+        self._queue.remove(entry)
+
+    def set_config(self, entry, config):
+        """Change a queued entry's config; arrival order is kept."""
+        entry.config = config
+
+    def set_tasks(self, tasks):
+        """Arrival order does not depend on the task definitions."""
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __iter__(self):
+        return iter(list(self._queue))
+
+
+class ChangeoverSubtaskQueue:
+    """
+    Priority queue that keeps running subtasks of the same group (task type
+    and product config) back to back, so fewer changeovers are needed.
+
+    Ordering: higher priority first, then earlier deadline, then arrival.
+    The group of the last subtask is kept while it has an entry that ranks
+    as high as the best one overall. A task is only eligible while none of
+    its `dependencies` (from rules.yaml) have pending subtasks.
+
+    Each entry lives in a per-task heap and a per-group heap; removal is
+    lazy, so push and pop are O(log n).
+    """
+
+    def __init__(self, tasks):
+        self.set_tasks(tasks)
+        self._task_heaps = {}
+        self._group_heaps = {}
+        self._pending = {}
+        self._size = 0
+        self._head = None
+        self._last_group = None
+        self._nodes = {}
+
+    def set_tasks(self, tasks):
+        """Take the dependencies from (reloaded) task definitions."""
+        self.dependencies = {
+            task_id: tuple(task_data.get("dependencies", []) or [])
+            for task_id, task_data in tasks.items()
+        }
+
+    @staticmethod
+    def _sort_key(entry):
+        # float() raises here, before the heaps are touched, for values that can't be ordered
+        deadline = float(entry.deadline) if entry.deadline is not None else float("inf")
+        return (-float(entry.priority or 0), deadline, entry.seq)
+
+    def push(self, entry, head=False):
+        """Add an entry; `head=True` pins it as the current head (e.g. an in-flight subtask)."""
+        item_key = self._sort_key(entry)
+        # Node is [entry, removed]; the unique seq in the key keeps nodes from being compared
+        node = [entry, head]
+        self._nodes[entry.seq] = node
+        if head:
+            self._head = entry
+        item = (item_key, node)
+        heapq.heappush(self._task_heaps.setdefault(entry.task_id, []), item)
+        heapq.heappush(self._group_heaps.setdefault(changeover_group(entry), []), item)
+        self._pending[entry.task_id] = self._pending.get(entry.task_id, 0) + 1
+        self._size += 1
+
+    def _top(self, heap):
+        while heap and heap[0][1][1]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _eligible(self, task_id):
+        return all(self._pending.get(dep, 0) == 0 for dep in self.dependencies.get(task_id, ()))
+
+    def _select(self):
+        best = None
+        for task_id, heap in self._task_heaps.items():
+            if not self._pending.get(task_id) or not self._eligible(task_id):
+                continue
+            top = self._top(heap)
+            if top is not None and (best is None or top[0] < best[0]):
+                best = top
+
+        if best is None:
+            # Dependency cycle in the config: fall back to plain priority order
+            logger.info("[TaskManager] No subtask has its dependencies met, ignoring dependencies.")
+            tops = [self._top(heap) for heap in self._task_heaps.values()]
+            best = min((top for top in tops if top is not None), key=lambda top: top[0])
+
+        if self._last_group is not None:
+            same_group = self._top(self._group_heaps.get(self._last_group, []))
+            if (same_group is not None and self._eligible(same_group[1][0].task_id)
+                    and same_group[0][:2] <= best[0][:2]):
+                best = same_group
+
+        # Pin the head: it stays pending (for dependencies) until popped
+        best[1][1] = True
+        return best[1][0]
+
+    def peek(self):
+        if self._head is None and self._size:
+            self._head = self._select()
+        return self._head
+
+    def pop(self):
+        entry = self.peek()
+        if entry is None:
+            return None
+        self._head = None
+        self._nodes.pop(entry.seq, None)
+        self._pending[entry.task_id] -= 1
+        self._size -= 1
+        self._last_group = changeover_group(entry)
+        return entry
+
+    def remove(self, entry):
+        node = self._nodes.pop(entry.seq)
+        node[1] = True
+        if self._head is entry:
+            self._head = None
+        self._pending[entry.task_id] -= 1
+        self._size -= 1
+
+    def set_config(self, entry, config):
+        """Change a queued entry's config, moving it to its new changeover group."""
+        self.remove(entry)
+        entry.config = config
+        # The stale node is marked removed; the new one has the same key but is never compared by entry
+        self.push(entry)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """Iterate over the head followed by the remaining entries in priority order."""
+        rest = sorted(
+            (item for heap in self._task_heaps.values() for item in heap if not item[1][1]),
+            key=lambda item: item[0]
+        )
+        head = [self._head] if self._head is not None else []
+        return iter(head + [item[1][0] for item in rest])
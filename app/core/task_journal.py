@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class TaskJournal:
+    """
+    Append-only JSON-lines journal of subtask queue events (enqueue, start,
+    complete, drop) with periodic snapshot compaction.
+
+    Every event carries an increasing id. A snapshot stores the full queue
+    state and the id of the last event it covers, so events left in the
+    journal by a crash during compaction are skipped on replay.
+    """
+
+    def __init__(self, path, snapshot_every=1000, fsync=False):
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._events_since_snapshot = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = None
+
+    def _append(self, events):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            lines = []
+            for event in events:
+                self._last_id += 1
+                event["id"] = self._last_id
+                lines.append(json.dumps(event, separators=(",", ":")))
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._events_since_snapshot += len(events)
+
+    def record_enqueue(self, entries):
+        """Record one or more enqueued subtask entries in a single write."""
+        self._append([{"e": "enqueue", **entry.to_dict()} for entry in entries])
+
+    def record_start(self, seq, start_time):
+        self._append([{"e": "start", "seq": seq, "start": start_time}])
+
+    def record_complete(self, seq, start_time, end_time):
+        self._append([{"e": "complete", "seq": seq, "start": start_time, "end": end_time}])
+
+    def record_config(self, entries):
+        """Record new product configs of pending subtasks (after a products.yaml reload)."""
+        self._append([{"e": "config", "seq": entry.seq, "config": entry.config} for entry in entries])
+
+    def record_drop(self, seqs):
+        """Record pending subtasks removed without being executed."""
+        self._append([{"e": "drop", "seq": seq} for seq in seqs])
+
+    def needs_compaction(self):
+        return self._events_since_snapshot >= self.snapshot_every
+
+    def compact(self, snapshot):
+        """Atomically write `snapshot` and truncate the journal it supersedes."""
+        started = time.perf_counter()
+        with self._lock:
+            snapshot = dict(snapshot, last_event_id=self._last_id)
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._events_since_snapshot = 0
+        logger.info(f"[TaskJournal] Compacted journal into snapshot in "
+                    f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def recover(self):
+        """
+        Rebuild the queue state from the snapshot and the journal.
+        Returns a dict with pending entries (in arrival order), counters and
+        the in-flight subtask, or None if there is nothing to recover.
+        """
+        started = time.perf_counter()
+        state = {
+            "pending": {},
+            "completed": 0,
+            "total": 0,
+            "next_seq": 0,
+            "current": None,
+        }
+        last_snapshot_id = 0
+        found = False
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            found = True
+            last_snapshot_id = snapshot.get("last_event_id", 0)
+            state["pending"] = {entry["seq"]: entry for entry in snapshot.get("pending", [])}
+            state["completed"] = snapshot.get("completed", 0)
+            state["total"] = snapshot.get("total", 0)
+            state["next_seq"] = snapshot.get("next_seq", 0)
+            state["current"] = snapshot.get("current")
+            self._last_id = last_snapshot_id
+
+        if os.path.exists(self.path):
+            with open(self.path, "rb+") as f:
+                good_end = 0
+                last_line = b""
+                for raw in f:
+                    line = raw.strip()
+                    if line:
+                        try:
+                            event = json.loads(line.decode("utf-8"))
+                        except ValueError:
+                            # A torn final write from a crash; everything before it is intact. Cut it off
+                            # so the next append starts on a fresh line instead of being glued onto it.
+                            logger.warning(f"[TaskJournal] Truncating torn journal line at byte {good_end}")
+                            f.truncate(good_end)
+                            last_line = b"\n"
+                            break
+                        found = True
+                        self._last_id = max(self._last_id, event.get("id", 0))
+                        if event.get("id", 0) > last_snapshot_id:
+                            self._apply(state, event)
+                            self._events_since_snapshot += 1
+                    good_end += len(raw)
+                    last_line = raw
+                if last_line and not last_line.endswith(b"\n"):
+                    f.seek(0, os.SEEK_END)
+                    f.write(b"\n")
+
+        if not found:
+            return None
+
+        state["pending"] = sorted(state["pending"].values(), key=lambda entry: entry["seq"])
+        logger.info(f"[TaskJournal] Recovered {len(state['pending'])} pending subtasks "
+                    f"({state['completed']} completed) in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return state
+
+    @staticmethod
+    def _apply(state, event):
+        kind = event.get("e")
+        if kind == "enqueue":
+            entry = {key: value for key, value in event.items() if key not in ("e", "id")}
+            state["pending"][entry["seq"]] = entry
+            state["total"] += 1
+            state["next_seq"] = max(state["next_seq"], entry["seq"] + 1)
+        elif kind == "start":
+            state["current"] = {"seq": event["seq"], "start": event["start"]}
+            if event["seq"] in state["pending"]:
+                state["pending"][event["seq"]]["started_at"] = event["start"]
+        elif kind == "complete":
+            if state["pending"].pop(event["seq"], None) is not None:
+                state["completed"] += 1
+            if state["current"] and state["current"]["seq"] == event["seq"]:
+                state["current"] = None
+        elif kind == "config":
+            if event["seq"] in state["pending"]:
+                state["pending"][event["seq"]]["config"] = event["config"]
+        elif kind == "drop":
+            if state["pending"].pop(event["seq"], None) is not None:
+                state["total"] -= 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
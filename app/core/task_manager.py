@@ -1,5 +1,9 @@
-import time
-from collections import deque
+import threading
+import uuid
+
+from core.duration_stats import DurationTracker
+from core.subtask_queue import SubtaskInstance, FifoSubtaskQueue, ChangeoverSubtaskQueue, changeover_group
+from utils.clock import SYSTEM_CLOCK
 
 import logging
 
@@ -10,88 +14,306 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 class TaskManager:
-    def __init__(self, tasks):
+    def __init__(self, tasks, scheduling=None, journal=None, config_version=None, clock=SYSTEM_CLOCK):
         """
         Initialize TaskManager with all possible task definitions.
         Tasks will be added one at a time from Task Division.
+        `scheduling` selects the queue order ("fifo" or "changeover").
+        With a `journal`, queue events are persisted and the queue is
+        rebuilt from it on construction. Subtask times come from `clock`.
         """
         self.tasks = tasks  # All possible subtask definitions
-        self.subtask_queue = deque()  # Queue of received subtask IDs
+        self.clock = clock
+        self.config_version = config_version
+        self._pinned_tasks = None  # Definitions the in-flight subtask started with, after a reload
+        scheduling = scheduling or {}
+        self.scheduling_mode = scheduling.get("mode", "fifo")
+        self.skip_cleaning_same_config = scheduling.get("skip_cleaning_same_config", False)
+        if self.scheduling_mode == "changeover":
+            self.subtask_queue = ChangeoverSubtaskQueue(tasks)
+        else:
+            self.subtask_queue = FifoSubtaskQueue()  # Queue of received subtasks
+        self._next_seq = 0  # Increasing sequence number of every enqueued subtask
+        self._session = uuid.uuid4().hex[:8]  # Keeps instance ids unique across restarts
 
         # For progress tracking
         self.completed_count = 0
         self.total_enqueued = 0
+        self.changeovers = 0
+        self.last_completed = None
+        self.durations = DurationTracker()  # Streaming duration statistics for ETA
 
         # For timing subtasks
         self.current_subtask_start_time = None
         self.current_subtask_end_time = None
         self.current_subtask_id = None
+        self.current_entry = None
+
+        # Guards the queue: batches are applied atomically and journal snapshots see a consistent queue
+        self._lock = threading.RLock()
+        self.journal = journal
+        if self.journal:
+            self._recover()
+
+    def _recover(self):
+        """Rebuild queue, counters and the in-flight subtask timing from the journal."""
+        recovered = self.journal.recover()
+        if not recovered:
+            return
+        self.completed_count = recovered["completed"]
+        self.total_enqueued = recovered["total"]
+        self._next_seq = recovered["next_seq"]
+
+        current = recovered["current"]
+        skipped = []
+        for data in recovered["pending"]:
+            entry = SubtaskInstance.from_dict(data)
+            in_flight = current is not None and entry.seq == current["seq"]
+            try:
+                self.subtask_queue.push(entry, head=in_flight)
+            except (TypeError, ValueError) as e:
+                # One bad entry must not keep the brain from starting
+                logger.error(f"[TaskManager] Skipped journal entry {entry.instance_id} ({entry.subtask_id}): {e}")
+                skipped.append(entry.seq)
+                continue
+            if in_flight:
+                self.current_entry = entry
+                self.current_subtask_id = entry.subtask_id
+                self.current_subtask_start_time = current["start"]
+        if skipped:
+            self.total_enqueued -= len(skipped)
+            self.journal.record_drop(skipped)
+
+    def _journal_snapshot(self):
+        return {
+            "pending": [entry.to_dict() for entry in self.subtask_queue],
+            "completed": self.completed_count,
+            "total": self.total_enqueued,
+            "next_seq": self._next_seq,
+            "current": {"seq": self.current_entry.seq, "start": self.current_subtask_start_time}
+            if self.current_entry is not None else None,
+        }
 
-    def enqueue_subtask(self, task_id, subtask_id):
+    def _maybe_compact(self):
+        if self.journal and self.journal.needs_compaction():
+            self.journal.compact(self._journal_snapshot())
+
+    def enqueue_subtask(self, task_id, subtask_id, product=None, config=None, priority=0, deadline=None):
         """Add a subtask to the queue for execution."""
-        if task_id in self.tasks and subtask_id in self.tasks[task_id]["subtasks"]:
+        self.enqueue_many([{
+            "task_id": task_id, "subtask_id": subtask_id, "product": product,
+            "config": config, "priority": priority, "deadline": deadline
+        }])
+
+    def enqueue_many(self, items):
+        """
+        Add a batch of subtasks (dicts with task_id, subtask_id and optional
+        product, config, priority, deadline) in one step. The brain loop sees
+        either none or all of the batch. Returns the number enqueued.
+        """
+        valid = []
+        for item in items:
+            task_id, subtask_id = item["task_id"], item["subtask_id"]
+            if task_id in self.tasks and subtask_id in self.tasks[task_id]["subtasks"]:
+                valid.append(item)
+            else:
+                logger.info(f"[TaskManager] Invalid subtask {subtask_id} for task {task_id}.")
+        if not valid:
+            return 0
 
-            # Add the subtask to the queue
-            self.subtask_queue.append((task_id, subtask_id))
-            logger.info(f"[TaskManager] Enqueued subtask {subtask_id} from {task_id}.")
+        with self._lock:
+            now = self.clock.time()
+            entries = []
+            for item in valid:
+                entries.append(SubtaskInstance(
+                    f"{self._session}-{self._next_seq}", self._next_seq,
+                    item["task_id"], item["subtask_id"], item.get("product"), item.get("config") or {},
+                    item.get("priority") or 0, item.get("deadline"), enqueued_at=now
+                ))
+                self._next_seq += 1
+
+            # Queue the whole batch first; if any push fails, take the batch back out
+            pushed = []
+            try:
+                for entry in entries:
+                    self.subtask_queue.push(entry)
+                    pushed.append(entry)
+            except Exception:
+                # Seq numbers are not reused: removal from the changeover queue is lazy
+                for entry in pushed:
+                    self.subtask_queue.remove(entry)
+                raise
+            # Journal only what is actually queued, so a restart can't bring back more
+            if self.journal:
+                self.journal.record_enqueue(entries)
 
             # Track the total number of tasks received
-            self.total_enqueued += 1
+            self.total_enqueued += len(entries)
+            self._maybe_compact()
 
+        if len(entries) == 1:
+            logger.info(f"[TaskManager] Enqueued subtask {entries[0].subtask_id} from {entries[0].task_id} "
+                        f"as {entries[0].instance_id}.")
         else:
-            logger.info(f"[TaskManager] Invalid subtask {subtask_id} for task {task_id}.")
+            logger.info(f"[TaskManager] Enqueued {len(entries)} subtasks.")
+        return len(entries)
+
+    def set_tasks(self, tasks, config_version=None):
+        """
+        Swap in reloaded task definitions. The in-flight subtask keeps the
+        definitions it started with; pending subtasks that no longer exist
+        are dropped. Returns the dropped entries.
+        """
+        with self._lock:
+            if self.current_entry is not None and self._pinned_tasks is None:
+                self._pinned_tasks = self.tasks
+            self.tasks = tasks
+            self.config_version = config_version
+            self.subtask_queue.set_tasks(tasks)
+
+            dropped = [
+                entry for entry in self.subtask_queue
+                if entry is not self.current_entry
+                and entry.subtask_id not in tasks.get(entry.task_id, {}).get("subtasks", {})
+            ]
+            for entry in dropped:
+                self.subtask_queue.remove(entry)
+            if dropped:
+                self.total_enqueued -= len(dropped)
+                if self.journal:
+                    self.journal.record_drop([entry.seq for entry in dropped])
+                    self._maybe_compact()
+
+        for entry in dropped:
+            logger.warning(f"[TaskManager] Dropped {entry.subtask_id} ({entry.instance_id}): "
+                           f"no longer defined in the reloaded config.")
+        return dropped
+
+    def refresh_configs(self, previous_products, products):
+        """
+        After a products.yaml reload, pending subtasks whose config was
+        resolved from the old product definition take the new one. Configs
+        sent with the assignment and the in-flight subtask are kept.
+        Returns the updated entries.
+        """
+        with self._lock:
+            updated = []
+            for entry in list(self.subtask_queue):
+                if entry is self.current_entry or entry.product not in products:
+                    continue
+                old = (previous_products.get(entry.product) or {}).get("config")
+                new = products[entry.product].get("config")
+                if old is None or new is None or entry.config != old or new == old:
+                    continue
+                self.subtask_queue.set_config(entry, dict(new))
+                updated.append(entry)
+            if updated and self.journal:
+                self.journal.record_config(updated)
+                self._maybe_compact()
+        if updated:
+            logger.info(f"[TaskManager] {len(updated)} pending subtasks now use the reloaded product configs.")
+        return updated
+
+    def _definition(self, entry):
+        tasks = self._pinned_tasks if entry is self.current_entry and self._pinned_tasks else self.tasks
+        return tasks.get(entry.task_id, {}).get("subtasks", {}).get(entry.subtask_id, None)
+
+    def _peek(self):
+        with self._lock:
+            return self.subtask_queue.peek()
 
     def get_current_subtask(self):
         """Return the current subtask at the front of the queue."""
-        if self.subtask_queue:
+        entry = self._peek()
+        if entry:
 
             # Get the task and subtask IDs
-            task_id, subtask_id = self.subtask_queue[0]
+            task_id, subtask_id = entry.task_id, entry.subtask_id
 
             # Check if we need to start timing this subtask
-            if subtask_id != self.current_subtask_id:
-                self.current_subtask_start_time = time.time()
+            if entry is not self.current_entry:
+                self.current_subtask_start_time = self.clock.time()
                 self.current_subtask_id = subtask_id
+                self.current_entry = entry
+                self._pinned_tasks = None
+                entry.started_at = self.current_subtask_start_time
+                entry.config_version = self.config_version
+                if self.journal:
+                    with self._lock:
+                        self.journal.record_start(entry.seq, self.current_subtask_start_time)
                 logger.info(f"[TaskManager] Started timing for {subtask_id}.")
 
-            return self.tasks[task_id]["subtasks"].get(subtask_id, None)
+            return self._definition(entry)
 
         return None
 
+    def get_current_instance(self):
+        """Return the queue entry (SubtaskInstance) at the front of the queue, or None."""
+        return self._peek()
+
     def get_current_subtask_id(self):
         """Return the ID of the current subtask, or None if none available."""
-        return self.subtask_queue[0][1] if self.subtask_queue else None
+        entry = self._peek()
+        return entry.subtask_id if entry else None
     
     def get_current_task_name(self):
         """Return the name and description of the current subtask"""
-        info = self.tasks[self.subtask_queue[0][0]]["subtasks"][self.subtask_queue[0][1]]
+        entry = self._peek()
+        info = self._definition(entry)
         return info['task_name']
 
     def get_current_task_id(self):
         """Return the ID of the current task based on the front of the queue."""
-        return self.subtask_queue[0][0] if self.subtask_queue else None
+        entry = self._peek()
+        return entry.task_id if entry else None
+
+    def needs_cleaning(self):
+        """
+        Whether the table must be cleaned before the next subtask.
+        Cleaning is skipped when enabled and the next subtask is in the same
+        changeover group (task type and product config) as the one just completed.
+        """
+        if not self.skip_cleaning_same_config or self.last_completed is None:
+            return True
+        entry = self._peek()
+        return entry is None or changeover_group(entry) != changeover_group(self.last_completed)
 
     def advance(self):
         """Advance to the next subtask and increment completed count."""
-        if self.subtask_queue:
+        with self._lock:
+            entry = self.subtask_queue.pop() if self.subtask_queue else None
+            if entry is None:
+                logger.info("[TaskManager] No subtasks to advance.")
+                return
+
             # Pop the current subtask from the queue
-            task_id, subtask_id = self.subtask_queue.popleft()
+            subtask_id = entry.subtask_id
+            if self.last_completed is not None and changeover_group(entry) != changeover_group(self.last_completed):
+                self.changeovers += 1
+            self.last_completed = entry
 
             # Stop timing the current subtask
-            self.current_subtask_end_time = time.time()
+            self.current_subtask_end_time = self.clock.time()
             duration = self.current_subtask_end_time - self.current_subtask_start_time
+            entry.completed_at = self.current_subtask_end_time
 
             self.completed_count += 1
+            self.durations.record(subtask_id, entry.product, duration)
+            if self.journal:
+                self.journal.record_complete(
+                    entry.seq, self.current_subtask_start_time, self.current_subtask_end_time)
+            self.current_entry = None
+            self._pinned_tasks = None
+            self._maybe_compact()
 
-            logger.info(f"[TaskManager] Completed {subtask_id} in {duration:.2f} seconds.")
-        else:
-            logger.info("[TaskManager] No subtasks to advance.")
+        logger.info(f"[TaskManager] Completed {subtask_id} ({entry.instance_id}) in {duration:.2f} seconds.")
 
     def clear(self):
         """Clear the current subtask tracking."""
         self.current_subtask_start_time = None
         self.current_subtask_end_time = None
         self.current_subtask_id = None
+        self.current_entry = None
 
     def get_progress(self):
         """Calculate the progress as a fraction of completed subtasks."""
@@ -99,11 +321,23 @@ class TaskManager:
             return 0.0
         return self.completed_count / self.total_enqueued
 
+    def get_eta(self):
+        """Forecast the time needed to finish the pending queue from past durations."""
+        elapsed = 0.0
+        if self.current_entry is not None and self.current_subtask_start_time is not None:
+            elapsed = self.clock.time() - self.current_subtask_start_time
+        with self._lock:
+            pending = list(self.subtask_queue)
+        return self.durations.forecast(pending, elapsed)
+
     def get_stats(self):
         """Return a dictionary with current task statistics."""
         return {
             "completed": self.completed_count,
             "remaining": len(self.subtask_queue),
             "total": self.total_enqueued,
-            "progress": round(self.get_progress(), 2)
+            "progress": round(self.get_progress(), 2),
+            "changeovers": self.changeovers,
+            **self.get_eta(),
+            "durations": self.durations.summary()
         }
@@ -0,0 +1,163 @@
+import re
+import threading
+import time
+from collections import deque
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# stable(Key, 1.5s) / count_changes(Key, 500ms) / absent(Key, 2) in rule conditions
+TEMPORAL_CALL = re.compile(
+    r"\b(stable|count_changes|absent)\(\s*([A-Za-z_]\w*)\s*,\s*(\d+(?:\.\d+)?)\s*(ms|s)?\s*\)")
+
+
+def _seconds(number, unit):
+    return float(number) / 1000.0 if unit == "ms" else float(number)
+
+
+def rewrite_condition(condition):
+    """
+    Turn the temporal operators of a rule condition into plain Python calls,
+    e.g. `stable(CombinationValid, 1.5s)` -> `stable('CombinationValid', 1.5)`,
+    so the condition can be compiled and evaluated like any other.
+    """
+    return TEMPORAL_CALL.sub(
+        lambda m: f"{m.group(1)}({m.group(2)!r}, {_seconds(m.group(3), m.group(4))!r})", condition)
+
+
+def temporal_terms(condition):
+    """(operator, key, seconds) of every temporal operator used in a condition."""
+    return [(op, key, _seconds(number, unit)) for op, key, number, unit in TEMPORAL_CALL.findall(condition)]
+
+
+class StableAccumulator:
+    """True once the key has held the same truthy value for the window."""
+    __slots__ = ("window", "value", "since")
+
+    def __init__(self, window, value, now):
+        self.window = window
+        self.value = value
+        self.since = now
+
+    def update(self, value, now):
+        if value != self.value:
+            self.value = value
+            self.since = now
+
+    def result(self, now):
+        return bool(self.value) and now - self.since >= self.window
+
+
+class AbsentAccumulator:
+    """True once the key has been falsy (absent, False, empty) for the window."""
+    __slots__ = ("window", "falsy_since")
+
+    def __init__(self, window, value, now):
+        self.window = window
+        self.falsy_since = None if value else now
+
+    def update(self, value, now):
+        if value:
+            self.falsy_since = None
+        elif self.falsy_since is None:
+            self.falsy_since = now
+
+    def result(self, now):
+        return self.falsy_since is not None and now - self.falsy_since >= self.window
+
+
+class ChangeCounter:
+    """Number of value changes within the window. Each change is stored once and expired once."""
+    __slots__ = ("window", "value", "changes")
+
+    def __init__(self, window, value, now):
+        self.window = window
+        self.value = value
+        self.changes = deque()
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        changes = self.changes
+        while changes and changes[0] < cutoff:
+            changes.popleft()
+
+    def update(self, value, now):
+        if value != self.value:
+            self.value = value
+            self.changes.append(now)
+            self._expire(now)
+
+    def result(self, now):
+        self._expire(now)
+        return len(self.changes)
+
+
+ACCUMULATORS = {
+    "stable": StableAccumulator,
+    "absent": AbsentAccumulator,
+    "count_changes": ChangeCounter,
+}
+
+
+class TemporalPredicates:
+    """
+    Incremental state for the temporal operators of the rules. Each distinct
+    (operator, key, window) gets one accumulator, updated from a state
+    listener as values change, so evaluating a rule costs O(1) instead of a
+    scan over history. `functions()` are the operators exposed to conditions.
+    """
+
+    def __init__(self, state, clock=time.monotonic):
+        self.state = state
+        self.clock = clock
+        self._accumulators = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+        state.add_listener(self.on_state_update)
+
+    def register(self, conditions):
+        """Create the accumulators used by `conditions` so they start tracking right away."""
+        for condition in conditions:
+            for op, key, seconds in temporal_terms(condition):
+                self._get(op, key, seconds)
+
+    def _get(self, op, key, seconds):
+        accumulator = self._accumulators.get((op, key, seconds))
+        if accumulator is None:
+            with self._lock:
+                accumulator = ACCUMULATORS[op](seconds, self.state.data.get(key), self.clock())
+                self._accumulators[(op, key, seconds)] = accumulator
+                self._by_key.setdefault(key, []).append(accumulator)
+            logger.info(f"[Rules] Tracking {op}({key}, {seconds}s)")
+        return accumulator
+
+    def on_state_update(self, key, value):
+        accumulators = self._by_key.get(key)
+        if accumulators:
+            now = self.clock()
+            with self._lock:
+                for accumulator in accumulators:
+                    accumulator.update(value, now)
+
+    def _result(self, op, key, seconds):
+        accumulator = self._get(op, key, seconds)
+        with self._lock:
+            return accumulator.result(self.clock())
+
+    def stable(self, key, seconds):
+        return self._result("stable", key, seconds)
+
+    def absent(self, key, seconds):
+        return self._result("absent", key, seconds)
+
+    def count_changes(self, key, seconds):
+        return self._result("count_changes", key, seconds)
+
+    def functions(self):
+        return {"stable": self.stable, "absent": self.absent, "count_changes": self.count_changes}
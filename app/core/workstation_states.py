@@ -6,6 +6,8 @@ logger = logging.getLogger(__name__)
 
 
 class IdleState(State):
+    tick_interval = 0.5
+
     def __init__(self):
         super().__init__(WorkstationStates.IDLE)
 
@@ -26,6 +28,8 @@ class IdleState(State):
 
 
 class WaitingForTaskState(State):
+    tick_interval = 0.2
+
     def __init__(self):
         super().__init__(WorkstationStates.WAITING_FOR_TASK)
 
@@ -61,6 +65,10 @@ class CleaningState(State):
         context.projector_publisher.send_task("CLEANING","Cleaning in progress", progress * 100)
 
     def execute(self, context):
+        # A table that only looks clean because a sensor stopped reporting is not clean
+        if context.state.data["StaleStreams"]:
+            return None
+
         # Get current sensor data
         candies = context.state.data["DetectedCandies"]
         left_hand = context.state.data['handL_data'] if context.state.data['handL_Present'] else None
@@ -101,10 +109,13 @@ class ExecutingTaskState(State):
         progress = context.task_manager.get_progress()
         logger.info(f"\033[91mExecuting subtask: {subtask_id} of task {task_id}\033[0m")
         # Update expected configuration
+        context.last_guidance = None
         if current_subtask:
-            expected_config = context.state.data['SubtaskConfigs'][subtask_id]
+            instance = context.task_manager.get_current_instance()
+            expected_config = instance.config
             context.state.update("ExpectedConfig", expected_config)
-            logger.info(f"Executing subtask: {subtask_id} with config {expected_config}")
+            logger.info(f"Executing subtask: {subtask_id} ({instance.instance_id}) for {instance.product} "
+                        f"with config {expected_config}")
             
             # Notify management interface
             task_name = context.task_manager.get_current_task_name()
@@ -115,7 +126,10 @@ class ExecutingTaskState(State):
             # transform product_description dict to string
             context.management_publisher.send_system_status("executing", f"Executing subtask {subtask_id}")
             context.management_publisher.send_state_change("waiting_for_task", "executing_task")
-            context.management_publisher.send_task_update(task_id, subtask_id, "started", progress)
+            context.management_publisher.send_task_update(
+                task_id, subtask_id, "started", progress,
+                instance_id=instance.instance_id, product=instance.product
+            )
 
         # Send initial task metadata to projector if just started
         context.projector_publisher.send_task(task_id, subtask_id + ' - ' + task_name + '-> ' +  desc ,  progress* 100)
@@ -126,15 +140,23 @@ class ExecutingTaskState(State):
         if not current_subtask:
             return WorkstationStates.WAITING_FOR_TASK
 
+        # Rules don't fire on stale sensor data; hold until the streams are back
+        if context.state.data["StaleStreams"]:
+            return None
+
         # Evaluate all rules for the current subtask
         rules = current_subtask.get("rules", [])
+        instance_id = context.task_manager.get_current_instance().instance_id
         all_rules_satisfied = True
 
         for rule_id in rules:
             rule = context.rules.get(rule_id)
-            if rule and not context.evaluator.evaluate_rule(rule["if"], context.state):
-                all_rules_satisfied = False
-                break
+            if rule:
+                passed = context.evaluator.evaluate_rule(rule["if"], context.state)
+                context.kpis.record_rule(rule_id, passed, instance_id)
+                if not passed:
+                    all_rules_satisfied = False
+                    break
 
         if all_rules_satisfied:
             subtask_id = context.task_manager.get_current_subtask_id()
@@ -149,6 +171,12 @@ class ExecutingTaskState(State):
         last_row = context.config["grid"]["rows"] - 3
         last_col = context.config["grid"]["cols"] - 1
         context.projector_publisher.highlight_cell_red(last_row, last_col)
+
+        # Guide the operator towards the expected product, only when the advice changes
+        match = context.state.data.get("ProductMatch")
+        if match and match.get("guidance") != context.last_guidance:
+            context.last_guidance = match.get("guidance")
+            context.projector_publisher.send_guidance(match)
         return None  # Stay in current state
 
     def exit(self, context):
@@ -156,68 +184,63 @@ class ExecutingTaskState(State):
 
 
 class WaitingConfirmationState(State):
+    tick_interval = 0.05
+
     def __init__(self):
         super().__init__(WorkstationStates.WAITING_CONFIRMATION)
-        
+        self.confirmation = None
+        self.subscription = None
+
+    @staticmethod
+    def confirmation_cell(context):
+        gesture = context.gestures.gestures.get("confirm")
+        if gesture is not None and getattr(gesture, "cell", None):
+            return gesture.cell
+        return context.config["grid"]["rows"] - 3, context.config["grid"]["cols"] - 1
+
+    def on_confirm(self, event):
+        self.confirmation = event
+
     def enter(self, context):
         subtask_id = context.task_manager.get_current_subtask_id()
         logger.info(f"Task rules satisfied for subtask {subtask_id}. Waiting for user confirmation...")
-        logger.info("Please place your hand in the last cell (bottom-right corner) to confirm completion")
-        
+        logger.info("Please hold your hand in the confirmation cell to confirm completion")
+
+        # The gesture engine reports a completed dwell; no per-tick cell checks
+        self.confirmation = None
+        self.subscription = context.gestures.subscribe("confirm", self.on_confirm)
+
         # Notify management interface
         context.management_publisher.send_system_status("waiting_confirmation", "Waiting for user confirmation")
         context.management_publisher.send_state_change("executing_task", "waiting_confirmation")
         context.management_publisher.send_user_action("confirmation_required", {
             "subtask_id": subtask_id,
-            "message": "Place hand in last cell to confirm completion"
+            "message": "Hold hand in the confirmation cell to confirm completion"
         })
         
-        # Highlight the confirmation cell (last row, last col)
-        last_row = context.config["grid"]["rows"] - 3
-        last_col = context.config["grid"]["cols"] - 1
-        context.projector_publisher.highlight_cell_green(last_row, last_col)
+        # Highlight the confirmation cell
+        row, col = self.confirmation_cell(context)
+        context.projector_publisher.highlight_cell_green(row, col)
         
     def execute(self, context):
-        # Check if hand is in the last cell (confirmation cell)
-        last_row = context.config["grid"]["rows"] - 3
-        last_col = context.config["grid"]["cols"] - 1
-        logger.info(f"Waiting for user confirmation in last cell ({last_row}, {last_col})")
-        # Get hand data
-        left_hand = context.state.data['handL_GridCell'] if context.state.data['handL_Present'] else None
-        right_hand = context.state.data['handR_GridCell'] if context.state.data['handR_Present'] else None
-        
-        confirmation_detected = False
-        
-        # Check if either hand is in the last cell
-        if left_hand:
-            hand_row = left_hand[0]
-            hand_col = left_hand[1]
-            if hand_row == last_row and hand_col == last_col:
-                confirmation_detected = True
-                logger.info("Left hand confirmation detected in last cell")
-                
-        if right_hand and not confirmation_detected:
-            hand_row = right_hand[0] 
-            hand_col = right_hand[1]
-            if hand_row == last_row and hand_col == last_col:
-                confirmation_detected = True
-                logger.info("Right hand confirmation detected in last cell")
-        
-        if confirmation_detected:
-            logger.info("User confirmation received - proceeding to task completion")
-            context.management_publisher.send_user_action("confirmation_received", {
-                "subtask_id": context.task_manager.get_current_subtask_id()
-            })
-            # Clear the confirmation cell highlight
-            last_row = context.config["grid"]["rows"] - 3
-            last_col = context.config["grid"]["cols"] - 1
-            context.projector_publisher.clear_cell(last_row, last_col)
-
-            return WorkstationStates.TASK_COMPLETED
-            
-        return None  # Stay in waiting confirmation state
+        if self.confirmation is None:
+            return None  # Stay in waiting confirmation state
+
+        logger.info(f"User confirmation received ({self.confirmation.get('hand')}) - proceeding to task completion")
+        context.management_publisher.send_user_action("confirmation_received", {
+            "subtask_id": context.task_manager.get_current_subtask_id(),
+            "hand": self.confirmation.get("hand")
+        })
+        # Clear the confirmation cell highlight
+        row, col = self.confirmation_cell(context)
+        context.projector_publisher.clear_cell(row, col)
+
+        return WorkstationStates.TASK_COMPLETED
         
     def exit(self, context):
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
         logger.debug("Exiting WAITING_CONFIRMATION state")
 
 
@@ -243,32 +266,48 @@ class TaskCompletedState(State):
             True
         )
 
-        # Notify task division publisher
-        subtask_id = context.task_manager.get_current_subtask_id()
+        # Notify task division publisher about the exact instance that was completed
+        completed = context.task_manager.last_completed
+        subtask_id = completed.subtask_id
         start_time = context.task_manager.current_subtask_start_time
         end_time = context.task_manager.current_subtask_end_time
         context.task_division_publisher.send_current_subtask_completed(
-            subtask_id, start_time, end_time
+            subtask_id, start_time, end_time,
+            instance_id=completed.instance_id, task_id=completed.task_id, product=completed.product
         )
         
         # Notify management interface of completion
-        task_id = context.task_manager.get_current_task_id()
+        task_id = completed.task_id
         completion_time = end_time - start_time if start_time and end_time else 0
+        context.kpis.record_completion(completed.product, completion_time)
         context.management_publisher.send_task_update(
-            task_id, subtask_id, "completed", 100.0
+            task_id, subtask_id, "completed", 100.0,
+            instance_id=completed.instance_id, product=completed.product
         )
+        completed_stats = context.task_manager.durations.by_subtask.get(subtask_id)
         context.management_publisher.send_performance_metrics({
             "task_completion_time": completion_time,
-            "subtask_id": subtask_id
+            "subtask_id": subtask_id,
+            "instance_id": completed.instance_id,
+            "product": completed.product,
+            "subtask_duration_stats": completed_stats.summary() if completed_stats else None,
+            "queue_remaining": len(context.task_manager.subtask_queue),
+            **context.task_manager.get_eta()
         })
+        context.management_publisher.send_queue_stats(context.task_manager.get_stats())
 
         # Reset state for next task
-        context.state.data["CombinationValid"] = False
+        context.state.update("CombinationValid", False)
         context.state.data["CandiesWrapped"] = False
         context.state.data["ExpectedConfig"] = {}
         context.task_manager.clear()
 
         context.management_publisher.send_system_status("task_completed", f"Subtask {subtask_id} completed successfully")
+
+        # Same product config next: no changeover, so the cleaning cycle can be skipped
+        if not context.task_manager.needs_cleaning():
+            logger.info("Next subtask uses the same configuration, skipping table cleaning")
+            return WorkstationStates.WAITING_FOR_TASK
         return WorkstationStates.CLEANING
 
     def exit(self, context):
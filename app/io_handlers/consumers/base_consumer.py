@@ -1,7 +1,11 @@
-import paho.mqtt.client as mqtt
-import threading
+import json
+import time
 from abc import ABC, abstractmethod
+from io_handlers.mqtt_link import MqttLink
 from utils.config import CONFIG
+from utils.flight_recorder import FLIGHT_RECORDER, INBOUND
+from utils.metrics import METRICS
+from utils.tracing import TRACER, producer_timestamp
 
 import logging
 
@@ -12,41 +16,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MESSAGES_RECEIVED = METRICS.counter(
+    "brain_messages_received_total", "MQTT messages received per topic", ["topic"])
+ON_MESSAGE_SECONDS = METRICS.histogram(
+    "brain_on_message_seconds", "Time spent handling one inbound message", ["topic"])
 
 
 class BaseConsumer(ABC):
-    def __init__(self, state):
+    def __init__(self, state, client_factory=None):
         self.state = state
         self.config = CONFIG
         self.broker_conf = self.config.get("mqtt", {})
-        self.client = None
-        self.thread = None
+        self.subscribe_topic = None
+        self._current_trace = None
+        # Optional SessionRecorder that captures every inbound message for replay
+        self.recorder = None
+        # Optional liveness RateMeter marked on every inbound message
+        self.rate_meter = None
+
+        # The link reconnects on its own; subscriptions are restored in on_connect
+        self.link = MqttLink(type(self).__name__, self.broker_conf, on_connect=self.on_connect,
+                             on_disconnect=self.on_disconnect, client_factory=client_factory)
+        self.client = self.link.client
+        self.client.on_message = self._dispatch_message
+        self.connected = self.link.connected
 
     def start(self, topic=None):
         """
-        Initialize the MQTT client and start listening in a background thread.
+        Start connecting in a background thread. Returns immediately; the
+        topic is subscribed on every (re)connect, so startup doesn't wait
+        for the broker and subscriptions survive broker restarts.
         """
-        self.client = mqtt.Client()
-        self.client.username_pw_set(
-            self.broker_conf.get("username", ""), self.broker_conf.get("password", "")
-        )
-        self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_message
-
-        self.client.connect(
-            self.broker_conf.get("broker_ip", "127.0.0.1"),
-            self.broker_conf.get("broker_port", 1883),
-            60
-        )
-
         # Allow subclasses to override the topic, otherwise use what's passed in
-        subscribe_topic = topic or self.get_topic()
-        if subscribe_topic:
-            self.client.subscribe(subscribe_topic)
+        self.subscribe_topic = topic or self.get_topic()
+        logger.info(f"[MQTT] Starting MQTT consumer thread..., {self.subscribe_topic}")
+        self.link.start()
 
-        self.thread = threading.Thread(target=self.client.loop_forever, daemon=True)
-        logger.info(f"[MQTT] Starting MQTT consumer thread..., {subscribe_topic}")
-        self.thread.start()
+    def stop(self):
+        self.link.stop()
 
     def get_topic(self):
         """ Override this method in subclasses to fetch the correct topic."""
@@ -54,6 +61,39 @@ class BaseConsumer(ABC):
 
     def on_connect(self, client, userdata, flags, rc):
         logger.info(f"[MQTT] Connected with result code {rc}")
+        if rc == 0 and self.subscribe_topic:
+            client.subscribe(self.subscribe_topic)
+
+    def on_disconnect(self, client, userdata, rc):
+        logger.info(f"[MQTT] Disconnected from broker with result code {rc}")
+
+    def _dispatch_message(self, client, userdata, msg):
+        """Count, time and trace every inbound message before handing it to on_message."""
+        MESSAGES_RECEIVED.inc(topic=msg.topic)
+        if self.rate_meter is not None:
+            self.rate_meter.mark()
+        if self.recorder is not None:
+            self.recorder.record(msg.topic, msg.payload)
+        FLIGHT_RECORDER.record(INBOUND, msg.topic, msg.payload)
+        trace = self._current_trace = TRACER.start(msg.topic)
+        with ON_MESSAGE_SECONDS.time(topic=msg.topic):
+            self.on_message(client, userdata, msg)
+        if trace is not None:
+            # The state now reflects this frame; the brain loop picks the trace up from here
+            trace.state_updated_at = time.perf_counter()
+            self.state.latest_trace = trace
+        self._current_trace = None
+
+    def decode_payload(self, msg):
+        """Decode a JSON payload and stamp the current trace with its producer timestamp."""
+        payload = json.loads(msg.payload.decode("utf-8"))
+        if self._current_trace is not None:
+            self._current_trace.producer_ts = producer_timestamp(payload)
+        return payload
+
+    def on_stale(self):
+        """Called on the loop thread when this consumer's stream goes stale; drop or flag what it last wrote."""
+        pass
 
     @abstractmethod
     def on_message(self, client, userdata, msg):
@@ -14,8 +14,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class CandyConsumer(BaseConsumer):
-    def __init__(self, state):
-        super().__init__(state)
+    def __init__(self, state, client_factory=None):
+        super().__init__(state, client_factory)
 
         # Load MQTT topic from global config
         self.topic = self.config.get("candy_topic", "objdet/results")
@@ -41,9 +41,17 @@ class CandyConsumer(BaseConsumer):
     #     self.state.update("DetectedCandies", detected_candies)
     #     logger.info(f"[Sim] Detected candies: {detected_candies}")
 
+    def on_stale(self):
+        """
+        No frames from the detector: keep the last counts (an empty tray must
+        not be assumed) but invalidate the combination so no rule passes on it.
+        """
+        self.state.update("CombinationValid", False)
+        self.state.data["CandiesWrapped"] = False
+
     def on_message(self, client, userdata, msg):
         try:
-            payload = json.loads(msg.payload.decode("utf-8"))
+            payload = self.decode_payload(msg)
             keys = payload.keys()
             candies_info = [key for key in keys if "yolo" in key]
             candies = {}
@@ -0,0 +1,39 @@
+from io_handlers.consumers.base_consumer import BaseConsumer
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class CommandConsumer(BaseConsumer):
+    """
+    Receives operator commands such as
+    {"command": "dump_flight_recorder", "reason": "operator"} and hands
+    the command name and the whole payload to the brain.
+    """
+
+    def __init__(self, state, on_command_callback, client_factory=None):
+        super().__init__(state, client_factory)
+        self.topic = self.config.get("command_topic", "brain/commands")
+        self.on_command_callback = on_command_callback
+
+    def get_topic(self):
+        return self.topic
+
+    def on_message(self, client, userdata, msg):
+        try:
+            payload = self.decode_payload(msg)
+            if not isinstance(payload, dict) or not isinstance(payload.get("command"), str):
+                logger.info(f"[MQTT] Warning: Expected {{\"command\": ...}}, got {payload}")
+                return
+
+            logger.info(f"[MQTT] Command received: {payload['command']}")
+            self.on_command_callback(payload["command"], payload)
+
+        except Exception as e:
+            logger.info(f"[MQTT] Error decoding command: {e}")
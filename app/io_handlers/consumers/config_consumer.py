@@ -0,0 +1,47 @@
+from io_handlers.consumers.base_consumer import BaseConsumer
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ConfigUpdateConsumer(BaseConsumer):
+    """
+    Receives rules/products documents pushed over MQTT, e.g.
+    {"rules": "<rules.yaml text>", "products": "<products.yaml text>"},
+    and hands them to the ConfigWatcher to be compiled and hot-swapped.
+    Pushed documents are not written back to the config files.
+    """
+
+    DOCUMENTS = ("rules", "products")
+
+    def __init__(self, state, on_config_callback, client_factory=None):
+        super().__init__(state, client_factory)
+        self.topic = self.config.get("config_topic", "brain/config")
+        self.on_config_callback = on_config_callback
+
+    def get_topic(self):
+        return self.topic
+
+    def on_message(self, client, userdata, msg):
+        try:
+            payload = self.decode_payload(msg)
+            if not isinstance(payload, dict):
+                logger.info(f"[MQTT] Warning: Expected a dict of config documents, got {payload}")
+                return
+
+            documents = {name: payload[name] for name in self.DOCUMENTS if isinstance(payload.get(name), str)}
+            if not documents:
+                logger.info(f"[MQTT] Warning: Config update without {' or '.join(self.DOCUMENTS)} documents")
+                return
+
+            logger.info(f"[MQTT] Config update received for {list(documents)}")
+            self.on_config_callback(documents)
+
+        except Exception as e:
+            logger.info(f"[MQTT] Error decoding config update: {e}")
@@ -1,8 +1,8 @@
-import json
 from abc import ABC
 
 from io_handlers.consumers.base_consumer import BaseConsumer
 from io_handlers.consumers.grid_mapper import GridMapper
+from core.hand_data import HandData, HAND_LANDMARKS
 
 
 import logging
@@ -15,8 +15,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class HandConsumer(BaseConsumer, ABC):
-    def __init__(self, state):
-        super().__init__(state)
+    HANDS = ("handL", "handR")
+
+    def __init__(self, state, client_factory=None):
+        super().__init__(state, client_factory)
 
         # Load MQTT topic from global config
         self.topic = self.config.get("hand_topic", "hands/position")
@@ -30,27 +32,36 @@ class HandConsumer(BaseConsumer, ABC):
             image_height=grid_conf["image_height"]
         )
 
+        # Landmark names as sent by the hand tracker (MediaPipe order by default)
+        landmarks = tuple(self.config.get("hand_landmarks", HAND_LANDMARKS))
+        for hand_label in self.HANDS:
+            if self.state.data[f"{hand_label}_data"].names != landmarks:
+                self.state.data[f"{hand_label}_data"] = HandData(hand_label, landmarks)
+
     def get_topic(self):
         return self.topic
 
+    def on_stale(self):
+        """No frames from the hand tracker: forget the hands, so a frozen position can't confirm anything."""
+        for hand_label in self.HANDS:
+            self.state.data[f"{hand_label}_data"].clear()
+            self.state.update(f"{hand_label}_GridCell", None)
+            self.state.register_hand_presence(hand_label, False)
+
     def on_message(self, client, userdata, msg):
         try:
-            payload = json.loads(msg.payload.decode("utf-8"))
+            payload = self.decode_payload(msg)
 
-            for hand_label in ["handL", "handR"]:
-                x_key = f"{hand_label}_Wrist_x"
-                y_key = f"{hand_label}_Wrist_y"
-                
-                if x_key in payload and y_key in payload:
-                    x = float(payload[x_key]) * self.grid_mapper.image_width
-                    y = float(payload[y_key]) * self.grid_mapper.image_height
-                    cell = self.grid_mapper.get_grid_cell(x, y)
+            for hand_label in self.HANDS:
+                hand = self.state.data[f"{hand_label}_data"]
+                if hand.update(payload):
+                    x, y = hand.anchor()
+                    cell = self.grid_mapper.get_grid_cell(
+                        x * self.grid_mapper.image_width, y * self.grid_mapper.image_height)
 
                     self.state.update(f"{hand_label}_GridCell", cell)
                     self.state.register_hand_presence(hand_label, True)
-                    # logger.info(f"[MQTT] {hand_label} at ({x:.1f}, {y:.1f}) → Grid Cell {cell}")
                 else:
-                    # logger.info(f"[MQTT] Missing coordinates for {hand_label}")
                     self.state.update(f"{hand_label}_GridCell", None)
                     self.state.register_hand_presence(hand_label, False)
 
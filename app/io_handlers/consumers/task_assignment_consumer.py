@@ -13,8 +13,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TaskAssignmentConsumer(BaseConsumer, ABC):
-    def __init__(self, state, on_assignment_callback):
-        super().__init__(state)
+    def __init__(self, state, on_assignment_callback, client_factory=None):
+        super().__init__(state, client_factory)
 
         self.topic = self.config.get("task_assignment_topic", "tasks/publish")
         logger.info(self.topic)
@@ -28,6 +28,12 @@ class TaskAssignmentConsumer(BaseConsumer, ABC):
     def get_topic(self):
         return self.topic
 
+    @staticmethod
+    def _per_product(value, product):
+        if isinstance(value, dict):
+            return value.get(product)
+        return value
+
     """def on_message(self, client, userdata, msg):
         try:
             payload = json.loads(msg.payload.decode("utf-8"))
@@ -52,8 +58,7 @@ class TaskAssignmentConsumer(BaseConsumer, ABC):
 
     def on_message(self, client, userdata, msg):
         try:
-            raw_payload = msg.payload.decode("utf-8")
-            payload = json.loads(raw_payload)
+            payload = self.decode_payload(msg)
 
             # Verifica se ainda é string aninhada
             if isinstance(payload, str):
@@ -65,14 +70,21 @@ class TaskAssignmentConsumer(BaseConsumer, ABC):
                 logger.info(f"[MQTT] Warning: Expected dict with 'tasks' key, got {payload}")
                 return
 
+            # Collect the whole message so it is enqueued in one step
+            assignments = []
             for product, subtasks in payload['tasks'].items():
+                # Optional scheduling hints, either one value or one per product
+                priority = self._per_product(payload.get('priority'), product)
+                deadline = self._per_product(payload.get('deadline'), product)
                 for subtask in subtasks:
+                    assignment = {"task_id": subtask, "product": product,
+                                  "priority": priority, "deadline": deadline}
                     if subtask in self.base_products:
-                        logger.info(f"[MQTT-Tasks] Subtask {subtask} for product {self.base_products[subtask]}")
-                        self.on_assignment_callback({"task_id": subtask, "config": self.base_products[subtask]})
-                    else:
-                        logger.info(f"[MQTT-Tasks] Subtask {subtask} for product {product}")
-                        self.on_assignment_callback({"task_id": subtask, "product": product})
+                        assignment["config"] = self.base_products[subtask]
+                    assignments.append(assignment)
+
+            logger.info(f"[MQTT-Tasks] {len(assignments)} subtasks for products {list(payload['tasks'].keys())}")
+            self.on_assignment_callback(assignments)
 
         except Exception as e:
             logger.info(f"[MQTT] Error decoding task assignment: {e}")
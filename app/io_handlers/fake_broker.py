@@ -0,0 +1,197 @@
+import queue
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class FakeMessage:
+    __slots__ = ("topic", "payload", "qos", "retain")
+
+    def __init__(self, topic, payload, qos=0, retain=False):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+
+
+class FakeResult:
+    __slots__ = ("rc", "mid")
+
+    def __init__(self, rc, mid=0):
+        self.rc = rc
+        self.mid = mid
+
+
+def _as_bytes(payload):
+    if payload is None:
+        return b""
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    return bytes(payload)
+
+
+class FakeClient:
+    """
+    Stand-in for paho's Client, bound to a FakeBroker. Implements the part
+    of the client API that MqttLink, the consumers and the publishers use;
+    callbacks follow the VERSION1 signatures. In queued mode messages wait
+    in a bounded inbox and are handled on the client's own thread, like a
+    real client; messages arriving while the inbox is full are dropped.
+    """
+
+    def __init__(self, broker, queue_size=None):
+        self.broker = broker
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_message = None
+        self.is_connected_flag = False
+        self.delivered = 0
+        self.dropped = 0
+        self._pending_connect = False
+        self._wake = threading.Event()
+        self._inbox = queue.Queue(queue_size) if queue_size else None
+        self._worker = None
+
+    def username_pw_set(self, username, password=None):
+        pass
+
+    def connect(self, host="localhost", port=1883, keepalive=60):
+        self.is_connected_flag = True
+        self._pending_connect = True
+        if self._inbox is not None and self._worker is None:
+            self._worker = threading.Thread(target=self._work, name="fake-mqtt-inbox", daemon=True)
+            self._worker.start()
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop(self, timeout=1.0):
+        """Network loop step: reports the connection, then just waits (delivery is synchronous)."""
+        if not self.is_connected_flag:
+            return mqtt.MQTT_ERR_NO_CONN
+        if self._pending_connect:
+            self._pending_connect = False
+            if self.on_connect:
+                self.on_connect(self, None, {}, 0)
+        else:
+            self._wake.wait(timeout)
+        return mqtt.MQTT_ERR_SUCCESS if self.is_connected_flag else mqtt.MQTT_ERR_NO_CONN
+
+    def disconnect(self):
+        was_connected = self.is_connected_flag
+        self.is_connected_flag = False
+        self.broker.unsubscribe_all(self)
+        self._wake.set()
+        if self._worker is not None:
+            self._inbox.put(None)
+            self._worker = None
+        if was_connected and self.on_disconnect:
+            self.on_disconnect(self, None, 0)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def subscribe(self, topic, qos=0):
+        self.broker.subscribe(self, topic)
+        return mqtt.MQTT_ERR_SUCCESS, 0
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        if not self.is_connected_flag:
+            return FakeResult(mqtt.MQTT_ERR_NO_CONN)
+        self.broker.publish(topic, payload, qos, sender=self)
+        return FakeResult(mqtt.MQTT_ERR_SUCCESS)
+
+    def deliver(self, message):
+        if self._inbox is None:
+            self._handle(message)
+            return
+        try:
+            self._inbox.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def pending(self):
+        """Messages waiting in the inbox (queued mode)."""
+        return self._inbox.qsize() if self._inbox is not None else 0
+
+    def _handle(self, message):
+        self.delivered += 1
+        if self.on_message:
+            self.on_message(self, None, message)
+
+    def _work(self):
+        inbox = self._inbox
+        while True:
+            message = inbox.get()
+            if message is None:
+                return
+            try:
+                self._handle(message)
+            except Exception as e:
+                logger.error(f"[FakeBroker] on_message failed: {e}")
+
+
+class FakeBroker:
+    """
+    In-process MQTT broker for replays and tests. By default messages are
+    delivered synchronously on the publishing thread, in publish order, so
+    a run is deterministic; with `queue_size` every client gets a bounded
+    inbox and its own thread instead (see FakeClient), for load tests. Every message published by a client is kept in
+    `published` as (timestamp, topic, payload bytes, qos), with timestamps
+    from `clock` (unless `keep_published` is off, for long simulations).
+    Pass `client_factory` wherever a paho client factory is accepted.
+    """
+
+    def __init__(self, clock=time.time, keep_published=True, queue_size=None):
+        self.clock = clock
+        self.keep_published = keep_published
+        self.queue_size = queue_size
+        self.clients = []
+        self.published = []
+        self._subscriptions = []
+        self._routes = {}  # topic -> matching subscribers, rebuilt when subscriptions change
+        self._lock = threading.Lock()
+
+    def client_factory(self):
+        client = FakeClient(self, self.queue_size)
+        with self._lock:
+            self.clients.append(client)
+        return client
+
+    def subscribe(self, client, topic):
+        with self._lock:
+            if (client, topic) not in self._subscriptions:
+                self._subscriptions.append((client, topic))
+                self._routes.clear()
+
+    def unsubscribe_all(self, client):
+        with self._lock:
+            self._subscriptions = [(c, topic) for c, topic in self._subscriptions if c is not client]
+            self._routes.clear()
+
+    def publish(self, topic, payload, qos=0, sender=None):
+        """Deliver a message to every matching subscriber. `sender=None` injects it from outside."""
+        payload = _as_bytes(payload)
+        with self._lock:
+            if sender is not None and self.keep_published:
+                self.published.append((self.clock(), topic, payload, qos))
+            subscribers = self._routes.get(topic)
+            if subscribers is None:
+                subscribers = self._routes[topic] = [
+                    client for client, sub in self._subscriptions if mqtt.topic_matches_sub(sub, topic)]
+        message = FakeMessage(topic, payload, qos)
+        for client in subscribers:
+            client.deliver(message)
+        return len(subscribers)
+
+    def take_published(self):
+        """Return and clear the messages published by clients so far."""
+        with self._lock:
+            published, self.published = self.published, []
+        return published
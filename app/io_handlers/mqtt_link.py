@@ -0,0 +1,115 @@
+import random
+import threading
+
+import paho.mqtt.client as mqtt
+
+from utils.metrics import METRICS
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+RECONNECTS = METRICS.counter(
+    "brain_mqtt_reconnects_total", "MQTT connections established after the first one", ["link"])
+CONNECT_FAILURES = METRICS.counter(
+    "brain_mqtt_connect_failures_total", "Failed MQTT connection attempts", ["link"])
+LINK_UP = METRICS.gauge("brain_mqtt_link_up", "1 while the MQTT link is connected", ["link"])
+
+
+class Backoff:
+    """Exponential backoff with full jitter: each delay is uniform in [0, min(cap, base * 2^n)]."""
+
+    def __init__(self, base=0.5, cap=30.0, rng=random.random):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+        self.attempt = 0
+
+    def next(self):
+        delay = self.rng() * min(self.cap, self.base * (2 ** self.attempt))
+        self.attempt += 1
+        return delay
+
+    def reset(self):
+        self.attempt = 0
+
+
+class MqttLink:
+    """
+    One MQTT client driven by its own network thread. Lost or failed
+    connections are retried with jittered exponential backoff, so clients
+    of a whole line don't reconnect to a restarted broker in lockstep.
+    `on_connect` / `on_disconnect` are called on the network thread.
+    """
+
+    def __init__(self, name, broker_conf, on_connect=None, on_disconnect=None, client_factory=None):
+        self.name = name
+        self.broker_conf = broker_conf
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.client = (client_factory or mqtt.Client)()
+        self.client.username_pw_set(
+            broker_conf.get("username", ""), broker_conf.get("password", "")
+        )
+        self.client.on_connect = self._handle_connect
+        self.client.on_disconnect = self._handle_disconnect
+        self.backoff = Backoff(
+            broker_conf.get("reconnect_min_delay", 0.5), broker_conf.get("reconnect_max_delay", 30.0))
+        self.connected = threading.Event()
+        self.connections = 0
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"mqtt-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.client.disconnect()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+
+    def _run(self):
+        host = self.broker_conf.get("broker_ip", "localhost")
+        port = self.broker_conf.get("broker_port", 1883)
+        while not self._stop.is_set():
+            try:
+                self.client.connect(host, port, self.broker_conf.get("keepalive", 60))
+            except (OSError, ValueError) as e:
+                CONNECT_FAILURES.inc(link=self.name)
+                self._wait_retry(f"connect to {host}:{port} failed ({e})")
+                continue
+
+            rc = mqtt.MQTT_ERR_SUCCESS
+            while not self._stop.is_set() and rc == mqtt.MQTT_ERR_SUCCESS:
+                rc = self.client.loop(timeout=1.0)
+            if not self._stop.is_set():
+                self._wait_retry(f"connection lost ({rc})")
+
+    def _wait_retry(self, reason):
+        delay = self.backoff.next()
+        logger.info(f"[MQTT] {self.name}: {reason}, retrying in {delay:.2f} s")
+        self._stop.wait(delay)
+
+    def _handle_connect(self, client, userdata, flags, rc):
+        if rc == 0:
+            if self.connections:
+                RECONNECTS.inc(link=self.name)
+            self.connections += 1
+            self.backoff.reset()
+            self.connected.set()
+            LINK_UP.set(1, link=self.name)
+        if self.on_connect:
+            self.on_connect(client, userdata, flags, rc)
+
+    def _handle_disconnect(self, client, userdata, rc):
+        self.connected.clear()
+        LINK_UP.set(0, link=self.name)
+        if self.on_disconnect:
+            self.on_disconnect(client, userdata, rc)
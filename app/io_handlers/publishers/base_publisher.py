@@ -1,6 +1,13 @@
 import json
+import os
+import threading
 import paho.mqtt.client as mqtt
+from io_handlers.mqtt_link import MqttLink
+from io_handlers.publishers.outbox import Outbox
 from utils.config import CONFIG
+from utils.flight_recorder import FLIGHT_RECORDER, OUTBOUND
+from utils.metrics import METRICS
+from utils.tracing import TRACER
 import logging
 
 # Configure logging
@@ -9,37 +16,109 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+
+MESSAGES_PUBLISHED = METRICS.counter(
+    "brain_messages_published_total", "MQTT messages published per topic", ["topic"])
+PUBLISH_FAILURES = METRICS.counter(
+    "brain_publish_failures_total", "MQTT publishes that failed per topic", ["topic"])
+OUTBOX_DEPTH = METRICS.gauge(
+    "brain_outbox_messages", "Messages waiting for the broker per publisher", ["link"])
+OUTBOX_DROPPED = METRICS.counter(
+    "brain_outbox_dropped_total", "Queued messages dropped because the outbox was full", ["link"])
+
+
 class BasePublisher:
-    def __init__(self, state):
+    def __init__(self, state, client_factory=None):
         self.state = state
 
         # Load configuration from YAML
         self.config = CONFIG
         self.mqtt_conf = self.config.get("mqtt", {})
+        self.name = type(self).__name__
 
-        # MQTT client setup
-        self.client = mqtt.Client()
-        self.client.username_pw_set(
-            self.mqtt_conf.get("username", ""), self.mqtt_conf.get("password", "")
-        )
-        self.client.connect(
-            self.mqtt_conf.get("broker_ip", "localhost"),
-            self.mqtt_conf.get("broker_port", 1883),
-            60
+        # MQTT link setup; the connection is opened by start()
+        self.link = MqttLink(self.name, self.mqtt_conf, on_connect=self.on_connect,
+                             on_disconnect=self.on_disconnect, client_factory=client_factory)
+        self.client = self.link.client
+        self.connected = self.link.connected
+
+        # Messages published while the broker is unreachable wait here, in order
+        outbox_conf = self.config.get("outbox", {})
+        spill_dir = outbox_conf.get("spill_dir")
+        self.outbox = Outbox(
+            max_messages=outbox_conf.get("max_messages", 1000),
+            spill_path=os.path.join(spill_dir, f"{self.name}.jsonl") if spill_dir else None
         )
-        self.client.loop_start()  # <-- important for async publishing
+        self._send_lock = threading.Lock()
+        OUTBOX_DEPTH.set(len(self.outbox), link=self.name)
+
+    def start(self):
+        """Start connecting in the background; returns without waiting for the broker."""
+        self.link.start()
 
-    def publish(self, topic, data):
+    def on_connect(self, client, userdata, flags, rc):
+        logger.info(f"[MQTT] Publisher connected with result code {rc}")
+        if rc == 0:
+            self.drain()
+
+    def on_disconnect(self, client, userdata, rc):
+        logger.info(f"[MQTT] Publisher disconnected with result code {rc}")
+
+    def drain(self):
+        """Send queued messages in order until the outbox is empty or a send fails."""
+        with self._send_lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        sent = 0
+        while self.connected.is_set():
+            message = self.outbox.peek()
+            if message is None:
+                break
+            topic, payload, qos = message
+            if self.client.publish(topic, payload, qos=qos).rc != mqtt.MQTT_ERR_SUCCESS:
+                break
+            self.outbox.pop()
+            MESSAGES_PUBLISHED.inc(topic=topic)
+            sent += 1
+        OUTBOX_DEPTH.set(len(self.outbox), link=self.name)
+        if sent:
+            logger.info(f"[MQTT] {self.name}: sent {sent} queued messages, {len(self.outbox)} left")
+
+    def publish(self, topic, data, qos=0):
+        """
+        Publish `data` as JSON. While disconnected (or while older messages
+        are still queued) the message goes to the outbox instead. Use qos=1
+        for events that must survive a connection drop mid-flight.
+        """
         try:
             payload = json.dumps(data)
-            result = self.client.publish(topic, payload)
-            if result.rc != mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"[MQTT] Failed to publish to {topic}: {result.rc}")
-            else:
-                logger.info(f"[MQTT] Published to {topic}: {payload}")
         except Exception as e:
+            PUBLISH_FAILURES.inc(topic=topic)
             logger.info(f"[MQTT] Error publishing to {topic}: {e}")
+            return
+        FLIGHT_RECORDER.record(OUTBOUND, topic, payload)
+
+        with self._send_lock:
+            # A send that failed while connected leaves messages queued with no reconnect to drain them
+            if self.connected.is_set() and len(self.outbox):
+                self._drain_locked()
+            if self.connected.is_set() and not len(self.outbox):
+                result = self.client.publish(topic, payload, qos=qos)
+                if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                    MESSAGES_PUBLISHED.inc(topic=topic)
+                    TRACER.mark_publish(topic)
+                    logger.info(f"[MQTT] Published to {topic}: {payload}")
+                    return
+                PUBLISH_FAILURES.inc(topic=topic)
+                logger.info(f"[MQTT] Failed to publish to {topic}: {result.rc}, queued")
+            dropped = self.outbox.dropped
+            self.outbox.append(topic, payload, qos)
+            if self.outbox.dropped != dropped:
+                OUTBOX_DROPPED.inc(link=self.name)
+            OUTBOX_DEPTH.set(len(self.outbox), link=self.name)
+            logger.info(f"[MQTT] {self.name} offline, queued message for {topic} ({len(self.outbox)} waiting)")
 
     def stop(self):
-        self.client.loop_stop()
-        self.client.disconnect()
+        self.link.stop()
+        self.outbox.close()
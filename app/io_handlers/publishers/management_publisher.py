@@ -1,21 +1,27 @@
-import time
 import logging
 
 from io_handlers.publishers.base_publisher import BasePublisher
 from utils.config import CONFIG
+from utils.clock import SYSTEM_CLOCK
 logger = logging.getLogger(__name__)
 
 
 class ManagementInterfacePublisher(BasePublisher):
-    def __init__(self, state):
-        super().__init__(state)
+    def __init__(self, state, client_factory=None, clock=SYSTEM_CLOCK):
+        super().__init__(state, client_factory)
+        self.clock = clock
         self.config = CONFIG
         self.topic = self.config.get("management_topic", "management/interface")
+        self.metrics_topic = self.config.get("metrics_topic", "management/metrics")
+        self.kpi_topic = self.config.get("kpis", {}).get("topic", "management/kpis")
+        state_sync_conf = self.config.get("state_sync", {})
+        self.state_delta_topic = state_sync_conf.get("delta_topic", "brain/state/delta")
+        self.state_response_topic = state_sync_conf.get("response_topic", "brain/state/response")
 
     def send_system_status(self, status: str, message: str = ""):
         """Send system status updates to management interface."""
         data = {
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "type": "system_status",
             "status": status,  # "idle", "active", "error", "cleaning", etc.
             "message": message
@@ -26,7 +32,7 @@ class ManagementInterfacePublisher(BasePublisher):
     def send_state_change(self, from_state: str, to_state: str):
         """Notify management interface of state transitions."""
         data = {
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "type": "state_transition",
             "from_state": from_state,
             "to_state": to_state
@@ -34,18 +40,21 @@ class ManagementInterfacePublisher(BasePublisher):
         logger.debug(f"State transition: {from_state} -> {to_state}")
         self.publish(self.topic, data)
 
-    def send_task_update(self, task_id: str, subtask_id: str, status: str, progress: float = 0.0):
+    def send_task_update(self, task_id: str, subtask_id: str, status: str, progress: float = 0.0,
+                         instance_id: str = None, product: str = None):
         """Send task progress updates to management interface."""
         data = {
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "type": "task_update",
             "task_id": task_id,
             "subtask_id": subtask_id,
+            "instance_id": instance_id,
+            "product": product,
             "status": status,  # "started", "in_progress", "waiting_confirmation", "completed", "failed"
             "progress": round(progress, 2)
         }
         logger.debug(f"Task update: {subtask_id} - {status} ({progress}%)")
-        self.publish(self.topic, data)
+        self.publish(self.topic, data, qos=1 if status == "completed" else 0)
 
     def send_user_action(self, action_type: str, details: dict = {}):
         self.publish(self.topic, {"type": "user_action", "action": action_type, "details": details})
@@ -55,11 +64,29 @@ class ManagementInterfacePublisher(BasePublisher):
     
     def send_performance_metrics(self, metrics: dict = {}):
         self.publish(self.topic, {"type": "performance_metrics", "metrics": metrics})
+
+    def send_queue_stats(self, stats: dict):
+        """Send queue progress, ETA forecast and duration percentiles."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "queue_stats",
+            "stats": stats
+        }
+        self.publish(self.topic, data)
+
+    def send_metrics_snapshot(self, snapshot: dict):
+        """Send a snapshot of the process metrics registry to the metrics topic."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "metrics_snapshot",
+            **snapshot
+        }
+        self.publish(self.metrics_topic, data)
         
     # def send_sensor_data_summary(self, candies_count: int, hands_detected: dict):
     #     """Send sensor data summary to management interface."""
     #     data = {
-    #         "timestamp": time.time(),
+    #         "timestamp": self.clock.time(),
     #         "type": "sensor_summary",
     #         "candies_detected": candies_count,
     #         "hands_detected": hands_detected,  # {"left": bool, "right": bool}
@@ -69,7 +96,7 @@ class ManagementInterfacePublisher(BasePublisher):
     def send_rule_evaluation(self, rule_id: str, satisfied: bool, details: str = ""):
         """Send rule evaluation results to management interface."""
         data = {
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "type": "rule_evaluation",
             "rule_id": rule_id,
             "satisfied": satisfied,
@@ -77,3 +104,102 @@ class ManagementInterfacePublisher(BasePublisher):
         }
         logger.debug(f"Rule evaluation: {rule_id} - {'PASS' if satisfied else 'FAIL'}")
         self.publish(self.topic, data)
+
+    def send_config_reload(self, version: str, status: str, source: str = "", compile_ms: float = None,
+                           swap_ms: float = None, dropped: list = None, errors: str = None):
+        """Report a config hot-reload attempt and the config version now active."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "config_reload",
+            "status": status,  # "applied", "unchanged" or "rejected"
+            "version": version,
+            "source": source,
+            "compile_ms": compile_ms,
+            "swap_ms": swap_ms,
+            "dropped": dropped or [],
+            "errors": errors
+        }
+        logger.debug(f"Config reload {status}: {version}")
+        self.publish(self.topic, data)
+
+    def send_startup_report(self, report: dict):
+        """Send the startup phase timings (cold-start tracking)."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "startup_report",
+            **report
+        }
+        self.publish(self.topic, data)
+
+    def send_flight_recorder_dump(self, reason: str, path: str):
+        """Report that the flight recorder was dumped to disk, and why."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "flight_recorder_dump",
+            "reason": reason,
+            "path": path
+        }
+        self.publish(self.topic, data)
+
+    def send_kpi_rollup(self, windows: dict):
+        """Send the windowed shift KPIs (see core.kpi) to the KPI topic."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "kpi_rollup",
+            "windows": windows
+        }
+        self.publish(self.kpi_topic, data)
+
+    def send_stream_liveness(self, stream: str, stale: bool, status: dict):
+        """Report a sensor stream going stale or coming back."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "stream_liveness",
+            "stream": stream,
+            "stale": stale,
+            **status
+        }
+        self.publish(self.topic, data)
+
+    def send_stream_rates(self, streams: dict):
+        """Send the live message rate and gap of every watched sensor stream."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "stream_rates",
+            "streams": streams
+        }
+        self.publish(self.topic, data)
+
+    def send_state_delta(self, delta: dict):
+        """Send the state keys changed since the previous version (see core.state_sync)."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": "state_delta",
+            **delta
+        }
+        self.publish(self.state_delta_topic, data)
+
+    def reply_topic(self, reply_to):
+        """
+        The topic to answer a get_state on: `reply_to` if it is under the
+        response topic (e.g. "brain/state/response/dash-1"), else the response
+        topic itself, so a request can't make the brain publish anywhere else.
+        """
+        prefix = self.state_response_topic + "/"
+        if not reply_to:
+            return self.state_response_topic
+        if (not isinstance(reply_to, str) or not reply_to.startswith(prefix) or len(reply_to) == len(prefix)
+                or "+" in reply_to or "#" in reply_to):
+            logger.warning(f"[StateSync] Ignoring reply_to {reply_to!r}: not under {prefix}")
+            return self.state_response_topic
+        return reply_to
+
+    def send_state_response(self, kind: str, body: dict, request_id=None, reply_to: str = None):
+        """Answer a get_state command with a "state_snapshot" or a merged "state_delta"."""
+        data = {
+            "timestamp": self.clock.time(),
+            "type": kind,
+            "request_id": request_id,
+            **body
+        }
+        self.publish(self.reply_topic(reply_to), data)
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+from collections import deque
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """
+    Bounded FIFO of (topic, payload, qos) messages waiting for the broker.
+
+    Up to `max_messages` are kept in memory. Beyond that they are appended
+    to the JSON-lines `spill_path` if one is given (and read back in order
+    as memory frees up), otherwise the oldest message is dropped. Once a
+    spill has started, new messages go to disk behind it so order is kept.
+    A spill file left by a previous run is drained too; lines torn by a
+    crash mid-write are dropped from it first.
+    """
+
+    def __init__(self, max_messages=1000, spill_path=None):
+        self.max_messages = max_messages
+        self.spill_path = spill_path
+        self.dropped = 0
+        self.spilled = 0
+        self._memory = deque()
+        self._lock = threading.Lock()
+        self._spill_file = None
+        self._spill_offset = 0
+        self._spill_count = 0
+
+        if spill_path:
+            directory = os.path.dirname(spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(spill_path):
+                self._spill_count = self._repair_spill()
+                if self._spill_count:
+                    logger.info(f"[Outbox] {self._spill_count} messages left in {spill_path} from a previous run")
+
+    @staticmethod
+    def _decode(line):
+        """The (topic, payload, qos) of a spill line, or None if it was torn."""
+        try:
+            message = json.loads(line)
+            return message["topic"], message["payload"], message.get("qos", 0)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _repair_spill(self):
+        """
+        Rewrite the spill file without undecodable lines, so appends start
+        on a fresh line instead of being glued onto a torn one. Returns the
+        number of messages kept.
+        """
+        with open(self.spill_path, encoding="utf-8", errors="replace") as f:
+            lines = [line for line in f if line.strip()]
+        kept = [line.rstrip("\n") for line in lines if self._decode(line) is not None]
+        if len(kept) == len(lines) and (not lines or lines[-1].endswith("\n")):
+            return len(kept)
+        logger.warning(f"[Outbox] Dropped {len(lines) - len(kept)} torn lines from {self.spill_path}")
+        tmp_path = self.spill_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in kept))
+        os.replace(tmp_path, self.spill_path)
+        return len(kept)
+
+    def __len__(self):
+        return len(self._memory) + self._spill_count
+
+    def append(self, topic, payload, qos=0):
+        with self._lock:
+            if self._spill_count == 0 and len(self._memory) < self.max_messages:
+                self._memory.append((topic, payload, qos))
+            elif self.spill_path:
+                self._spill(topic, payload, qos)
+            else:
+                self._memory.popleft()
+                self._memory.append((topic, payload, qos))
+                self.dropped += 1
+
+    def peek(self):
+        with self._lock:
+            if not self._memory and self._spill_count:
+                self._load_spilled()
+            return self._memory[0] if self._memory else None
+
+    def pop(self):
+        with self._lock:
+            if not self._memory and self._spill_count:
+                self._load_spilled()
+            return self._memory.popleft() if self._memory else None
+
+    def _spill(self, topic, payload, qos):
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "a", encoding="utf-8")
+        self._spill_file.write(json.dumps({"topic": topic, "payload": payload, "qos": qos}) + "\n")
+        self._spill_file.flush()
+        self._spill_count += 1
+        self.spilled += 1
+
+    def _load_spilled(self):
+        """Move the next chunk of spilled messages back into memory."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        consumed = 0
+        with open(self.spill_path, encoding="utf-8", errors="replace") as f:
+            f.seek(self._spill_offset)
+            while len(self._memory) < self.max_messages:
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                consumed += 1
+                message = self._decode(line)
+                if message is None:
+                    logger.warning(f"[Outbox] Skipping an undecodable line in {self.spill_path}")
+                    continue
+                self._memory.append(message)
+            self._spill_offset = f.tell()
+            exhausted = not f.readline()
+
+        if exhausted:
+            os.remove(self.spill_path)
+            self._spill_offset = 0
+            self._spill_count = 0
+        else:
+            self._spill_count -= consumed
+
+    def close(self):
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
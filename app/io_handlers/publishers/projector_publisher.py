@@ -2,8 +2,8 @@ from io_handlers.publishers.base_publisher import BasePublisher
 from utils.config import CONFIG
 
 class ProjectorPublisher(BasePublisher):
-    def __init__(self, state):
-        super().__init__(state)
+    def __init__(self, state, client_factory=None):
+        super().__init__(state, client_factory)
         self.config = CONFIG
         self.topic = self.config.get("projector_topic", "projector/control")
         self.colNames = ['A', 'B', 'C', 'D', 'E']
@@ -42,6 +42,16 @@ class ProjectorPublisher(BasePublisher):
         }
         self.publish(self.topic, message)
 
+    def send_guidance(self, match: dict):
+        """Tell the operator which product is on the tray and what to change."""
+        message = {
+            "guidance": match.get("guidance", ""),
+            "identified_product": match.get("product") if match.get("exact") else None,
+            "nearest_product": match.get("product"),
+            "deficits": match.get("deficits", {})
+        }
+        self.publish(self.topic, message)
+
     def task_complete(self, task_complete: bool):
         message = {
             "completed": task_complete
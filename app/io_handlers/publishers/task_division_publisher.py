@@ -13,17 +13,22 @@ logger = logging.getLogger(__name__)
 
 
 class TaskDivisionPublisher(BasePublisher):
-    def __init__(self, state):
-        super().__init__(state)
+    def __init__(self, state, client_factory=None):
+        super().__init__(state, client_factory)
         self.config = CONFIG
         self.topic = self.config.get("task_division_topic", "tasks/subscribe/brain")
         logger.info(f"AAAAAAAA: {self.topic}")
 
-    def send_current_subtask_completed(self, subtask_id: str, start_time: float, end_time: float):
+    def send_current_subtask_completed(self, subtask_id: str, start_time: float, end_time: float,
+                                       instance_id: str = None, task_id: str = None, product: str = None):
         payload = {
             "subtask_id": subtask_id,
+            "instance_id": instance_id,
+            "task_id": task_id,
+            "product": product,
             "start_time": start_time,
             "end_time": end_time,
             "duration": end_time - start_time,
         }
-        self.publish(self.topic, payload)
+        # QoS 1: completions must survive a broker restart
+        self.publish(self.topic, payload, qos=1)
@@ -0,0 +1,120 @@
+import os
+import struct
+import threading
+import time
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WBSESS1\n"
+# Per message: timestamp (seconds), topic length, payload length; then the topic and payload bytes
+RECORD = struct.Struct("<dHI")
+
+
+class SessionRecorder:
+    """
+    Append-only binary log of MQTT messages, used to reproduce a session
+    with the replay tool. Each record is a fixed 14-byte header followed by
+    the raw topic and payload, so recording costs one buffered write per
+    message. Timestamps are wall-clock seconds, so a file reopened after a
+    restart stays in order; a record torn by a crash is cut off first, so
+    the new records don't land behind it.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new:
+            self._file.write(MAGIC)
+        else:
+            end = complete_length(path)
+            if end < os.path.getsize(path):
+                logger.warning(f"[Recorder] {path}: truncated record at byte {end} cut off before appending")
+                self._file.truncate(end)
+        self._lock = threading.Lock()
+
+    def record(self, topic, payload, t=None):
+        """Append one message. `payload` is the raw bytes (or text) as received."""
+        topic = topic.encode("utf-8")
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        header = RECORD.pack(self.clock() if t is None else t, len(topic), len(payload))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(header + topic + payload)
+            self.count += 1
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logger.info(f"[Recorder] {self.count} messages recorded to {self.path}")
+
+
+def complete_length(path):
+    """Byte length of the complete records (and magic) at the start of a session file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        end = len(MAGIC)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return end
+            _, topic_length, payload_length = RECORD.unpack(header)
+            record_end = end + RECORD.size + topic_length + payload_length
+            if record_end > size:
+                return end
+            f.seek(record_end)
+            end = record_end
+
+
+def read_session(path):
+    """Yield (timestamp, topic, payload bytes) for every message in a session file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            header = f.read(RECORD.size)
+            if not header:
+                return
+            if len(header) < RECORD.size:
+                logger.warning(f"[Recorder] {path}: truncated record at the end, ignored")
+                return
+            t, topic_length, payload_length = RECORD.unpack(header)
+            topic = f.read(topic_length)
+            payload = f.read(payload_length)
+            if len(topic) < topic_length or len(payload) < payload_length:
+                logger.warning(f"[Recorder] {path}: truncated record at the end, ignored")
+                return
+            yield t, topic.decode("utf-8"), payload
+
+
+def write_session(path, messages):
+    """Write (timestamp, topic, payload) messages to a new session file."""
+    if os.path.exists(path):
+        os.remove(path)
+    recorder = SessionRecorder(path)
+    for t, topic, payload in messages:
+        recorder.record(topic, payload, t)
+    recorder.close()
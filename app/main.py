@@ -1,20 +1,42 @@
-from utils.yaml_loader import load_yaml
+import time
+from collections import deque
+
+from utils.config_compiler import get_bundle, set_bundle
 from utils.config import CONFIG
+from utils.clock import SYSTEM_CLOCK
+from utils.metrics import METRICS, MetricsServer, MetricsReporter
+from utils.tracing import TRACER
+from utils.flight_recorder import FLIGHT_RECORDER
+from utils.startup import StartupReport
 from core.state import WorkstationState
+from core.history import StateHistory
 from core.evaluator import RuleEvaluator
+from core.temporal import TemporalPredicates
+from core.state_sync import StateSync
+from core.liveness import LivenessWatchdog
+from core.kpi import KpiAggregator
+from core.product_index import ProductIndex
+from core.gestures import GestureEngine
 from core.task_manager import TaskManager
+from core.subtask_queue import as_sort_number
+from core.task_journal import TaskJournal
+from core.scheduler import TickScheduler
+from core.config_watcher import ConfigWatcher
 from core.state_machine import StateMachine, WorkstationStates
 from core.workstation_states import (
     IdleState, WaitingForTaskState, CleaningState,
     ExecutingTaskState, WaitingConfirmationState, TaskCompletedState
 )
+from io_handlers.session_recorder import SessionRecorder
+from io_handlers.consumers.base_consumer import BaseConsumer
 from io_handlers.consumers.candy_consumer import CandyConsumer
 from io_handlers.consumers.hand_consumer import HandConsumer
 from io_handlers.consumers.task_assignment_consumer import TaskAssignmentConsumer
+from io_handlers.consumers.config_consumer import ConfigUpdateConsumer
+from io_handlers.consumers.command_consumer import CommandConsumer
 from io_handlers.publishers.projector_publisher import ProjectorPublisher
 from io_handlers.publishers.task_division_publisher import TaskDivisionPublisher
 from io_handlers.publishers.management_publisher import ManagementInterfacePublisher
-import time
 import logging
 
 # Configure logging
@@ -24,77 +46,228 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+TICK_SECONDS = METRICS.histogram("brain_tick_duration_seconds", "Time spent in one state machine tick")
+CONFIG_RELOADS = METRICS.counter("brain_config_reloads_total", "Config hot-reload attempts", ["status"])
+
 
 class WorkstationBrainContext:
     """Context object that holds all the data and components for the state machine"""
 
     def __init__(self, brain):
         self.brain = brain
-        self.rules = brain.rules
-        self.tasks_metadata = brain.tasks_metadata
         self.config = brain.config
-        self.products = brain.products
         self.state = brain.state
         self.task_manager = brain.task_manager
         self.evaluator = brain.evaluator
         self.projector_publisher = brain.projector_publisher
         self.task_division_publisher = brain.task_division_publisher
         self.management_publisher = brain.management_publisher
+        self.scheduler = brain.scheduler
+        self.gestures = brain.gestures
+        self.kpis = brain.kpis
         self.first_time = True
+        self.last_guidance = None
+
+    # Read through the brain so hot-reloaded config is picked up
+    @property
+    def rules(self):
+        """Rules of the config version the in-flight subtask started with."""
+        return self.brain.bundle_for(self.task_manager.current_entry).rules
+
+    @property
+    def tasks_metadata(self):
+        return self.brain.tasks_metadata
+
+    @property
+    def products(self):
+        return self.brain.products
 
 
 class WorkstationBrain:
-    def __init__(self):
+    def __init__(self, client_factory=None, clock=SYSTEM_CLOCK):
+        """
+        `client_factory` builds the MQTT clients (paho by default; a
+        FakeBroker's for replays). Every timing decision reads `clock`, so a
+        VirtualClock runs the brain on simulated time.
+        """
+        self.client_factory = client_factory
+        self.clock = clock
+        self.startup = StartupReport()
+        with self.startup.phase("config"):
+            self._load_config()
+        with self.startup.phase("state"):
+            self._setup_state()
+        with self.startup.phase("connections"):
+            self._open_connections()
+        with self.startup.phase("state_machine"):
+            # Initialize state machine
+            self._setup_state_machine()
+
+            # Create context for state machine
+            self.context = WorkstationBrainContext(self)
+
+            self._setup_metrics()
+            self._setup_hot_reload()
+            self._watch_slow_subtasks()
+            self._setup_state_sync()
+            self._setup_liveness()
+            self._setup_kpis()
+            # Every detected gesture is reported; states subscribe to the ones they act on
+            self.gestures.subscribe("*", self.on_gesture)
+
+        logger.info(f"[Startup] Ready in {self.startup.as_dict()['ready_ms']} ms; "
+                    f"waiting for {len(self.links)} MQTT links in the background")
+        self._watch_links()
+
+    def _load_config(self):
         try:
-            # Load config and metadata
-            self.rules = load_yaml("config/rules.yaml")["rules"]
-            self.tasks_metadata = load_yaml("config/rules.yaml")["tasks"]
+            # Load the compiled config bundle (validated, indexed, rules compiled)
+            self.bundle = get_bundle()
+            # Bundles still referenced: the active one and the one the in-flight subtask started with
+            self.bundles = {self.bundle.version: self.bundle}
+            self.rules = self.bundle.rules
+            self.tasks_metadata = self.bundle.tasks
             self.config = CONFIG
-            self.products = load_yaml("config/products.yaml")['produtos']
-            logger.info("Configuration loaded successfully")
+            self.config.load()
+            self.products = self.bundle.products
+            # Subtask id -> parent task id, so assignments don't scan tasks_metadata
+            self.subtask_index = self.bundle.subtask_index
+            logger.info(f"Configuration {self.bundle.version[:12]} loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load configuration: {e}")
             raise
 
+    def _setup_state(self):
+        tracing_conf = self.config.get("tracing", {})
+        TRACER.configure(
+            enabled=tracing_conf.get("enabled", True),
+            slow_threshold=tracing_conf.get("slow_threshold_ms", 250) / 1000.0,
+            log_path=tracing_conf.get("log_path")
+        )
+        recorder_conf = self.config.get("flight_recorder", {})
+        FLIGHT_RECORDER.configure(
+            enabled=recorder_conf.get("enabled", True),
+            size=int(recorder_conf.get("size_mb", 8) * 1024 * 1024),
+            seconds=recorder_conf.get("seconds", 60),
+            dump_dir=recorder_conf.get("dump_dir", "data/flight"),
+            clock=self.clock.time
+        )
+        self._last_dump = None
+        self._slow_reported = None
+        # Commands arrive on the MQTT thread and are run by tick() on the loop thread
+        self._commands = deque()
+
         # Initialize state (config set later)
-        self.state = WorkstationState(expected_config=None)
+        history_conf = self.config.get("history", {})
+        self.state = WorkstationState(
+            expected_config=None,
+            history=StateHistory(history_conf.get("seconds", 30.0), history_conf.get("rate_hz", 60),
+                                 clock=self.clock.monotonic),
+            max_defects=history_conf.get("max_defects", 100)
+        )
+        self.state.product_index = ProductIndex.from_bundle(self.bundle)
+
+        # Gestures from hand cell updates; the confirmation dwell defaults to the old confirmation cell
+        grid_conf = self.config["grid"]
+        gestures_conf = dict(self.config.get("gestures") or {})
+        gestures_conf.setdefault("confirm", {
+            "type": "dwell", "cell": [grid_conf["rows"] - 3, grid_conf["cols"] - 1], "ms": 600})
+        self.gestures = GestureEngine.from_config(gestures_conf, clock=self.clock.monotonic)
+        self.state.add_listener(self.gestures.on_state_update)
 
         # Initialize components
-        self.task_manager = TaskManager(self.tasks_metadata)
-        self.evaluator = RuleEvaluator()
+        persistence_conf = self.config.get("persistence", {})
+        journal = None
+        if persistence_conf.get("enabled", False):
+            journal = TaskJournal(
+                persistence_conf.get("journal_path", "data/task_journal.jsonl"),
+                snapshot_every=persistence_conf.get("snapshot_every", 1000),
+                fsync=persistence_conf.get("fsync", False)
+            )
+        self.task_manager = TaskManager(
+            self.tasks_metadata, self.config.get("scheduling", {}), journal,
+            config_version=self.bundle.version, clock=self.clock)
+        self.temporal = TemporalPredicates(self.state, clock=self.clock.monotonic)
+        self.temporal.register(rule["if"] for rule in self.rules.values())
+        self.evaluator = RuleEvaluator(self.bundle.compiled_rules, self.temporal)
+        kpi_conf = self.config.get("kpis", {})
+        self.kpis = KpiAggregator(
+            self.clock.time, bucket_seconds=kpi_conf.get("bucket_seconds", 60),
+            sliding_buckets=kpi_conf.get("sliding_buckets", 60), shift_hours=kpi_conf.get("shift_hours", 8),
+            shift_start_hour=kpi_conf.get("shift_start_hour", 6))
+        scheduler_conf = self.config.get("scheduler", {})
+        self.scheduler = TickScheduler(default_interval=scheduler_conf.get("tick_interval", 0.1),
+                                       clock=self.clock.monotonic, sleep=self.clock.sleep)
 
-        # Initialize and start consumers
+    def _open_connections(self):
+        """
+        Create every MQTT client and start connecting them. Connections are
+        opened asynchronously on each client's network thread, so they come
+        up in parallel and the loop can start before all of them are up.
+        """
+        factory = self.client_factory
         try:
-            self.hand_consumer = HandConsumer(self.state)
-            self.candy_consumer = CandyConsumer(self.state)
-            self.task_consumer = TaskAssignmentConsumer(self.state, self.on_assignment_received)
-            self.hand_consumer.start()
-            self.candy_consumer.start()
-            self.task_consumer.start()
-            logger.info("MQTT consumers started successfully")
+            self.hand_consumer = HandConsumer(self.state, factory)
+            self.candy_consumer = CandyConsumer(self.state, factory)
+            self.task_consumer = TaskAssignmentConsumer(self.state, self.on_assignments_received, factory)
+            self.config_consumer = None
+            if self.config.get("hot_reload", {}).get("mqtt_enabled", False):
+                self.config_consumer = ConfigUpdateConsumer(self.state, self.on_config_received, factory)
+            self.command_consumer = CommandConsumer(self.state, self.on_command, factory)
+            self.projector_publisher = ProjectorPublisher(self.state, factory)
+            self.task_division_publisher = TaskDivisionPublisher(self.state, factory)
+            self.management_publisher = ManagementInterfacePublisher(self.state, factory, self.clock)
         except Exception as e:
-            logger.error(f"Failed to start MQTT consumers: {e}")
+            logger.error(f"Failed to initialize MQTT clients: {e}")
             raise
 
-        # Initialize publishers
-        try:
-            self.projector_publisher = ProjectorPublisher(self.state)
-            self.task_division_publisher = TaskDivisionPublisher(self.state)
-            self.management_publisher = ManagementInterfacePublisher(self.state)
-            logger.info("MQTT publishers initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize MQTT publishers: {e}")
-            raise
+        self.links = {
+            "hand_consumer": self.hand_consumer,
+            "candy_consumer": self.candy_consumer,
+            "task_consumer": self.task_consumer,
+            "command_consumer": self.command_consumer,
+            "projector_publisher": self.projector_publisher,
+            "task_division_publisher": self.task_division_publisher,
+            "management_publisher": self.management_publisher,
+        }
+        if self.config_consumer:
+            self.links["config_consumer"] = self.config_consumer
+
+        # Capture every inbound message so the session can be replayed offline
+        recording_conf = self.config.get("recording", {})
+        self.recorder = None
+        if recording_conf.get("enabled", False):
+            self.recorder = SessionRecorder(recording_conf.get("path", "data/sessions/session.wbs"))
+            for link in self.links.values():
+                if isinstance(link, BaseConsumer):
+                    link.recorder = self.recorder
+            logger.info(f"[Recorder] Recording inbound messages to {self.recorder.path}")
+        for link in self.links.values():
+            link.start()
+        logger.info("MQTT clients started, connecting in the background")
 
-        # Initialize state machine
-        self._setup_state_machine()
+    def _watch_links(self):
+        """Report startup timings once every MQTT link is up (or after the timeout)"""
+        timeout = self.config.get("startup", {}).get("links_timeout", 10.0)
+        deadline = self.scheduler.clock() + timeout
 
-        # Create context for state machine
-        self.context = WorkstationBrainContext(self)
+        def check():
+            down = [name for name, link in self.links.items() if not link.connected.is_set()]
+            if down and self.scheduler.clock() < deadline:
+                return
+            handle.cancel()
+            self.startup.links_settled(down)
+            report = self.startup.as_dict()
+            if down:
+                logger.warning(f"[Startup] Links still down after {timeout:.0f} s: {down}")
+            logger.info(f"[Startup] Timing report: {report}")
+            self.management_publisher.send_startup_report(report)
+
+        handle = self.scheduler.call_every(0.05, check)
 
     def _setup_state_machine(self):
         """Setup the state machine with all states and transitions"""
-        self.state_machine = StateMachine(WorkstationStates.IDLE)
+        self.state_machine = StateMachine(WorkstationStates.IDLE, clock=self.clock.monotonic)
 
         # Add all states
         self.state_machine.add_state(IdleState())
@@ -104,36 +277,315 @@ class WorkstationBrain:
         self.state_machine.add_state(WaitingConfirmationState())
         self.state_machine.add_state(TaskCompletedState())
 
+        # Per-state tick rates from config override the state defaults
+        state_intervals = self.config.get("scheduler", {}).get("state_tick_intervals", {})
+        for state_name, state in self.state_machine.states.items():
+            if state_name.value in state_intervals:
+                state.tick_interval = state_intervals[state_name.value]
+
         logger.info("State machine initialized")
 
-    def on_assignment_received(self, payload):
-        """Called by the TaskAssignmentConsumer when new subtasks are assigned."""
+    def _setup_metrics(self):
+        """Register process gauges and start the metrics endpoint and reporter"""
+        METRICS.gauge("brain_subtask_queue_depth", "Subtasks waiting in the queue").set_function(
+            lambda: len(self.task_manager.subtask_queue))
+        METRICS.gauge("brain_tick_overruns_total", "Ticks that ran past the next deadline").set_function(
+            lambda: self.scheduler.stats.overruns)
+        METRICS.gauge("brain_tick_jitter_mean_seconds", "Mean tick start lateness").set_function(
+            lambda: self.scheduler.stats.mean_jitter)
+        METRICS.gauge("brain_tick_jitter_max_seconds", "Maximum tick start lateness").set_function(
+            lambda: self.scheduler.stats.max_jitter)
+
+        metrics_conf = self.config.get("metrics", {})
+        self.metrics_server = None
+        if not metrics_conf.get("enabled", True):
+            return
         try:
-            subtask_id = payload.get("task_id")
-            product_config = payload.get("config", {})
-
-            if product_config == {}:
-                product_name = payload.get("product")
-                if product_name in self.products:
-                    product_config = self.products[product_name]["config"]
-                else:
-                    logger.warning(f"Product {product_name} not found in configuration")
-                    return
-
-            logger.info(f"New task assignment received: {subtask_id} with config {product_config}")
-
-            # Enqueue the subtask
-            found = False
-            for task_id, task_data in self.tasks_metadata.items():
-                if subtask_id in task_data.get("subtasks", {}):
-                    self.task_manager.enqueue_subtask(task_id, subtask_id)
-                    self.state.data['SubtaskConfigs'][subtask_id] = product_config
-                    logger.info(f"Subtask {subtask_id} from {task_id} enqueued")
-                    found = True
-                    break
-
-            if not found:
-                logger.warning(f"Subtask {subtask_id} not found in task metadata")
+            self.metrics_server = MetricsServer(
+                METRICS, metrics_conf.get("http_host", "127.0.0.1"), metrics_conf.get("http_port", 8000))
+            self.metrics_server.start()
+        except OSError as e:
+            logger.warning(f"[Metrics] Could not start metrics endpoint: {e}")
+            self.metrics_server = None
+
+        interval = metrics_conf.get("mqtt_interval", 0)
+        if interval:
+            reporter = MetricsReporter(METRICS, self.management_publisher.send_metrics_snapshot)
+            self.scheduler.call_every(interval, reporter.report)
+
+    def _setup_hot_reload(self):
+        """Watch the config files and recompile them in the background"""
+        reload_conf = self.config.get("hot_reload", {})
+        self.config_watcher = None
+        if not reload_conf.get("enabled", False):
+            return
+        self.config_watcher = ConfigWatcher(
+            self.bundle.version,
+            poll_interval=reload_conf.get("poll_interval", 1.0),
+            on_error=self.on_config_rejected,
+            on_unchanged=self.on_config_unchanged
+        )
+        self.config_watcher.start()
+
+    def _watch_slow_subtasks(self):
+        """Dump the flight recorder once per subtask that runs past `slow_subtask_factor` x its median."""
+        recorder_conf = self.config.get("flight_recorder", {})
+        if not FLIGHT_RECORDER.enabled:
+            return
+        factor = recorder_conf.get("slow_subtask_factor", 3.0)
+        min_samples = recorder_conf.get("min_samples", 5)
+
+        def check():
+            entry = self.task_manager.current_entry
+            started = self.task_manager.current_subtask_start_time
+            if entry is None or started is None or entry.instance_id == self._slow_reported:
+                return
+            stats = self.task_manager.durations.by_subtask.get(entry.subtask_id)
+            if stats is None or stats.count < min_samples:
+                return
+            median = stats.percentile(50)
+            elapsed = self.clock.time() - started
+            if elapsed > factor * median:
+                self._slow_reported = entry.instance_id
+                logger.warning(f"[FlightRecorder] {entry.subtask_id} ({entry.instance_id}) running for "
+                               f"{elapsed:.1f} s, median {median:.1f} s")
+                self.dump_flight_recorder(f"slow_{entry.subtask_id}")
+
+        self.scheduler.call_every(1.0, check)
+
+    def _setup_state_sync(self):
+        """Publish coalesced state deltas for dashboards every `interval` seconds."""
+        sync_conf = self.config.get("state_sync", {})
+        self.state_sync = None
+        if not sync_conf.get("enabled", True):
+            return
+        self.state_sync = StateSync(self.state, self.management_publisher.send_state_delta,
+                                    history=sync_conf.get("history", 240), exclude=sync_conf.get("exclude", ()))
+        self.scheduler.call_every(sync_conf.get("interval", 0.5), self.state_sync.flush)
+
+    def _setup_liveness(self):
+        """Meter the sensor streams and degrade the state when one goes quiet."""
+        liveness_conf = self.config.get("liveness", {})
+        self.liveness = None
+        if not liveness_conf.get("enabled", True):
+            return
+        self.liveness = LivenessWatchdog(self.clock.monotonic, self.on_stream_liveness,
+                                         alpha=liveness_conf.get("ewma_alpha", 0.2))
+        # Stream name -> the consumer that owns its state keys
+        self.stream_consumers = {"hands": self.hand_consumer, "candies": self.candy_consumer}
+        for name, stream_conf in (liveness_conf.get("streams") or {}).items():
+            consumer = self.stream_consumers.get(name)
+            if consumer is None:
+                logger.warning(f"[Liveness] Unknown stream {name}, expected one of {list(self.stream_consumers)}")
+                continue
+            consumer.rate_meter = self.liveness.add_stream(name, stream_conf.get("max_gap", 1.0))
+        self.scheduler.call_every(liveness_conf.get("check_interval", 0.5), self.liveness.check)
+        report_interval = liveness_conf.get("report_interval", 5)
+        if report_interval:
+            self.scheduler.call_every(
+                report_interval, lambda: self.management_publisher.send_stream_rates(self.liveness.rates()))
+
+    def _setup_kpis(self):
+        """Feed state transitions to the KPI aggregator and publish its rollups on a schedule."""
+        self.kpis.on_state(self.state_machine.current_state.value)
+        self.state_machine.add_listener(lambda from_state, to_state: self.kpis.on_state(to_state.value))
+        kpi_conf = self.config.get("kpis", {})
+        if kpi_conf.get("enabled", True):
+            self.scheduler.call_every(
+                kpi_conf.get("publish_interval", 60),
+                lambda: self.management_publisher.send_kpi_rollup(self.kpis.rollup()))
+
+    def on_stream_liveness(self, name, stale, status):
+        """Called by the watchdog on the loop thread when a stream goes stale or comes back."""
+        self.state.update("StaleStreams", sorted(self.liveness.stale))
+        if stale:
+            self.stream_consumers[name].on_stale()
+        self.management_publisher.send_stream_liveness(name, stale, status)
+
+    def on_state_request(self, payload):
+        """Answer a get_state command: a merged delta from `since` if it's still kept, else a snapshot."""
+        if self.state_sync is None:
+            logger.warning("[StateSync] State requested but state_sync is disabled")
+            return
+        request_id, reply_to = payload.get("request_id"), payload.get("reply_to")
+        since = payload.get("since")
+        delta = self.state_sync.since(since) if isinstance(since, int) else None
+        if delta is not None:
+            self.management_publisher.send_state_response("state_delta", delta, request_id, reply_to)
+        else:
+            self.management_publisher.send_state_response(
+                "state_snapshot", self.state_sync.snapshot(), request_id, reply_to)
+
+    def dump_flight_recorder(self, reason, background=True):
+        """
+        Write the flight recorder to disk and report it to management. Dumps
+        closer than `min_dump_interval` are skipped unless run in the
+        foreground (a crash); background dumps don't hold up the loop.
+        """
+        now = self.clock.monotonic()
+        interval = self.config.get("flight_recorder", {}).get("min_dump_interval", 30)
+        if background and self._last_dump is not None and now - self._last_dump < interval:
+            logger.info(f"[FlightRecorder] Skipped dump ({reason}): last one {now - self._last_dump:.0f} s ago")
+            return
+        self._last_dump = now
+
+        def report(prefix):
+            self.management_publisher.send_flight_recorder_dump(reason, prefix)
+
+        if background:
+            FLIGHT_RECORDER.dump_async(reason, on_done=report)
+            return
+        prefix = FLIGHT_RECORDER.dump(reason)
+        if prefix is not None:
+            report(prefix)
+
+    def on_command(self, command, payload):
+        """
+        Called by the CommandConsumer (on the MQTT thread) for every command
+        received; it runs on the next tick, so answers are ordered with the
+        deltas the loop publishes.
+        """
+        self._commands.append((command, payload))
+
+    def run_commands(self):
+        """Run the commands received since the last tick. Loop thread only."""
+        while self._commands:
+            command, payload = self._commands.popleft()
+            self._run_command(command, payload)
+
+    def _run_command(self, command, payload):
+        if command == "dump_flight_recorder":
+            self.dump_flight_recorder(payload.get("reason") or "command")
+        elif command == "get_state":
+            self.on_state_request(payload)
+        else:
+            logger.warning(f"[MQTT] Unknown command: {command}")
+
+    def bundle_for(self, entry):
+        """The config bundle a queue entry runs with: the one it started with, else the active one."""
+        if entry is not None and entry.config_version in self.bundles:
+            return self.bundles[entry.config_version]
+        return self.bundle
+
+    def apply_pending_config(self):
+        """
+        Swap in a config compiled by the watcher. Called on the loop thread
+        between ticks, so a tick never sees a mix of two versions.
+        """
+        pending = self.config_watcher.take_pending() if self.config_watcher else None
+        if pending is None:
+            return
+        bundle, compile_seconds, source = pending
+        started = time.perf_counter()
+        previous = self.bundle
+
+        in_flight = self.task_manager.current_entry
+        self.bundles = {
+            version: kept for version, kept in self.bundles.items()
+            if in_flight is not None and version == in_flight.config_version
+        }
+        self.bundles[bundle.version] = bundle
+
+        self.evaluator.compiled_rules.update(bundle.compiled_rules)
+        self.temporal.register(rule["if"] for rule in bundle.rules.values())
+        dropped = self.task_manager.set_tasks(bundle.tasks, bundle.version)
+        # Queued subtasks will run under the new version, so they check the new candy counts too
+        self.task_manager.refresh_configs(previous.products, bundle.products)
+        self.rules = bundle.rules
+        self.tasks_metadata = bundle.tasks
+        self.products = bundle.products
+        self.subtask_index = bundle.subtask_index
+        self.state.product_index = ProductIndex.from_bundle(bundle)
+        self.bundle = bundle
+        set_bundle(bundle)
+        swap_seconds = time.perf_counter() - started
+
+        if bundle.workstation != previous.workstation:
+            logger.warning("[CONFIG] workstation_config.yaml changed; those settings apply after a restart")
+        logger.info(f"[CONFIG] Switched to config {bundle.version[:12]} ({source}): "
+                    f"compiled in {compile_seconds * 1000:.1f} ms, swapped in {swap_seconds * 1000:.2f} ms")
+        CONFIG_RELOADS.inc(status="applied")
+        self.management_publisher.send_config_reload(
+            bundle.version, "applied", source,
+            compile_ms=round(compile_seconds * 1000, 2), swap_ms=round(swap_seconds * 1000, 3),
+            dropped=[entry.instance_id for entry in dropped]
+        )
+
+    def on_config_rejected(self, errors, source):
+        """Called by the ConfigWatcher thread when a changed config fails to compile."""
+        CONFIG_RELOADS.inc(status="rejected")
+        self.management_publisher.send_config_reload(self.bundle.version, "rejected", source, errors=errors)
+
+    def on_config_unchanged(self, version, source):
+        """Called by the ConfigWatcher thread when a submitted config matches the running one."""
+        CONFIG_RELOADS.inc(status="unchanged")
+        self.management_publisher.send_config_reload(version, "unchanged", source)
+
+    def on_config_received(self, documents):
+        """Called by the ConfigUpdateConsumer with rules/products documents pushed over MQTT."""
+        if self.config_watcher:
+            self.config_watcher.submit(documents)
+        else:
+            logger.warning("[CONFIG] Config update received but hot reload is disabled")
+
+    def tick(self):
+        """One loop step; run() calls it on the scheduler cadence, the replay tool drives it directly."""
+        self.apply_pending_config()
+        self.run_commands()
+        self.gestures.dispatch()
+        # Carry the latest inbound frame through this tick's decisions and publishes
+        TRACER.begin_tick(self.state.latest_trace)
+        try:
+            with TICK_SECONDS.time():
+                self.state_machine.execute(self.context)
+        finally:
+            TRACER.end_tick()
+
+    def on_gesture(self, event):
+        self.management_publisher.send_user_action("gesture", event)
+
+    def on_assignments_received(self, assignments):
+        """Called by the TaskAssignmentConsumer with all subtasks of one assignment message."""
+        try:
+            # One bundle for the whole message, even if a reload lands meanwhile
+            bundle = self.bundle
+            items = []
+            for payload in assignments:
+                subtask_id = payload.get("task_id")
+                product_config = payload.get("config", {})
+
+                if product_config == {}:
+                    product_name = payload.get("product")
+                    if product_name in bundle.products:
+                        product_config = bundle.products[product_name]["config"]
+                    else:
+                        logger.warning(f"Product {product_name} not found in configuration")
+                        continue
+
+                task_id = bundle.subtask_index.get(subtask_id)
+                if task_id is None:
+                    logger.warning(f"Subtask {subtask_id} not found in task metadata")
+                    continue
+
+                # Queue ordering compares these, so a bad value would break the whole queue
+                try:
+                    priority = as_sort_number(payload.get("priority"))
+                    deadline = as_sort_number(payload.get("deadline"))
+                except ValueError as e:
+                    logger.warning(f"Subtask {subtask_id} dropped: invalid priority or deadline ({e})")
+                    continue
+
+                items.append({
+                    "task_id": task_id,
+                    "subtask_id": subtask_id,
+                    "product": payload.get("product"),
+                    "config": product_config,
+                    "priority": priority,
+                    "deadline": deadline
+                })
+
+            enqueued = self.task_manager.enqueue_many(items)
+            logger.info(f"New task assignment received: {enqueued} subtasks enqueued")
         except Exception as e:
             logger.error(f"Error processing task assignment: {e}")
 
@@ -142,33 +594,38 @@ class WorkstationBrain:
         logger.info("Starting WorkstationBrain main loop...")
 
         try:
-            while True:
-                # Execute current state
-                self.state_machine.execute(self.context)
-
-                # Sleep to avoid busy-waiting
-                time.sleep(0.1)
+            # Execute the current state on a fixed cadence set by the active state
+            self.scheduler.run(self.tick, self.state_machine.get_tick_interval)
 
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, shutting down...")
             self.shutdown()
         except Exception as e:
             logger.error(f"Unexpected error in main loop: {e}")
+            try:
+                self.dump_flight_recorder(f"exception_{type(e).__name__}", background=False)
+            except Exception as dump_error:
+                logger.error(f"[FlightRecorder] Dump failed: {dump_error}")
             self.shutdown()
             raise
 
     def shutdown(self):
         """Gracefully shutdown all components"""
         logger.info("Shutting down WorkstationBrain...")
+        self.scheduler.stop()
+        if getattr(self, 'config_watcher', None):
+            self.config_watcher.stop()
+        if getattr(self, 'metrics_server', None):
+            self.metrics_server.stop()
+        if self.task_manager.journal:
+            self.task_manager.journal.close()
+        if getattr(self, 'recorder', None):
+            self.recorder.close()
+        logger.info(f"[Scheduler] Tick statistics: {self.scheduler.stats.as_dict()}")
         try:
-            # Stop consumers
-            if hasattr(self, 'hand_consumer'):
-                # Note: Add stop() method to consumers if not present
-                pass
-            if hasattr(self, 'candy_consumer'):
-                pass
-            if hasattr(self, 'task_consumer'):
-                pass
+            # Stop consumers and publishers
+            for link in getattr(self, 'links', {}).values():
+                link.stop()
             logger.info("All components shut down successfully")
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
@@ -0,0 +1,235 @@
+"""
+Micro and macro benchmarks of the brain's hot paths.
+
+    python app/tools/benchmark.py --output bench.json
+    python app/tools/benchmark.py --baseline bench.json --threshold 0.15
+
+Every case runs in-process against a FakeBroker; each call is timed
+separately to report ops/sec and p50/p99 latency. With --baseline, a case
+regresses when its ops/sec drop or its p99 grows by more than the given
+fractions, and the exit code is 1. Run from the repository root.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.evaluator import RuleEvaluator  # noqa: E402
+from core.product_index import ProductIndex  # noqa: E402
+from core.state import WorkstationState  # noqa: E402
+from core.state_machine import WorkstationStates  # noqa: E402
+from core.temporal import TemporalPredicates  # noqa: E402
+from io_handlers.consumers.candy_consumer import CandyConsumer  # noqa: E402
+from io_handlers.consumers.grid_mapper import GridMapper  # noqa: E402
+from io_handlers.consumers.hand_consumer import HandConsumer  # noqa: E402
+from io_handlers.fake_broker import FakeBroker, FakeMessage  # noqa: E402
+from io_handlers.publishers.management_publisher import ManagementInterfacePublisher  # noqa: E402
+from io_handlers.publishers.outbox import Outbox  # noqa: E402
+from core.hand_data import HAND_LANDMARKS  # noqa: E402
+from tools.offline import start_offline_brain  # noqa: E402
+from utils.clock import VirtualClock  # noqa: E402
+from utils.config import CONFIG  # noqa: E402
+from utils.config_compiler import get_bundle  # noqa: E402
+
+import logging  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COLORS = ("Red", "Green", "Blue")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile (0-100) of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def measure(fn, min_time=0.5, max_iterations=200_000, warmup=50):
+    """Call `fn()` repeatedly and time every call. Returns ops/sec and latency percentiles (µs)."""
+    for _ in range(warmup):
+        fn()
+    clock = time.perf_counter_ns
+    samples = []
+    deadline = clock() + int(min_time * 1e9)
+    total = 0
+    while len(samples) < max_iterations:
+        started = clock()
+        fn()
+        elapsed = clock() - started
+        samples.append(elapsed)
+        total += elapsed
+        if started >= deadline:
+            break
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / (total / 1e9), 1) if total else None,
+        "p50_us": round(percentile(samples, 50) / 1000, 3),
+        "p99_us": round(percentile(samples, 99) / 1000, 3),
+    }
+
+
+def candy_payload(detections):
+    payload = {}
+    for i in range(detections):
+        payload.update({f"yolo_{i}_class": COLORS[i % len(COLORS)].lower(),
+                        f"yolo_{i}_x1": 400 + i % 10, f"yolo_{i}_y1": 300, f"yolo_{i}_x2": 420 + i % 10,
+                        f"yolo_{i}_y2": 320, f"yolo_{i}_score": 0.9})
+    return json.dumps(payload).encode("utf-8")
+
+
+def hand_payload():
+    payload = {}
+    for hand, offset in (("handL", 0.2), ("handR", 0.6)):
+        for i, name in enumerate(HAND_LANDMARKS):
+            payload[f"{hand}_{name}_x"] = offset + i * 0.005
+            payload[f"{hand}_{name}_y"] = 0.5 + i * 0.004
+            payload[f"{hand}_{name}_z"] = -0.01 * i
+    return json.dumps(payload).encode("utf-8")
+
+
+def _state():
+    bundle = get_bundle()
+    state = WorkstationState(expected_config={"Blue": 1, "Green": 3, "Red": 1})
+    state.product_index = ProductIndex.from_bundle(bundle)
+    return state
+
+
+def build_cases(broker, clock):
+    """{name: zero-argument callable} for every benchmark case."""
+    cases = {}
+    state = _state()
+
+    candy = CandyConsumer(state, broker.client_factory)
+    for detections in (1, 10, 50, 200):
+        message = FakeMessage(candy.topic, candy_payload(detections))
+        cases[f"candy_on_message[{detections}]"] = lambda message=message: candy.on_message(None, None, message)
+
+    hands = HandConsumer(state, broker.client_factory)
+    hand_message = FakeMessage(hands.topic, hand_payload())
+    cases["hand_on_message"] = lambda: hands.on_message(None, None, hand_message)
+
+    mapper = GridMapper(5, 5, 640, 480)
+    cases["grid_mapper"] = lambda: mapper.get_grid_cell(321.5, 240.25)
+
+    temporal = TemporalPredicates(state, clock=clock.monotonic)
+    evaluator = RuleEvaluator(temporal=temporal)
+    for condition in ("CombinationValid == True", "stable(CombinationValid, 1.5s)"):
+        temporal.register([condition])
+        evaluator.evaluate_rule(condition, state)
+        cases[f"evaluate_rule[{condition}]"] = lambda condition=condition: evaluator.evaluate_rule(condition, state)
+
+    state.data["DetectedCandies"] = {"Blue": 1, "Green": 3, "Red": 1}
+    cases["validate_combination"] = state.validate_combination
+
+    publisher = ManagementInterfacePublisher(state, broker.client_factory, clock)
+    publisher.outbox = Outbox(max_messages=10)
+    publisher.client.connect()
+    publisher.link.connected.set()
+    cases["publish_task_update"] = lambda: publisher.send_task_update(
+        "Task2", "T2A", "in_progress", 0.5, instance_id="bench-0", product="produtoA")
+    return cases
+
+
+def build_tick_case(broker, clock):
+    """A full brain tick in EXECUTING_TASK (rules evaluated, projector feedback published)."""
+    brain = start_offline_brain(broker, clock)
+    brain.on_assignments_received([{"task_id": "T2A", "product": "produtoA"}])
+    brain.state_machine.transition_to(WorkstationStates.EXECUTING_TASK, brain.context)
+    brain.state.update("DetectedCandies", {"Blue": 1, "Green": 2})
+    return brain, brain.tick
+
+
+def run(only=None, min_time=0.5):
+    clock = VirtualClock()
+    broker = FakeBroker(clock=clock.monotonic, keep_published=False)
+    cases = build_cases(broker, clock)
+    brain, tick = build_tick_case(broker, clock)
+    cases["state_machine_tick"] = tick
+
+    results = {}
+    try:
+        for name, fn in cases.items():
+            if only and only not in name:
+                continue
+            results[name] = measure(fn, min_time=min_time)
+            logger.info(f"[Benchmark] {name}: {results[name]}")
+    finally:
+        brain.shutdown()
+        CONFIG.reset()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "min_time": min_time,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=0.15, p99_threshold=0.5):
+    """
+    Regressions of `results` against `baseline`: ops/sec lower by more than
+    `threshold` or p99 higher by more than `p99_threshold` (fractions).
+    Cases missing from either side are skipped.
+    """
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if previous["ops_per_sec"] and current["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(f"{name}: {current['ops_per_sec']} ops/sec, baseline {previous['ops_per_sec']}")
+        if previous["p99_us"] and current["p99_us"] > previous["p99_us"] * (1 + p99_threshold):
+            regressions.append(f"{name}: p99 {current['p99_us']} us, baseline {previous['p99_us']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the workstation brain's hot paths")
+    parser.add_argument("--only", help="run only the cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to run each case")
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="compare with results saved earlier")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed ops/sec drop (fraction)")
+    parser.add_argument("--p99-threshold", type=float, default=0.5, help="allowed p99 increase (fraction)")
+    args = parser.parse_args(argv)
+
+    # Measure the code, not the log handlers
+    logging.disable(logging.INFO)
+    results = run(args.only, args.min_time)
+    logging.disable(logging.NOTSET)
+
+    width = max((len(name) for name in results["results"]), default=0)
+    for name, result in results["results"].items():
+        print(f"{name:<{width}}  {result['ops_per_sec']:>12,.0f} ops/s  "
+              f"p50 {result['p50_us']:>9.2f} us  p99 {result['p99_us']:>9.2f} us")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.p99_threshold)
+        for regression in regressions:
+            logger.error(f"[Benchmark] Regression: {regression}")
+        if regressions:
+            return 1
+        logger.info("[Benchmark] No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Synthetic sensor load and saturation test.
+
+Publishes hands/position and objdet/results streams into a brain through
+a FakeBroker in queued mode (one bounded inbox and thread per client, like
+real MQTT clients), raising the frame rate step by step until the
+decision-latency SLO or the drop budget is broken.
+
+    python app/tools/load_generator.py --start-rate 50 --factor 2 --detections 20 --slo-ms 250
+
+Decision latency is measured per frame the brain loop picks up: from the
+producer timestamp stamped by the generator to the start of the tick that
+first sees the frame. Frames replaced by a newer one before a tick are
+superseded, not dropped; drops are frames that found a consumer's inbox
+full. The generator shares the process (and the GIL) with the brain, so
+the saturation point is a lower bound for a dedicated host.
+Run from the repository root.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.hand_data import HAND_LANDMARKS  # noqa: E402
+from core.state_machine import WorkstationStates  # noqa: E402
+from io_handlers.consumers.base_consumer import BaseConsumer  # noqa: E402
+from io_handlers.fake_broker import FakeBroker  # noqa: E402
+from tools.benchmark import percentile  # noqa: E402
+from tools.offline import start_offline_brain  # noqa: E402
+from utils.clock import SYSTEM_CLOCK  # noqa: E402
+from utils.config import CONFIG  # noqa: E402
+
+import logging  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COLORS = ("red", "green", "blue")
+
+
+def _stamped(body):
+    """Payload factory: the JSON object `body` with a fresh producer timestamp, without re-encoding it."""
+    tail = json.dumps(body)[1:].encode("utf-8")
+    separator = b", " if body else b""
+
+    def payload():
+        return b'{"timestamp": ' + repr(time.time()).encode("ascii") + separator + tail
+    return payload
+
+
+def hand_frames(count=16):
+    """Payload factories for a pair of hands sweeping across the workspace."""
+    frames = []
+    for step in range(count):
+        body = {}
+        for hand, base in (("handL", 0.15), ("handR", 0.55)):
+            x0 = base + 0.3 * step / count
+            for i, name in enumerate(HAND_LANDMARKS):
+                body[f"{hand}_{name}_x"] = round(x0 + 0.004 * i, 4)
+                body[f"{hand}_{name}_y"] = round(0.4 + 0.005 * i, 4)
+                body[f"{hand}_{name}_z"] = round(-0.01 * i, 4)
+        frames.append(_stamped(body))
+    return frames
+
+
+def detection_frames(detections, count=8):
+    """Payload factories for `detections` candies in the validation area, varying frame to frame."""
+    frames = []
+    for step in range(count):
+        body = {}
+        for i in range(detections):
+            color = COLORS[(i + step) % len(COLORS)]
+            x = 400 + (i * 7 + step) % 150
+            y = 300 + (i * 11) % 100
+            body.update({f"yolo_{i}_class": color, f"yolo_{i}_x1": x, f"yolo_{i}_y1": y,
+                         f"yolo_{i}_x2": x + 20, f"yolo_{i}_y2": y + 20,
+                         f"yolo_{i}_score": round(0.7 + 0.02 * (i % 10), 2)})
+        frames.append(_stamped(body))
+    return frames
+
+
+class Stream(threading.Thread):
+    """
+    Publishes `frames` on `topic` at `rate` frames/s for `duration` seconds,
+    in bursts of `burst` back-to-back frames (the mean rate is kept).
+    Pacing is by frame count due, so late wake-ups catch up instead of
+    lowering the rate.
+    """
+
+    def __init__(self, broker, topic, frames, rate, duration, burst=1):
+        super().__init__(name=f"load-{topic}", daemon=True)
+        self.broker = broker
+        self.topic = topic
+        self.frames = frames
+        self.rate = rate
+        self.duration = duration
+        self.burst = max(1, burst)
+        self.sent = 0
+
+    def run(self):
+        if self.rate <= 0:
+            return
+        frames, publish, topic = self.frames, self.broker.publish, self.topic
+        burst_interval = self.burst / self.rate
+        started = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.duration:
+                return
+            due = (int(elapsed / burst_interval) + 1) * self.burst
+            while self.sent < due:
+                publish(topic, frames[self.sent % len(frames)]())
+                self.sent += 1
+            time.sleep(max(0.0, (due // self.burst) * burst_interval - (time.perf_counter() - started)))
+
+
+class SaturationTest:
+    """Runs rate steps against one brain and reports latency and drops per step."""
+
+    def __init__(self, detections=10, burst=1, detection_ratio=0.5, queue_size=100, overrides=None):
+        self.detections = detections
+        self.burst = burst
+        self.detection_ratio = detection_ratio
+        self.broker = FakeBroker(keep_published=False, queue_size=queue_size)
+        self.brain = start_offline_brain(self.broker, SYSTEM_CLOCK, overrides)
+        self.consumers = [link for link in self.brain.links.values() if isinstance(link, BaseConsumer)]
+        self.latencies = []
+        self._thread = None
+        self.hand_frames = hand_frames()
+        self.detection_frames = detection_frames(detections)
+
+    def start(self):
+        """Put the brain in EXECUTING_TASK with a subtask, and run its loop on a background thread."""
+        brain = self.brain
+        brain.on_assignments_received([{"task_id": "T2A", "product": "produtoA"}])
+        brain.state_machine.transition_to(WorkstationStates.EXECUTING_TASK, brain.context)
+
+        def tick():
+            trace = brain.state.latest_trace
+            if trace is not None and trace.picked_up_at is None and trace.producer_ts is not None:
+                self.latencies.append(time.time() - trace.producer_ts)
+            brain.tick()
+
+        self._thread = threading.Thread(
+            target=brain.scheduler.run, args=(tick, brain.state_machine.get_tick_interval),
+            name="brain-loop", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.brain.scheduler.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.brain.shutdown()
+
+    def _counts(self):
+        clients = [consumer.client for consumer in self.consumers]
+        return sum(c.delivered for c in clients), sum(c.dropped for c in clients), sum(c.pending() for c in clients)
+
+    def _drain(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self._counts()[2] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def step(self, rate, duration):
+        """Offer `rate` frames/s in total (split between hands and detections) for `duration` seconds."""
+        self._drain()
+        self.latencies = []
+        delivered, dropped, _ = self._counts()
+        config = self.brain.config
+        streams = [
+            Stream(self.broker, config.get("hand_topic", "hands/position"), self.hand_frames,
+                   rate * (1 - self.detection_ratio), duration, self.burst),
+            Stream(self.broker, config.get("candy_topic", "objdet/results"), self.detection_frames,
+                   rate * self.detection_ratio, duration, self.burst),
+        ]
+        for stream in streams:
+            stream.start()
+        for stream in streams:
+            stream.join()
+        # Let the brain work off what is queued, so slow handling shows up as latency
+        self._drain()
+        time.sleep(0.2)
+
+        sent = sum(stream.sent for stream in streams)
+        now_delivered, now_dropped, _ = self._counts()
+        latencies = sorted(self.latencies)
+        return {
+            "rate": rate,
+            "sent": sent,
+            "achieved_rate": round(sent / duration, 1),
+            "handled": now_delivered - delivered,
+            "dropped": now_dropped - dropped,
+            "drop_rate": round((now_dropped - dropped) / sent, 4) if sent else 0.0,
+            "decisions": len(latencies),
+            "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            "latency_max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+
+
+def find_saturation(test, start_rate=50.0, factor=2.0, max_rate=20000.0, step_seconds=3.0,
+                    slo_ms=250.0, max_drop_rate=0.01):
+    """
+    Raise the rate by `factor` per step until the p99 decision latency
+    exceeds `slo_ms` or more than `max_drop_rate` of the frames are
+    dropped. Returns the report with every step and the saturation point
+    (the highest rate that met the SLO).
+    """
+    steps = []
+    saturation = None
+    broken = None
+    rate = start_rate
+    while rate <= max_rate:
+        result = test.step(rate, step_seconds)
+        steps.append(result)
+        logger.info(f"[Load] {result}")
+        p99 = result["latency_p99_ms"]
+        if (p99 is not None and p99 > slo_ms) or result["drop_rate"] > max_drop_rate:
+            broken = result
+            break
+        saturation = result
+        rate *= factor
+    return {
+        "slo_ms": slo_ms,
+        "max_drop_rate": max_drop_rate,
+        "detections_per_frame": test.detections,
+        "burst": test.burst,
+        "saturation_rate": saturation["achieved_rate"] if saturation else None,
+        "broken_at": broken["rate"] if broken else None,
+        "steps": steps,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the sensor frame rate one brain sustains within a latency SLO")
+    parser.add_argument("--start-rate", type=float, default=50.0, help="total frames/s of the first step")
+    parser.add_argument("--factor", type=float, default=2.0, help="rate multiplier between steps")
+    parser.add_argument("--max-rate", type=float, default=20000.0)
+    parser.add_argument("--step-seconds", type=float, default=3.0)
+    parser.add_argument("--detections", type=int, default=10, help="candies per detection frame")
+    parser.add_argument("--detection-ratio", type=float, default=0.5, help="share of frames that are detections")
+    parser.add_argument("--burst", type=int, default=1, help="frames sent back-to-back per burst")
+    parser.add_argument("--queue-size", type=int, default=100, help="inbox size per consumer before drops")
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="p99 decision latency objective")
+    parser.add_argument("--max-drop-rate", type=float, default=0.01)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    args = parser.parse_args(argv)
+
+    # Measure the brain, not its log handlers
+    logging.disable(logging.INFO)
+    test = SaturationTest(args.detections, args.burst, args.detection_ratio, args.queue_size)
+    try:
+        test.start()
+        report = find_saturation(test, args.start_rate, args.factor, args.max_rate, args.step_seconds,
+                                 args.slo_ms, args.max_drop_rate)
+    finally:
+        test.stop()
+        CONFIG.reset()
+        logging.disable(logging.NOTSET)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Shared setup for the tools that run a WorkstationBrain without hardware or a broker."""
+import time
+
+from main import WorkstationBrain
+from utils.config import CONFIG
+
+# Settings that would touch the real environment (ports, journal, config files) during an offline run
+OFFLINE_OVERRIDES = {
+    "metrics": {"enabled": False, "mqtt_interval": 0},
+    "persistence": {"enabled": False},
+    "hot_reload": {"enabled": False},
+    "recording": {"enabled": False},
+    "flight_recorder": {"enabled": False},
+    "state_sync": {"enabled": False},
+    "kpis": {"enabled": False},
+    "outbox": {"spill_dir": None},
+    "tracing": {"log_path": None},
+}
+
+
+def start_offline_brain(broker, clock, overrides=None, timeout=5.0):
+    """Build a brain wired to `broker` and running on `clock`; returns once every link is connected."""
+    CONFIG.override(OFFLINE_OVERRIDES)
+    if overrides:
+        CONFIG.override(overrides)
+    brain = WorkstationBrain(client_factory=broker.client_factory, clock=clock)
+    deadline = time.monotonic() + timeout
+    for name, link in brain.links.items():
+        if not link.connected.wait(max(deadline - time.monotonic(), 0.0)):
+            brain.shutdown()
+            raise RuntimeError(f"Link {name} did not connect to the fake broker")
+    return brain
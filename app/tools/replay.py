@@ -0,0 +1,171 @@
+"""
+Replay a recorded MQTT session into a WorkstationBrain and check its
+output against a golden recording.
+
+    python app/tools/replay.py data/sessions/session.wbs --speed max --golden golden.wbs
+    python app/tools/replay.py data/sessions/session.wbs --write-golden golden.wbs
+
+Run from the repository root (the config paths are relative to it).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.clock import VirtualClock  # noqa: E402
+from io_handlers.fake_broker import FakeBroker  # noqa: E402
+from io_handlers.session_recorder import read_session, write_session  # noqa: E402
+from tools.offline import start_offline_brain  # noqa: E402
+
+import logging  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Fields that differ from run to run and are ignored when comparing with a golden recording
+VOLATILE_FIELDS = frozenset({
+    "timestamp", "start_time", "end_time", "duration", "compile_ms", "swap_ms",
+    "instance_id",  # prefixed with a per-process id
+})
+VOLATILE_TYPES = frozenset({"startup_report", "metrics_snapshot"})
+
+
+class SessionReplay:
+    """
+    Feeds recorded messages into a brain through a FakeBroker and collects
+    what it publishes. The brain runs on a VirtualClock: messages are
+    injected at their recorded offsets and the brain is ticked at the
+    interval its current state asks for, so the output doesn't depend on
+    machine speed.
+    `speed` paces the virtual clock against the wall clock (1 = real time,
+    10 = ten times faster, None = as fast as possible). `overrides` are
+    config sections merged over the offline defaults; the stream watchdog
+    stays on, so gaps in the recording degrade the brain as they did live.
+    """
+
+    def __init__(self, messages, speed=None, settle=2.0, sleep=time.sleep, wall_clock=time.monotonic,
+                 overrides=None):
+        self.messages = sorted(messages, key=lambda message: message[0])
+        self.speed = speed
+        self.settle = settle
+        self.sleep = sleep
+        self.wall_clock = wall_clock
+        self.overrides = overrides
+        self.clock = VirtualClock()
+        self.broker = FakeBroker(clock=self.clock.monotonic)
+        self.brain = None
+
+    def start_brain(self):
+        self.brain = start_offline_brain(self.broker, self.clock, self.overrides)
+        # Drop anything published during startup; the replay output starts at t=0
+        self.broker.take_published()
+        return self.brain
+
+    def run(self):
+        """Replay every message, tick until `settle` seconds after the last one, return the output."""
+        brain = self.brain or self.start_brain()
+        clock = self.clock
+        started = clock.monotonic()
+        first = self.messages[0][0] if self.messages else 0.0
+        end = (self.messages[-1][0] - first if self.messages else 0.0) + self.settle
+        wall_start = self.wall_clock()
+        pending = 0
+        while clock.monotonic() - started <= end:
+            while pending < len(self.messages) and self.messages[pending][0] - first <= clock.monotonic() - started:
+                _, topic, payload = self.messages[pending]
+                self.broker.publish(topic, payload)
+                pending += 1
+            brain.scheduler.run_due_timers()
+            brain.tick()
+            clock.advance(brain.state_machine.get_tick_interval() or brain.scheduler.default_interval)
+            if self.speed:
+                delay = wall_start + (clock.monotonic() - started) / self.speed - self.wall_clock()
+                if delay > 0:
+                    self.sleep(delay)
+        logger.info(f"[Replay] {len(self.messages)} messages replayed over {clock.monotonic() - started:.1f} s, "
+                    f"{len(self.broker.published)} published in {self.wall_clock() - wall_start:.2f} s")
+        return [(t, topic, payload) for t, topic, payload, _ in self.broker.take_published()]
+
+    def close(self):
+        if self.brain is not None:
+            self.brain.shutdown()
+
+
+def _strip(value):
+    if isinstance(value, dict):
+        return {key: _strip(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_strip(item) for item in value]
+    return value
+
+
+def normalize(messages):
+    """(topic, payload) of each message with volatile fields removed; volatile message types are skipped."""
+    normalized = []
+    for _, topic, payload in messages:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            normalized.append((topic, payload))
+            continue
+        if isinstance(data, dict) and data.get("type") in VOLATILE_TYPES:
+            continue
+        normalized.append((topic, _strip(data)))
+    return normalized
+
+
+def compare_streams(actual, golden, limit=10):
+    """Differences between two published streams, ignoring timing and volatile fields ([] if equal)."""
+    actual, golden = normalize(actual), normalize(golden)
+    differences = []
+    for i, (got, expected) in enumerate(zip(actual, golden)):
+        if got != expected:
+            differences.append(f"message {i}: expected {expected}, got {got}")
+            if len(differences) >= limit:
+                return differences
+    if len(actual) != len(golden):
+        differences.append(f"expected {len(golden)} messages, got {len(actual)}")
+    return differences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded MQTT session into the workstation brain")
+    parser.add_argument("session", help="session file recorded with recording.enabled")
+    parser.add_argument("--speed", default="max", help="replay speed factor, or 'max' (default)")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to keep ticking after the last message")
+    parser.add_argument("--golden", help="compare the published messages with this recording")
+    parser.add_argument("--write-golden", help="save the published messages as a golden recording")
+    parser.add_argument("--no-liveness", action="store_true",
+                        help="disable the stream watchdog, e.g. for sessions recorded without the sensor topics")
+    args = parser.parse_args(argv)
+
+    speed = None if args.speed == "max" else float(args.speed)
+    overrides = {"liveness": {"enabled": False}} if args.no_liveness else None
+    replay = SessionReplay(read_session(args.session), speed=speed, settle=args.settle, overrides=overrides)
+    try:
+        published = replay.run()
+    finally:
+        replay.close()
+
+    if args.write_golden:
+        write_session(args.write_golden, published)
+        logger.info(f"[Replay] Golden recording written to {args.write_golden}")
+    if args.golden:
+        differences = compare_streams(published, list(read_session(args.golden)))
+        for difference in differences:
+            logger.error(f"[Replay] {difference}")
+        if differences:
+            return 1
+        logger.info("[Replay] Output matches the golden recording")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
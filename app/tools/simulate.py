@@ -0,0 +1,281 @@
+"""
+Headless shift simulation on virtual time, for capacity planning.
+
+A synthetic operator reacts to what the brain publishes, as a person
+following the projector would: it assembles the expected candies after a
+random delay (sometimes with a wrong candy that is fixed later), confirms
+with a dwell in the confirmation cell, and clears the table when asked.
+The real state machine, task manager and consumers run on a VirtualClock
+behind a FakeBroker, so a shift of thousands of subtasks takes seconds.
+
+    python app/tools/simulate.py --units 2000 --output report.json
+
+Run from the repository root. Defaults come from the `simulation`
+section of workstation_config.yaml.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from core.duration_stats import StreamingStats  # noqa: E402
+from core.workstation_states import WaitingConfirmationState  # noqa: E402
+from io_handlers.fake_broker import FakeBroker  # noqa: E402
+from tools.offline import start_offline_brain  # noqa: E402
+from utils.clock import VirtualClock  # noqa: E402
+from utils.config import CONFIG  # noqa: E402
+
+import logging  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "units": 500,  # product units assigned over the shift
+    "products": {"produtoA": 1},  # product -> relative weight in the assignment mix
+    "subtasks": ["T2A"],  # subtasks assigned per product unit
+    "batch_size": 20,  # subtasks per assignment message
+    "batch_interval": 0,  # seconds between assignment messages (0 = all at the start)
+    "assemble_seconds": {"mean": 20.0, "stddev": 5.0},
+    "error_rate": 0.1,  # chance the first attempt has one wrong candy
+    "fix_seconds": {"mean": 5.0, "stddev": 2.0},
+    "confirm_delay_seconds": {"mean": 1.0, "stddev": 0.3},
+    "clean_seconds": {"mean": 4.0, "stddev": 1.0},
+    "work_cell": [1, 1],  # where the operator's hand is while assembling
+    "max_hours": 24,  # stop even if subtasks are left
+    "seed": 1,
+}
+
+
+class Distribution:
+    """Normal distribution clipped at `minimum`, from {mean, stddev}."""
+
+    def __init__(self, settings, rng, minimum=0.0):
+        self.mean = float(settings.get("mean", 0.0))
+        self.stddev = float(settings.get("stddev", 0.0))
+        self.rng = rng
+        self.minimum = minimum
+
+    def sample(self):
+        return max(self.minimum, self.rng.gauss(self.mean, self.stddev))
+
+
+class ShiftReport:
+    """Throughput, subtask durations, time per state and changeovers, from the published messages."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.started = clock.monotonic()
+        self.completed = 0
+        self.cleanings = 0
+        self.durations = StreamingStats()
+        self.by_product = {}
+        self.state_seconds = {}
+        self._state = "idle"
+        self._state_since = self.started
+
+    def _close_state(self):
+        now = self.clock.monotonic()
+        self.state_seconds[self._state] = self.state_seconds.get(self._state, 0.0) + now - self._state_since
+        self._state_since = now
+
+    def on_state(self, state):
+        self._close_state()
+        self._state = state
+        if state == "cleaning":
+            self.cleanings += 1
+
+    def on_completed(self, payload):
+        self.completed += 1
+        duration = payload.get("duration") or 0.0
+        self.durations.add(duration)
+        self.by_product.setdefault(payload.get("product"), StreamingStats()).add(duration)
+
+    def as_dict(self, brain, assigned, wall_seconds):
+        self._close_state()
+        elapsed = self.clock.monotonic() - self.started
+        busy = sum(self.state_seconds.values()) or 1.0
+        return {
+            "virtual_seconds": round(elapsed, 1),
+            "wall_seconds": round(wall_seconds, 2),
+            "speedup": round(elapsed / wall_seconds, 1) if wall_seconds else None,
+            "subtasks_assigned": assigned,
+            "subtasks_completed": self.completed,
+            "throughput_per_hour": round(self.completed / elapsed * 3600, 1) if elapsed else 0.0,
+            "subtask_seconds": self.durations.summary() if self.durations.count else None,
+            "by_product": {product: stats.summary() for product, stats in self.by_product.items()},
+            "state_seconds": {state: round(seconds, 1) for state, seconds in self.state_seconds.items()},
+            "state_share": {state: round(seconds / busy, 3) for state, seconds in self.state_seconds.items()},
+            "changeovers": brain.task_manager.changeovers,
+            "cleanings": self.cleanings,
+            "rule_failures": brain.kpis.rollup()["shift"]["rule_failures"],
+        }
+
+
+class SyntheticOperator:
+    """
+    Listens on the management and task-division topics like the rest of
+    the line would, and schedules its actions on the brain's scheduler so
+    they happen at virtual times between ticks.
+    """
+
+    def __init__(self, brain, broker, settings, rng, report):
+        self.brain = brain
+        self.broker = broker
+        self.settings = settings
+        self.rng = rng
+        self.report = report
+        self.scheduler = brain.scheduler
+        config = brain.config
+        self.hand_topic = config.get("hand_topic", "hands/position")
+        self.candy_topic = config.get("candy_topic", "objdet/results")
+        self.rows, self.cols = config["grid"]["rows"], config["grid"]["cols"]
+        self.confirm_cell = WaitingConfirmationState.confirmation_cell(brain.context)
+        confirm = brain.gestures.gestures.get("confirm")
+        self.dwell = getattr(confirm, "duration", 0.6)
+
+        self.assemble = Distribution(settings["assemble_seconds"], rng, minimum=0.5)
+        self.fix = Distribution(settings["fix_seconds"], rng, minimum=0.2)
+        self.confirm_delay = Distribution(settings["confirm_delay_seconds"], rng, minimum=0.1)
+        self.clean = Distribution(settings["clean_seconds"], rng, minimum=0.2)
+        self.assigned = 0
+
+        client = broker.client_factory()
+        client.on_message = self.on_message
+        client.connect()
+        client.subscribe(config.get("management_topic", "management/interface"))
+        client.subscribe(config.get("task_division_topic", "tasks/subscribe/brain"))
+        self.task_division_topic = config.get("task_division_topic", "tasks/subscribe/brain")
+
+    # Inputs the brain sees
+    def hand_at(self, cell):
+        payload = {}
+        if cell is not None:
+            row, col = cell
+            payload = {"handR_Wrist_x": (col + 0.5) / self.cols, "handR_Wrist_y": (row + 0.5) / self.rows}
+        self.broker.publish(self.hand_topic, json.dumps(payload))
+
+    def place(self, counts):
+        payload = {}
+        i = 0
+        for color, count in sorted(counts.items()):
+            for _ in range(count):
+                payload.update({f"yolo_{i}_class": color, f"yolo_{i}_x1": 400, f"yolo_{i}_y1": 300,
+                                f"yolo_{i}_x2": 420, f"yolo_{i}_y2": 320, f"yolo_{i}_score": 0.9})
+                i += 1
+        self.broker.publish(self.candy_topic, json.dumps(payload))
+
+    def assign(self):
+        """Publish the shift's assignments in batches."""
+        settings = self.settings
+        products, weights = zip(*settings["products"].items())
+        units = self.rng.choices(products, weights=weights, k=settings["units"])
+        pending = [(product, subtask) for product in units for subtask in settings["subtasks"]]
+        batch_size = max(1, settings["batch_size"])
+        for index, start in enumerate(range(0, len(pending), batch_size)):
+            tasks = {}
+            for product, subtask in pending[start:start + batch_size]:
+                tasks.setdefault(product, []).append(subtask)
+            message = json.dumps({"tasks": tasks})
+            self.scheduler.call_later(index * settings["batch_interval"],
+                                      lambda message=message: self.broker.publish(
+                                          self.brain.config.get("task_assignment_topic", "tasks/publish"), message))
+        self.assigned = len(pending)
+
+    # Reactions to what the brain publishes
+    def on_message(self, client, userdata, msg):
+        payload = json.loads(msg.payload)
+        if msg.topic == self.task_division_topic:
+            self.report.on_completed(payload)
+            if self.report.completed >= self.assigned:
+                self.scheduler.call_later(0, self.scheduler.stop)
+            return
+        kind = payload.get("type")
+        if kind == "state_transition":
+            self.report.on_state(payload["to_state"])
+            if payload["to_state"] == "cleaning":
+                self.scheduler.call_later(self.clean.sample(), self.clear_table)
+        elif kind == "task_update" and payload.get("status") == "started":
+            self.start_subtask()
+        elif kind == "user_action" and payload.get("action") == "confirmation_required":
+            self.scheduler.call_later(self.confirm_delay.sample(), self.confirm)
+
+    def start_subtask(self):
+        self.hand_at(self.settings["work_cell"])
+        expected = dict(self.brain.state.data.get("ExpectedConfig") or {})
+        assembled = self.assemble.sample()
+        if expected and self.rng.random() < self.settings["error_rate"]:
+            wrong = dict(expected)
+            color = self.rng.choice(sorted(wrong))
+            wrong[color] += 1
+            self.scheduler.call_later(assembled, lambda: self.place(wrong))
+            assembled += self.fix.sample()
+        self.scheduler.call_later(assembled, lambda: self.place(expected))
+
+    def confirm(self):
+        self.hand_at(self.confirm_cell)
+        # Hold a little past the dwell so the next tick sees it complete, then take the hand away
+        self.scheduler.call_later(self.dwell + 0.2, lambda: self.hand_at(None))
+
+    def clear_table(self):
+        self.hand_at(None)
+        self.place({})
+
+
+def simulate(settings, overrides=None):
+    """Run one shift; returns the report dict."""
+    settings = {**DEFAULTS, **settings}
+    rng = random.Random(settings["seed"])
+    clock = VirtualClock()
+    broker = FakeBroker(clock=clock.monotonic, keep_published=False)
+    # The synthetic operator only publishes sensor frames on changes, which the watchdog would call stale
+    brain = start_offline_brain(broker, clock, {"liveness": {"enabled": False}, **(overrides or {})})
+    report = ShiftReport(clock)
+    try:
+        operator = SyntheticOperator(brain, broker, settings, rng, report)
+        operator.assign()
+        brain.scheduler.call_later(settings["max_hours"] * 3600, brain.scheduler.stop)
+        wall_start = time.perf_counter()
+        brain.scheduler.run(brain.tick, brain.state_machine.get_tick_interval)
+        return report.as_dict(brain, operator.assigned, time.perf_counter() - wall_start)
+    finally:
+        brain.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a shift of the workstation brain on virtual time")
+    parser.add_argument("--units", type=int, help="product units to assign")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--scheduling", choices=["fifo", "changeover"], help="queue order to simulate")
+    parser.add_argument("--output", help="write the JSON report here as well")
+    parser.add_argument("--verbose", action="store_true", help="keep the brain's INFO logs")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    settings = dict(CONFIG.get("simulation") or {})
+    if args.units is not None:
+        settings["units"] = args.units
+    if args.seed is not None:
+        settings["seed"] = args.seed
+    overrides = {"scheduling": {"mode": args.scheduling}} if args.scheduling else None
+
+    report = simulate(settings, overrides)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import time
+
+
+class SystemClock:
+    """Real time: `time()` for timestamps, `monotonic()` for intervals and timers, `sleep()` to wait."""
+
+    monotonic = staticmethod(time.monotonic)
+    sleep = staticmethod(time.sleep)
+    time = staticmethod(time.time)  # Last: it shadows the module inside the class body
+
+
+class VirtualClock:
+    """
+    Simulated time for replays and simulations. It only moves when
+    `advance()` or `sleep()` is called, so a scheduler driven by it runs
+    as fast as the code allows. `time()` is `epoch` plus the elapsed
+    virtual seconds.
+    """
+
+    def __init__(self, start=0.0, epoch=1_700_000_000.0):
+        self.now = start
+        self.epoch = epoch
+
+    def time(self):
+        return self.epoch + self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+    sleep = advance
+
+
+SYSTEM_CLOCK = SystemClock()
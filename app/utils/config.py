@@ -1,7 +1,10 @@
-from utils.yaml_loader import load_yaml
+import copy
 import os
+from collections.abc import Mapping
+
 import dotenv
-dotenv.load_dotenv()
+
+from utils.config_compiler import get_bundle
 
 import logging
 
@@ -12,13 +15,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-CONFIG = load_yaml("config/workstation_config.yaml")
-logger.info(f"[CONFIG] Loaded configuration: {CONFIG}")
 
-broker_ip_os = os.getenv("BROKER_IP", CONFIG["mqtt"].get("broker_ip", "localhost"))
-CONFIG["mqtt"]["broker_ip"] = broker_ip_os
-logger.info(f"[CONFIG] Broker IP set to: {broker_ip_os}")
-logger.info(CONFIG)
+class LazyConfig(Mapping):
+    """
+    Validated workstation config from the compiled config bundle, with the
+    BROKER_IP environment override applied. Nothing is read until the first
+    access, so importing this module does no file I/O.
+    """
+
+    def __init__(self):
+        self._data = None
+
+    def load(self):
+        if self._data is None:
+            dotenv.load_dotenv()
+            # Copy so the override doesn't leak into the shared bundle
+            data = copy.deepcopy(get_bundle().workstation)
+            broker_ip = os.getenv("BROKER_IP", data["mqtt"].get("broker_ip", "localhost"))
+            data["mqtt"]["broker_ip"] = broker_ip
+            logger.info(f"[CONFIG] Broker IP set to: {broker_ip}")
+            self._data = data
+        return self._data
+
+    def override(self, values):
+        """
+        Replace settings for this process only (e.g. from a tool). Dict
+        sections are merged key by key, other values are replaced.
+        """
+        data = self.load()
+        for key, value in values.items():
+            if isinstance(value, dict) and isinstance(data.get(key), dict):
+                data[key] = {**data[key], **value}
+            else:
+                data[key] = value
+
+    def reset(self):
+        """Drop the loaded settings (and overrides); the next access loads them again."""
+        self._data = None
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
 
+    def __repr__(self):
+        return repr(self.load())
 
 
+CONFIG = LazyConfig()
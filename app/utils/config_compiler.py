@@ -0,0 +1,269 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import pickle
+import time
+
+import yaml
+
+from core.temporal import rewrite_condition
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout changes so stale cache files are ignored
+COMPILER_VERSION = 2
+
+CONFIG_FILES = {
+    "workstation": "config/workstation_config.yaml",
+    "rules": "config/rules.yaml",
+    "products": "config/products.yaml",
+}
+CACHE_DIR = ".cache/config"
+
+
+class ConfigError(ValueError):
+    """Raised when the configuration files are missing or invalid."""
+
+    def __init__(self, errors):
+        self.errors = errors if isinstance(errors, list) else [errors]
+        super().__init__("Invalid configuration:\n  " + "\n  ".join(self.errors))
+
+
+class ConfigBundle:
+    """
+    Everything the brain needs from config/, validated and preprocessed:
+    raw sections, product count vectors, the subtask -> task index and the
+    compiled rule conditions. `version` is the content hash of the sources.
+    """
+
+    def __init__(self, data):
+        self.version = data["version"]
+        self.workstation = data["workstation"]
+        self.rules = data["rules"]
+        self.tasks = data["tasks"]
+        self.products = data["products"]
+        self.colors = data["colors"]
+        self.product_vectors = data["product_vectors"]
+        self.subtask_index = data["subtask_index"]
+        self.compiled_rules = {
+            condition: marshal.loads(code) for condition, code in data["compiled_rules"].items()
+        }
+
+
+def _require(errors, condition, message):
+    if not condition:
+        errors.append(message)
+    return condition
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_workstation(config, errors, source="workstation_config.yaml"):
+    if not _require(errors, isinstance(config, dict), f"{source}: expected a mapping at the top level"):
+        return
+    mqtt_conf = config.get("mqtt")
+    if _require(errors, isinstance(mqtt_conf, dict), f"{source}: mqtt: required mapping"):
+        _require(errors, isinstance(mqtt_conf.get("broker_ip", ""), str), f"{source}: mqtt.broker_ip: expected a string")
+        _require(errors, _is_int(mqtt_conf.get("broker_port", 1883)), f"{source}: mqtt.broker_port: expected an integer")
+    grid = config.get("grid")
+    if _require(errors, isinstance(grid, dict), f"{source}: grid: required mapping"):
+        for key in ("rows", "cols", "image_width", "image_height"):
+            value = grid.get(key)
+            _require(errors, _is_int(value) and value > 0, f"{source}: grid.{key}: expected a positive integer, got {value!r}")
+    for key, value in config.items():
+        if key.endswith("_topic"):
+            _require(errors, isinstance(value, str) and value, f"{source}: {key}: expected a non-empty string")
+
+
+def validate_rules(document, errors, source="rules.yaml"):
+    if not _require(errors, isinstance(document, dict), f"{source}: expected a mapping at the top level"):
+        return {}, {}
+    rules = document.get("rules") or {}
+    tasks = document.get("tasks") or {}
+    _require(errors, isinstance(rules, dict), f"{source}: rules: expected a mapping")
+    _require(errors, isinstance(tasks, dict), f"{source}: tasks: expected a mapping")
+    if not isinstance(rules, dict) or not isinstance(tasks, dict):
+        return {}, {}
+
+    for rule_id, rule in rules.items():
+        if not _require(errors, isinstance(rule, dict), f"{source}: rules.{rule_id}: expected a mapping"):
+            continue
+        condition = rule.get("if")
+        if _require(errors, isinstance(condition, str) and condition.strip(), f"{source}: rules.{rule_id}.if: required expression"):
+            try:
+                compile(rewrite_condition(condition), f"<rule {rule_id}>", "eval")
+            except SyntaxError as e:
+                errors.append(f"{source}: rules.{rule_id}.if: invalid expression {condition!r} ({e.msg})")
+
+    seen_subtasks = {}
+    for task_id, task in tasks.items():
+        if not _require(errors, isinstance(task, dict), f"{source}: tasks.{task_id}: expected a mapping"):
+            continue
+        for dependency in task.get("dependencies", []) or []:
+            _require(errors, dependency in tasks, f"{source}: tasks.{task_id}.dependencies: unknown task {dependency!r}")
+        subtasks = task.get("subtasks")
+        if not _require(errors, isinstance(subtasks, dict) and subtasks, f"{source}: tasks.{task_id}.subtasks: required mapping"):
+            continue
+        for subtask_id, subtask in subtasks.items():
+            path = f"{source}: tasks.{task_id}.subtasks.{subtask_id}"
+            if subtask_id in seen_subtasks:
+                errors.append(f"{path}: subtask id already defined in {seen_subtasks[subtask_id]}")
+            seen_subtasks[subtask_id] = task_id
+            if not _require(errors, isinstance(subtask, dict), f"{path}: expected a mapping"):
+                continue
+            _require(errors, isinstance(subtask.get("task_name"), str), f"{path}.task_name: required string")
+            for rule_id in subtask.get("rules", []) or []:
+                _require(errors, rule_id in rules, f"{path}.rules: unknown rule {rule_id!r}")
+    return rules, tasks
+
+
+def validate_products(document, errors, source="products.yaml"):
+    products = document.get("produtos") if isinstance(document, dict) else None
+    if not _require(errors, isinstance(products, dict) and products, f"{source}: produtos: required mapping"):
+        return {}
+    for product_id, product in products.items():
+        path = f"{source}: produtos.{product_id}"
+        if not _require(errors, isinstance(product, dict), f"{path}: expected a mapping"):
+            continue
+        config = product.get("config")
+        if not _require(errors, isinstance(config, dict) and config, f"{path}.config: required mapping of color -> count"):
+            continue
+        for color, count in config.items():
+            _require(errors, _is_int(count) and count >= 0, f"{path}.config.{color}: expected a non-negative integer, got {count!r}")
+    return products
+
+
+def build_bundle_data(version, workstation, rules_document, products_document):
+    """Validate the parsed documents and derive the compiled structures."""
+    errors = []
+    validate_workstation(workstation, errors)
+    rules, tasks = validate_rules(rules_document, errors)
+    products = validate_products(products_document, errors)
+    if errors:
+        raise ConfigError(errors)
+
+    colors = tuple(sorted({color for product in products.values() for color in product["config"]}))
+    product_vectors = {
+        product_id: tuple(product["config"].get(color, 0) for color in colors)
+        for product_id, product in products.items()
+    }
+    subtask_index = {
+        subtask_id: task_id
+        for task_id, task in tasks.items()
+        for subtask_id in task["subtasks"]
+    }
+    compiled_rules = {
+        rule["if"]: marshal.dumps(compile(rewrite_condition(rule["if"]), f"<rule {rule_id}>", "eval"))
+        for rule_id, rule in rules.items()
+    }
+    return {
+        "version": version,
+        "workstation": workstation,
+        "rules": rules,
+        "tasks": tasks,
+        "products": products,
+        "colors": colors,
+        "product_vectors": product_vectors,
+        "subtask_index": subtask_index,
+        "compiled_rules": compiled_rules,
+    }
+
+
+def _read_sources(paths):
+    sources = {}
+    for name, path in paths.items():
+        try:
+            with open(path, "rb") as f:
+                sources[name] = f.read()
+        except OSError as e:
+            raise ConfigError(f"{path}: cannot read file ({e.strerror})")
+    return sources
+
+
+def content_hash(sources):
+    # Marshalled code objects are only valid for the same interpreter version
+    digest = hashlib.sha256(f"compiler-v{COMPILER_VERSION}".encode() + importlib.util.MAGIC_NUMBER)
+    for name in sorted(sources):
+        digest.update(name.encode() + b"\0" + sources[name] + b"\0")
+    return digest.hexdigest()
+
+
+def compile_sources(sources, version=None):
+    """Compile already-read file contents (name -> bytes) into a ConfigBundle."""
+    version = version or content_hash(sources)
+    documents = {}
+    for name, content in sources.items():
+        try:
+            documents[name] = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"{CONFIG_FILES.get(name, name)}: YAML syntax error: {e}")
+    data = build_bundle_data(version, documents["workstation"], documents["rules"], documents["products"])
+    return ConfigBundle(data), data
+
+
+def compile_config(paths=None, cache_dir=CACHE_DIR):
+    """
+    Load, validate and compile the config files. The compiled result is
+    cached in `cache_dir` keyed by the sources' content hash, so unchanged
+    configs are loaded without parsing any YAML.
+    """
+    started = time.perf_counter()
+    paths = paths or CONFIG_FILES
+    sources = _read_sources(paths)
+    version = content_hash(sources)
+    cache_path = os.path.join(cache_dir, f"{version}.pickle") if cache_dir else None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                bundle = ConfigBundle(pickle.load(f))
+            logger.info(f"[CONFIG] Loaded compiled config {version[:12]} from cache "
+                        f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return bundle
+        except Exception as e:
+            logger.warning(f"[CONFIG] Ignoring unreadable config cache {cache_path}: {e}")
+
+    bundle, data = compile_sources(sources, version)
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+            # Only the current version is worth keeping
+            for name in os.listdir(cache_dir):
+                if name.endswith(".pickle") and name != os.path.basename(cache_path):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError as e:
+            logger.warning(f"[CONFIG] Could not write config cache: {e}")
+
+    logger.info(f"[CONFIG] Compiled config {version[:12]} in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return bundle
+
+
+_BUNDLE = None
+
+
+def get_bundle():
+    """Return the process-wide compiled config, compiling it on first use."""
+    global _BUNDLE
+    if _BUNDLE is None:
+        _BUNDLE = compile_config()
+    return _BUNDLE
+
+
+def set_bundle(bundle):
+    global _BUNDLE
+    _BUNDLE = bundle
@@ -0,0 +1,150 @@
+import json
+import os
+import struct
+import threading
+import time
+from array import array
+
+from io_handlers.session_recorder import write_session
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Event kinds
+INBOUND = 1  # topic, raw payload
+OUTBOUND = 2  # topic, JSON payload
+TRANSITION = 3  # "from->to"
+RULE = 4  # condition, b"1" / b"0"
+KIND_NAMES = {INBOUND: "inbound", OUTBOUND: "outbound", TRANSITION: "transition", RULE: "rule"}
+
+# Per event: timestamp, kind, topic length, payload length; then the topic and payload bytes
+HEADER = struct.Struct("<dBHI")
+
+
+class FlightRecorder:
+    """
+    Always-on black box: the most recent inbound frames, transitions, rule
+    results and publishes in one preallocated bytearray. The buffer is
+    split into `segments` equal segments filled in turn; starting a new
+    segment discards the oldest one, so recording is a header pack_into and
+    two slice copies under a lock, with no allocation per event. `dump()`
+    writes the last `seconds` as session files the replay tool loads.
+    """
+
+    def __init__(self, size=8 * 1024 * 1024, segments=64, seconds=60.0, dump_dir="data/flight",
+                 clock=time.time, enabled=True):
+        self._lock = threading.Lock()
+        self.configure(enabled, size, segments, seconds, dump_dir, clock)
+
+    def configure(self, enabled=True, size=8 * 1024 * 1024, segments=64, seconds=60.0, dump_dir="data/flight",
+                  clock=time.time):
+        with self._lock:
+            self.enabled = enabled
+            self.seconds = seconds
+            self.dump_dir = dump_dir
+            self.clock = clock
+            self.segments = segments
+            self.segment_size = max(size // segments, 4096) if enabled else 0
+            self._buffer = bytearray(self.segment_size * segments)
+            self._fill = array("l", [0] * segments)
+            self._current = 0
+            self.count = 0
+            self.truncated = 0
+
+    def record(self, kind, topic, payload=b""):
+        if not self.enabled:
+            return
+        topic = topic.encode("utf-8")
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        size = HEADER.size + len(topic) + len(payload)
+        with self._lock:
+            segment_size = self.segment_size
+            if size > segment_size:
+                # A single event never spans segments: keep the head of the payload
+                payload = payload[:max(segment_size - HEADER.size - len(topic), 0)]
+                size = HEADER.size + len(topic) + len(payload)
+                self.truncated += 1
+            segment = self._current
+            fill = self._fill[segment]
+            if fill + size > segment_size:
+                segment = self._current = (segment + 1) % self.segments
+                fill = 0
+            offset = segment * segment_size + fill
+            buffer = self._buffer
+            HEADER.pack_into(buffer, offset, self.clock(), kind, len(topic), len(payload))
+            offset += HEADER.size
+            buffer[offset:offset + len(topic)] = topic
+            offset += len(topic)
+            buffer[offset:offset + len(payload)] = payload
+            self._fill[segment] = fill + size
+            self.count += 1
+
+    def events(self):
+        """(timestamp, kind, topic, payload bytes) of every event still in the ring, oldest first."""
+        with self._lock:
+            buffer = bytes(self._buffer)
+            fill = list(self._fill)
+            current = self._current
+            segment_size = self.segment_size
+        events = []
+        for i in range(1, self.segments + 1):
+            segment = (current + i) % self.segments
+            offset = segment * segment_size
+            end = offset + fill[segment]
+            while offset < end:
+                t, kind, topic_length, payload_length = HEADER.unpack_from(buffer, offset)
+                offset += HEADER.size
+                topic = buffer[offset:offset + topic_length].decode("utf-8")
+                offset += topic_length
+                events.append((t, kind, topic, buffer[offset:offset + payload_length]))
+                offset += payload_length
+        return events
+
+    def dump(self, reason, seconds=None):
+        """
+        Write the last `seconds` (default: the configured window) to
+        <dump_dir>/flight-<time>-<reason>: `.wbs` holds the inbound frames
+        (replayable), `.out.wbs` the publishes (a golden for the replay
+        comparison) and `.jsonl` the full timeline. Returns the path prefix.
+        """
+        if not self.enabled:
+            return None
+        now = self.clock()
+        cutoff = now - (self.seconds if seconds is None else seconds)
+        events = [event for event in self.events() if event[0] >= cutoff]
+        os.makedirs(self.dump_dir, exist_ok=True)
+        safe_reason = "".join(c if c.isalnum() or c in "-_" else "_" for c in reason)[:60]
+        prefix = os.path.join(self.dump_dir, f"flight-{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+                                             f"-{safe_reason}")
+        write_session(prefix + ".wbs", [(t, topic, payload) for t, kind, topic, payload in events if kind == INBOUND])
+        write_session(prefix + ".out.wbs",
+                      [(t, topic, payload) for t, kind, topic, payload in events if kind == OUTBOUND])
+        with open(prefix + ".jsonl", "w") as f:
+            for t, kind, topic, payload in events:
+                f.write(json.dumps({"t": t, "kind": KIND_NAMES.get(kind, kind), "topic": topic,
+                                    "payload": payload.decode("utf-8", "replace")}) + "\n")
+        logger.info(f"[FlightRecorder] Dumped {len(events)} events ({reason}) to {prefix}.*")
+        return prefix
+
+    def dump_async(self, reason, on_done=None):
+        """Dump on a background thread; `on_done(prefix)` is called when the files are written."""
+        def run():
+            try:
+                prefix = self.dump(reason)
+            except Exception as e:
+                logger.error(f"[FlightRecorder] Dump failed: {e}")
+                return
+            if on_done is not None and prefix is not None:
+                on_done(prefix)
+        threading.Thread(target=run, name="flight-recorder-dump", daemon=True).start()
+
+
+# Process-wide recorder shared by consumers, publishers, the evaluator and the state machine
+FLIGHT_RECORDER = FlightRecorder(enabled=False)
@@ -0,0 +1,278 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond handlers to slow ticks
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, key):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(labelnames, key))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        """Return a list of (suffix, label_string, value) tuples."""
+        with self._lock:
+            return [("", _format_labels(self.labelnames, key), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from `function()` at collection time."""
+        self._function = function
+
+    def get(self, **labels):
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            try:
+                return [("", "", self._function())]
+            except Exception as e:
+                logger.info(f"[Metrics] Failed to collect gauge {self.name}: {e}")
+                return []
+        return super().samples()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Per-bucket counts (last slot is +Inf), then count and sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def time(self, **labels):
+        """Context manager observing the wall time of the enclosed block."""
+        return _Timer(self, labels)
+
+    def get(self, **labels):
+        """Return (count, sum) for the given labels."""
+        entry = self._values.get(self._key(labels))
+        return (entry[1], entry[2]) if entry else (0, 0.0)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        for key, counts, count, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames + ("le",), key + (le,))
+                samples.append(("_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_count", labels, count))
+            samples.append(("_sum", labels, total))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Return a JSON-friendly view: counters/gauges as values, histograms as count/sum."""
+        snapshot = {}
+        for metric in list(self._metrics.values()):
+            values = {}
+            if isinstance(metric, Histogram):
+                for suffix, labels, value in metric.samples():
+                    if suffix in ("_count", "_sum"):
+                        values.setdefault(labels or "_", {})[suffix[1:]] = value
+            else:
+                for _, labels, value in metric.samples():
+                    values[labels or "_"] = value
+            snapshot[metric.name] = values
+        return snapshot
+
+
+class MetricsReporter:
+    """Periodically sends registry snapshots, adding per-second rates for counters."""
+
+    def __init__(self, registry, send):
+        self.registry = registry
+        self.send = send
+        self._last_counters = {}
+        self._last_time = None
+
+    def report(self):
+        now = time.monotonic()
+        snapshot = self.registry.snapshot()
+        rates = {}
+        if self._last_time is not None and now > self._last_time:
+            elapsed = now - self._last_time
+            for name, values in snapshot.items():
+                if not isinstance(self.registry.get(name), Counter):
+                    continue
+                previous = self._last_counters.get(name, {})
+                rates[name] = {
+                    labels: round((value - previous.get(labels, 0)) / elapsed, 3)
+                    for labels, value in values.items()
+                }
+        self._last_counters = {
+            name: values for name, values in snapshot.items()
+            if isinstance(self.registry.get(name), Counter)
+        }
+        self._last_time = now
+        self.send({"values": snapshot, "rates": rates})
+
+
+class MetricsServer:
+    """Serves the registry over HTTP (GET /metrics) from a background thread."""
+
+    def __init__(self, registry, host="127.0.0.1", port=8000):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"[Metrics] Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+
+# Process-wide registry shared by all components
+METRICS = MetricsRegistry()
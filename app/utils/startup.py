@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+
+from utils.metrics import METRICS
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STARTUP_PHASE_SECONDS = METRICS.gauge(
+    "brain_startup_phase_seconds", "Duration of each startup phase", ["phase"])
+
+
+class StartupReport:
+    """Times the startup phases and the moment every connection is up."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started_at = clock()
+        self.phases = {}
+        self.links_up_after = None
+        self.links_down = []
+
+    @contextmanager
+    def phase(self, name):
+        started = self.clock()
+        try:
+            yield
+        finally:
+            duration = self.clock() - started
+            self.phases[name] = duration
+            STARTUP_PHASE_SECONDS.set(duration, phase=name)
+            logger.info(f"[Startup] Phase '{name}' took {duration * 1000:.1f} ms")
+
+    def links_settled(self, down=()):
+        """Record when the connections finished coming up (or gave up waiting)."""
+        self.links_up_after = self.clock() - self.started_at
+        self.links_down = list(down)
+        STARTUP_PHASE_SECONDS.set(self.links_up_after, phase="links_up")
+
+    def as_dict(self):
+        return {
+            "phases_ms": {name: round(duration * 1000, 1) for name, duration in self.phases.items()},
+            "ready_ms": round(sum(self.phases.values()) * 1000, 1),
+            "links_up_ms": round(self.links_up_after * 1000, 1) if self.links_up_after is not None else None,
+            "links_down": self.links_down,
+        }
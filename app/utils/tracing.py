@@ -0,0 +1,155 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+from utils.metrics import METRICS
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TRACE_HOP_SECONDS = METRICS.histogram(
+    "brain_trace_hop_seconds", "Sensor-to-actuation latency per hop", ["hop"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+_trace_ids = itertools.count(1)
+
+
+def producer_timestamp(payload):
+    """Return the producer timestamp of a payload in epoch seconds, or None if absent."""
+    if not isinstance(payload, dict):
+        return None
+    value = payload.get("timestamp", payload.get("ts"))
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    # Producers may stamp in milliseconds
+    return value / 1000.0 if value > 1e11 else value
+
+
+class Trace:
+    """Timestamps of one inbound frame on its way to the publish it causes."""
+    __slots__ = ("trace_id", "topic", "producer_ts", "received_wall", "received_at",
+                 "state_updated_at", "picked_up_at", "decided_at", "decision",
+                 "published_at", "published_topic")
+
+    def __init__(self, topic, received_at=None, received_wall=None):
+        self.trace_id = next(_trace_ids)
+        self.topic = topic
+        self.producer_ts = None
+        self.received_wall = time.time() if received_wall is None else received_wall
+        self.received_at = time.perf_counter() if received_at is None else received_at
+        self.state_updated_at = None
+        self.picked_up_at = None
+        self.decided_at = None
+        self.decision = None
+        self.published_at = None
+        self.published_topic = None
+
+    def hops(self):
+        """Return per-hop latencies in seconds for the hops that were reached."""
+        hops = {}
+        if self.producer_ts is not None and self.received_wall >= self.producer_ts:
+            hops["network"] = self.received_wall - self.producer_ts
+        marks = [
+            ("handler", self.received_at, self.state_updated_at),
+            ("queue", self.state_updated_at, self.picked_up_at),
+            ("decision", self.picked_up_at, self.decided_at),
+            ("publish", self.decided_at, self.published_at),
+            ("total", self.received_at, self.published_at),
+        ]
+        for hop, start, end in marks:
+            if start is not None and end is not None:
+                hops[hop] = max(end - start, 0.0)
+        if "network" in hops and "total" in hops:
+            hops["end_to_end"] = hops["network"] + hops["total"]
+        return hops
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "topic": self.topic,
+            "producer_ts": self.producer_ts,
+            "received_wall": self.received_wall,
+            "decision": self.decision,
+            "published_topic": self.published_topic,
+            "hops_ms": {hop: round(value * 1000, 3) for hop, value in self.hops().items()},
+        }
+
+
+class Tracer:
+    """
+    Carries the latest inbound frame trace through a state machine tick.
+    A trace is completed when the tick makes a decision (state transition)
+    and publishes; its hop latencies are then recorded and slow traces logged.
+    """
+
+    def __init__(self, enabled=True, slow_threshold=0.25, log_path=None):
+        self._local = threading.local()
+        self._trace_logger = None
+        self.configure(enabled, slow_threshold, log_path)
+
+    def configure(self, enabled=True, slow_threshold=0.25, log_path=None):
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        if log_path and self._trace_logger is None:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._trace_logger = logging.getLogger("brain.slow_traces")
+            self._trace_logger.propagate = False
+            self._trace_logger.addHandler(handler)
+
+    def start(self, topic):
+        """Create a trace for a frame received now."""
+        return Trace(topic) if self.enabled else None
+
+    def begin_tick(self, trace):
+        """Make `trace` the active trace of this thread if it has not been picked up yet."""
+        if trace is None or trace.picked_up_at is not None:
+            self._local.active = None
+            return
+        trace.picked_up_at = time.perf_counter()
+        self._local.active = trace
+
+    def mark_decision(self, decision):
+        trace = getattr(self._local, "active", None)
+        if trace is not None and trace.decided_at is None:
+            trace.decided_at = time.perf_counter()
+            trace.decision = decision
+
+    def mark_publish(self, topic):
+        trace = getattr(self._local, "active", None)
+        if trace is not None and trace.decided_at is not None and trace.published_at is None:
+            trace.published_at = time.perf_counter()
+            trace.published_topic = topic
+
+    def end_tick(self):
+        """Record the active trace if the tick led to a decision and a publish."""
+        trace = getattr(self._local, "active", None)
+        self._local.active = None
+        if trace is None or trace.published_at is None:
+            return
+        hops = trace.hops()
+        for hop, value in hops.items():
+            TRACE_HOP_SECONDS.observe(value, hop=hop)
+        if hops.get("total", 0.0) >= self.slow_threshold:
+            record = json.dumps(trace.to_dict())
+            if self._trace_logger:
+                self._trace_logger.info(record)
+            else:
+                logger.info(f"[Trace] Slow trace: {record}")
+
+
+# Process-wide tracer shared by consumers, the state machine and publishers
+TRACER = Tracer()
@@ -0,0 +1,30 @@
+import unittest
+
+from tools.benchmark import compare, measure, percentile, run
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile_and_measure(self):
+        self.assertEqual(percentile(list(range(1, 101)), 50), 50)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+        result = measure(lambda: None, min_time=0.01, warmup=1)
+        self.assertGreater(result["iterations"], 0)
+        self.assertLessEqual(result["p50_us"], result["p99_us"])
+
+    def test_compare_flags_throughput_and_tail_regressions(self):
+        baseline = {"results": {"a": {"ops_per_sec": 1000.0, "p99_us": 10.0},
+                                "b": {"ops_per_sec": 1000.0, "p99_us": 10.0}}}
+        current = {"results": {"a": {"ops_per_sec": 900.0, "p99_us": 14.0},
+                               "b": {"ops_per_sec": 700.0, "p99_us": 30.0},
+                               "new": {"ops_per_sec": 1.0, "p99_us": 1.0}}}
+        regressions = compare(current, baseline, threshold=0.15, p99_threshold=0.5)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(regression.startswith("b:") for regression in regressions))
+
+    def test_run_selected_cases(self):
+        results = run(only="evaluate_rule", min_time=0.01)["results"]
+        self.assertEqual(len(results), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
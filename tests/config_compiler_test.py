@@ -0,0 +1,43 @@
+import unittest
+
+import yaml
+
+from utils.config_compiler import ConfigError, compile_config, compile_sources, CONFIG_FILES
+
+
+def load_sources():
+    sources = {}
+    for name, path in CONFIG_FILES.items():
+        with open(path, "rb") as f:
+            sources[name] = f.read()
+    return sources
+
+
+class TestConfigCompiler(unittest.TestCase):
+    def test_repository_config_compiles(self):
+        bundle = compile_config(cache_dir=None)
+        self.assertEqual(bundle.subtask_index["T2A"], "Task2")
+        self.assertEqual(bundle.colors, ("Blue", "Green", "Red"))
+        self.assertEqual(bundle.product_vectors["produtoA"], (1, 3, 1))
+        self.assertIn("CombinationValid == True", bundle.compiled_rules)
+
+    def test_invalid_config_reports_every_error(self):
+        sources = load_sources()
+        rules = yaml.safe_load(sources["rules"])
+        rules["rules"]["rule2"]["if"] = "CombinationValid =="
+        rules["tasks"]["Task2"]["dependencies"] = ["Task9"]
+        sources["rules"] = yaml.safe_dump(rules).encode()
+        products = yaml.safe_load(sources["products"])
+        products["produtos"]["produtoA"]["config"]["Blue"] = -1
+        sources["products"] = yaml.safe_dump(products).encode()
+
+        with self.assertRaises(ConfigError) as raised:
+            compile_sources(sources)
+        errors = "\n".join(raised.exception.errors)
+        self.assertIn("rules.rule2.if: invalid expression", errors)
+        self.assertIn("tasks.Task2.dependencies: unknown task 'Task9'", errors)
+        self.assertIn("produtos.produtoA.config.Blue", errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from core.config_watcher import ConfigWatcher
+from core.task_journal import TaskJournal
+from core.task_manager import TaskManager
+from utils.config_compiler import CONFIG_FILES, compile_config
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = {}
+        for name, path in CONFIG_FILES.items():
+            self.paths[name] = os.path.join(self.tmp, os.path.basename(path))
+            shutil.copy(path, self.paths[name])
+        self.bundle = compile_config(self.paths, cache_dir=None)
+        self.errors = []
+        self.unchanged = []
+        self.watcher = ConfigWatcher(self.bundle.version, self.paths,
+                                     on_error=lambda errors, source: self.errors.append(source),
+                                     on_unchanged=lambda version, source: self.unchanged.append(version))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_changed_products_are_compiled_into_a_pending_bundle(self):
+        with open(self.paths["products"]) as f:
+            products = yaml.safe_load(f)
+        products["produtos"]["produtoA"]["config"]["Red"] = 4
+        with open(self.paths["products"], "w") as f:
+            yaml.safe_dump(products, f)
+
+        self.watcher._compile(None, "files:products")
+        bundle, _, source = self.watcher.take_pending()
+        self.assertNotEqual(bundle.version, self.bundle.version)
+        self.assertEqual(bundle.products["produtoA"]["config"]["Red"], 4)
+        self.assertIsNone(self.watcher.take_pending())
+
+    def test_change_back_before_the_swap_cancels_the_pending_bundle(self):
+        with open(self.paths["products"]) as f:
+            original = f.read()
+        products = yaml.safe_load(original)
+        products["produtos"]["produtoA"]["config"]["Red"] = 4
+        changed = yaml.safe_dump(products)
+
+        self.watcher._compile({"products": changed}, "mqtt")
+        self.watcher._compile({"products": original}, "mqtt")
+        self.assertIsNone(self.watcher.take_pending())
+        self.assertEqual(self.unchanged, [self.bundle.version])
+
+        # Once the loop has taken the changed bundle, going back is a change again
+        self.watcher._compile({"products": changed}, "mqtt")
+        taken, _, _ = self.watcher.take_pending()
+        self.watcher._compile({"products": original}, "mqtt")
+        bundle, _, _ = self.watcher.take_pending()
+        self.assertEqual(bundle.version, self.bundle.version)
+        self.assertNotEqual(taken.version, self.bundle.version)
+
+    def test_invalid_update_is_rejected(self):
+        self.watcher._compile({"rules": "rules: {broken: {if: 'x =='}}"}, "mqtt")
+        self.assertIsNone(self.watcher.take_pending())
+        self.assertEqual(self.errors, ["mqtt"])
+
+
+class TestTaskManagerReload(unittest.TestCase):
+    OLD = {"Task1": {"subtasks": {"T1A": {"task_name": "old", "rules": ["rule1"]}, "T1B": {"task_name": "b"}}}}
+    NEW = {"Task1": {"subtasks": {"T1A": {"task_name": "new", "rules": ["rule2"]}}}}
+
+    def test_in_flight_subtask_keeps_its_definitions(self):
+        manager = TaskManager(self.OLD, config_version="v1")
+        manager.enqueue_subtask("Task1", "T1A")
+        manager.enqueue_subtask("Task1", "T1B")
+        manager.enqueue_subtask("Task1", "T1A")
+        self.assertEqual(manager.get_current_subtask()["task_name"], "old")
+
+        dropped = manager.set_tasks(self.NEW, "v2")
+        self.assertEqual([entry.subtask_id for entry in dropped], ["T1B"])
+        self.assertEqual(manager.get_current_subtask()["task_name"], "old")
+        self.assertEqual(manager.get_current_instance().config_version, "v1")
+
+        manager.advance()
+        manager.clear()
+        self.assertEqual(manager.get_current_subtask()["task_name"], "new")
+        self.assertEqual(manager.get_current_instance().config_version, "v2")
+        self.assertEqual(manager.total_enqueued, 2)
+
+    def test_pending_subtasks_take_reloaded_product_configs(self):
+        tasks = {"Task2": {"subtasks": {"T2A": {"task_name": "box"}}}}
+        old = {"produtoA": {"config": {"Red": 1}}, "produtoB": {"config": {"Blue": 1}}}
+        new = {"produtoA": {"config": {"Red": 4}}, "produtoB": {"config": {"Blue": 1}}}
+        for mode in ("fifo", "changeover"):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "journal.jsonl")
+                manager = TaskManager(tasks, {"mode": mode}, TaskJournal(path), config_version="v1")
+                manager.enqueue_subtask("Task2", "T2A", "produtoA", {"Red": 1})
+                manager.enqueue_subtask("Task2", "T2A", "produtoA", {"Red": 1})
+                manager.enqueue_subtask("Task2", "T2A", "produtoB", {"Blue": 1})
+                manager.enqueue_subtask("Task2", "T2A", "produtoA", {"Green": 2})  # sent with the assignment
+                manager.get_current_subtask()
+
+                manager.set_tasks(tasks, "v2")
+                updated = manager.refresh_configs(old, new)
+                self.assertEqual([entry.seq for entry in updated], [1])
+                configs = {entry.seq: entry.config for entry in manager.subtask_queue}
+                self.assertEqual(configs, {0: {"Red": 1}, 1: {"Red": 4}, 2: {"Blue": 1}, 3: {"Green": 2}})
+                manager.journal.close()
+
+                recovered = TaskManager(tasks, {"mode": mode}, TaskJournal(path))
+                self.assertEqual({entry.seq: entry.config for entry in recovered.subtask_queue}, configs)
+                recovered.journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import random
+import statistics
+import unittest
+
+from core.duration_stats import StreamingStats, DurationTracker
+from core.subtask_queue import SubtaskInstance
+
+
+class TestStreamingStats(unittest.TestCase):
+    def test_mean_variance_and_percentiles(self):
+        rng = random.Random(7)
+        values = [rng.uniform(5, 60) for _ in range(2000)]
+        stats = StreamingStats()
+        for value in values:
+            stats.add(value)
+
+        self.assertAlmostEqual(stats.mean, statistics.mean(values), places=6)
+        self.assertAlmostEqual(stats.variance, statistics.variance(values), places=4)
+        exact_median = statistics.median(values)
+        self.assertLess(abs(stats.percentile(50) - exact_median) / exact_median, 0.08)
+
+
+class TestDurationTracker(unittest.TestCase):
+    def test_forecast_falls_back_to_coarser_stats(self):
+        tracker = DurationTracker()
+        tracker.record("T1A", "produtoA", 10.0)
+        tracker.record("T2A", "produtoA", 30.0)
+        tracker.record("T2A", "produtoB", 50.0)
+
+        pending = [
+            SubtaskInstance("test-0", 0, "Task2", "T2A", "produtoA"),
+            SubtaskInstance("test-1", 1, "Task2", "T2A", "produtoC"),
+            SubtaskInstance("test-2", 2, "Task3", "T3A", "produtoA"),
+        ]
+        # Head: 30 - 5 elapsed; T2A/produtoC: T2A mean 40; T3A: overall mean 30
+        self.assertEqual(tracker.forecast(pending, elapsed_current=5.0)["eta_seconds"], 95.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
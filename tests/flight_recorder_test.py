@@ -0,0 +1,120 @@
+import glob
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from io_handlers.session_recorder import read_session
+from offline_brain import OfflineBrainTestCase
+from utils.clock import VirtualClock
+from utils.flight_recorder import FLIGHT_RECORDER, INBOUND, OUTBOUND, RULE, TRANSITION, FlightRecorder
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def test_ring_keeps_the_newest_events_in_order(self):
+        clock = VirtualClock()
+        recorder = FlightRecorder(size=4 * 4096, segments=4, clock=clock.time)
+        for i in range(2000):
+            recorder.record(INBOUND, "hands/position", json.dumps({"i": i}))
+            clock.advance(0.01)
+
+        events = recorder.events()
+        indices = [json.loads(payload)["i"] for t, kind, topic, payload in events]
+        self.assertEqual(indices[-1], 1999)
+        self.assertEqual(indices, list(range(indices[0], 2000)))
+        # At most one segment's worth is lost to the wrap
+        self.assertGreater(len(events), 3 * 4096 // 40)
+        self.assertEqual(recorder.count, 2000)
+
+    def test_oversized_payload_is_truncated(self):
+        recorder = FlightRecorder(size=2 * 4096, segments=2)
+        recorder.record(OUTBOUND, "t", b"x" * 10000)
+        (t, kind, topic, payload), = recorder.events()
+        self.assertEqual((kind, topic), (OUTBOUND, "t"))
+        self.assertEqual(len(payload), 4096 - 15 - 1)
+        self.assertEqual(recorder.truncated, 1)
+
+    def test_dump_writes_replayable_session_within_window(self):
+        clock = VirtualClock()
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = FlightRecorder(size=64 * 1024, segments=4, seconds=10, dump_dir=tmp, clock=clock.time)
+            recorder.record(INBOUND, "objdet/results", b'{"old": 1}')
+            clock.advance(30)
+            recorder.record(INBOUND, "hands/position", b'{"new": 1}')
+            recorder.record(RULE, "CombinationValid == True", b"0")
+            recorder.record(TRANSITION, "idle->cleaning")
+            recorder.record(OUTBOUND, "management/interface", '{"type": "x"}')
+
+            prefix = recorder.dump("unit test")
+            self.assertTrue(os.path.basename(prefix).endswith("-unit_test"))
+            t0 = clock.time()
+            self.assertEqual(list(read_session(prefix + ".wbs")), [(t0, "hands/position", b'{"new": 1}')])
+            self.assertEqual(list(read_session(prefix + ".out.wbs")),
+                             [(t0, "management/interface", b'{"type": "x"}')])
+            with open(prefix + ".jsonl") as f:
+                timeline = [json.loads(line) for line in f]
+            self.assertEqual([event["kind"] for event in timeline], ["inbound", "rule", "transition", "outbound"])
+
+    def test_disabled_recorder_records_nothing(self):
+        recorder = FlightRecorder(enabled=False)
+        recorder.record(INBOUND, "t", b"x")
+        self.assertEqual(recorder.events(), [])
+        self.assertIsNone(recorder.dump("nothing"))
+
+
+class TestBrainFlightRecorder(OfflineBrainTestCase):
+    def brain_overrides(self):
+        return {"flight_recorder": {
+            "enabled": True, "dump_dir": self.tmp.name, "min_samples": 2, "min_dump_interval": 30}}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        FLIGHT_RECORDER.configure(enabled=False)
+        self.tmp.cleanup()
+
+    def dumps(self, reason):
+        return [m for m in self.messages() if m.get("type") == "flight_recorder_dump" and reason in m["reason"]]
+
+    def wait_for_dump(self, reason, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not self.dumps(reason) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.dumps(reason)
+
+    def test_command_dumps_and_is_rate_limited(self):
+        self.broker.publish("objdet/results", "{}")
+        self.broker.publish("brain/commands", json.dumps({"command": "dump_flight_recorder", "reason": "op"}))
+        self.brain.run_commands()
+        dump, = self.wait_for_dump("op")
+
+        topics = [topic for t, topic, payload in read_session(dump["path"] + ".wbs")]
+        self.assertEqual(topics, ["objdet/results", "brain/commands"])
+
+        self.broker.publish("brain/commands", json.dumps({"command": "dump_flight_recorder", "reason": "again"}))
+        self.brain.run_commands()
+        self.assertEqual(self.dumps("again"), [])
+        self.assertEqual(len(glob.glob(os.path.join(self.tmp.name, "*.wbs"))), 2)
+
+    def test_exception_in_run_dumps_before_shutdown(self):
+        def failing_tick():
+            raise RuntimeError("boom")
+        self.brain.tick = failing_tick
+        with self.assertRaises(RuntimeError):
+            self.brain.run()
+        self.assertEqual(len(glob.glob(os.path.join(self.tmp.name, "*-exception_RuntimeError.jsonl"))), 1)
+
+    def test_slow_subtask_triggers_one_dump(self):
+        durations = self.brain.task_manager.durations
+        for duration in (10.0, 12.0, 11.0):
+            durations.record("T2A", "produtoA", duration)
+        self.brain.on_assignments_received([{"task_id": "T2A", "product": "produtoA"}])
+        self.brain.task_manager.get_current_subtask()
+
+        self.run_for(60, tick=lambda: None)
+
+        self.assertEqual(len(self.wait_for_dump("slow_T2A")), 1)
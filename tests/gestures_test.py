@@ -0,0 +1,71 @@
+import unittest
+
+from core.gestures import GestureEngine
+from core.state import WorkstationState
+
+
+def engine_with(config):
+    engine = GestureEngine.from_config(config, clock=lambda: 0.0)
+    events = []
+    engine.subscribe("*", events.append)
+    return engine, events
+
+
+class TestGestureEngine(unittest.TestCase):
+    def test_dwell_needs_the_full_time_and_fires_once(self):
+        engine, events = engine_with({"confirm": {"type": "dwell", "cell": [2, 4], "ms": 600}})
+        engine.on_hand_cell("handR", (2, 4), now=0.0)
+        engine.on_hand_cell("handR", (2, 3), now=0.3)  # passing through
+        engine.on_hand_cell("handR", (2, 4), now=0.4)
+        engine.dispatch(now=0.9)
+        self.assertEqual(events, [])
+
+        engine.dispatch(now=1.0)
+        engine.on_hand_cell("handR", (2, 4), now=1.5)
+        engine.dispatch(now=2.0)
+        self.assertEqual([(e["gesture"], e["hand"]) for e in events], [("confirm", "handR")])
+
+    def test_dwell_is_rearmed_on_subscribe(self):
+        engine = GestureEngine.from_config({"confirm": {"type": "dwell", "cell": [2, 4], "ms": 500}},
+                                           clock=lambda: 0.0)
+        engine.on_hand_cell("handR", (2, 4), now=0.0)
+        engine.dispatch(now=1.0)  # fired with nobody listening
+
+        events = []
+        engine.subscribe("confirm", events.append, now=5.0)
+        engine.dispatch(now=5.25)
+        self.assertEqual(events, [])  # the hand was already there: no instant confirmation
+        engine.dispatch(now=5.5)
+        self.assertEqual([(e["gesture"], e["hand"]) for e in events], [("confirm", "handR")])
+
+    def test_swipe_in_order_within_time(self):
+        engine, events = engine_with({"next": {"type": "swipe", "cells": [[4, 0], [4, 1], [4, 2]], "max_ms": 500}})
+        for t, cell in [(0.0, (4, 0)), (0.1, (4, 1)), (0.9, (4, 2))]:
+            engine.on_hand_cell("handL", cell, now=t)
+        for t, cell in [(1.0, (4, 0)), (1.1, (4, 1)), (1.2, (4, 2))]:
+            engine.on_hand_cell("handL", cell, now=t)
+        engine.dispatch(now=1.2)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["ms"], 200)
+
+    def test_two_hand_hold(self):
+        engine, events = engine_with({"pause": {"type": "two_hand_hold", "ms": 1000,
+                                                "cells": {"handL": [0, 0], "handR": [0, 4]}}})
+        engine.on_hand_cell("handL", (0, 0), now=0.0)
+        engine.on_hand_cell("handR", (0, 4), now=0.5)
+        engine.dispatch(now=1.4)
+        self.assertEqual(events, [])
+        engine.dispatch(now=1.5)
+        self.assertEqual(events[0]["gesture"], "pause")
+
+    def test_fed_from_state_updates(self):
+        state = WorkstationState()
+        engine, events = engine_with({"confirm": {"cell": [1, 1], "ms": 0}})
+        state.add_listener(engine.on_state_update)
+        state.update("handL_GridCell", (1, 1))
+        engine.dispatch()
+        self.assertEqual(events[0]["cell"], (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from core.hand_data import HandData, HAND_LANDMARKS
+
+
+def hand_payload(label, offset=0.0, score=None):
+    payload = {}
+    for i, name in enumerate(HAND_LANDMARKS):
+        payload[f"{label}_{name}_x"] = 0.1 + offset + i * 0.01
+        payload[f"{label}_{name}_y"] = 0.5 - i * 0.01
+        payload[f"{label}_{name}_z"] = -0.02
+    if score is not None:
+        payload[f"{label}_score"] = score
+    return payload
+
+
+class TestHandData(unittest.TestCase):
+    def test_landmarks_bbox_and_confidence(self):
+        hand = HandData("handL")
+        self.assertTrue(hand.update(hand_payload("handL", score=0.93)))
+        self.assertEqual(hand.count, 21)
+        self.assertAlmostEqual(hand.confidence, 0.93)
+        self.assertAlmostEqual(hand.bbox[0], 0.1)
+        self.assertAlmostEqual(hand.bbox[2], 0.3)
+        self.assertAlmostEqual(hand.bbox[1], 0.3)
+        self.assertAlmostEqual(hand.bbox[3], 0.5)
+        self.assertAlmostEqual(hand.landmark("Index_Finger_Tip")[0], 0.18)
+        self.assertEqual(hand.anchor(), (0.1, 0.5))
+
+    def test_buffers_are_reused_and_missing_hand_is_falsy(self):
+        hand = HandData("handR")
+        xs = hand.xs
+        hand.update(hand_payload("handR"))
+        self.assertTrue(hand)
+        self.assertEqual(hand.confidence, 1.0)
+
+        partial = {key: value for key, value in hand_payload("handR", offset=0.2).items() if "Wrist" not in key}
+        hand.update(partial)
+        self.assertIs(hand.xs, xs)
+        self.assertIsNone(hand.landmark("Wrist"))
+        self.assertAlmostEqual(hand.confidence, 20 / 21)
+
+        self.assertFalse(hand.update(hand_payload("handL")))
+        self.assertFalse(hand)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from core.history import RingSeries, StateHistory, encode_cell, decode_cell
+from core.state import WorkstationState
+
+
+class TestRingSeries(unittest.TestCase):
+    def test_window_queries_match_brute_force(self):
+        rng = random.Random(3)
+        series = RingSeries(50)
+        samples = []
+        t = 0.0
+        for _ in range(173):
+            t += rng.uniform(0.01, 0.2)
+            value = float(rng.randint(0, 4))
+            series.append(t, value)
+            samples.append((t, value))
+
+            for seconds in (0.3, 1.0, 5.0, 100.0):
+                window = [v for ts, v in samples[-50:] if ts >= t - seconds]
+                self.assertEqual(series.window_min(seconds, t), min(window))
+                self.assertEqual(series.window_max(seconds, t), max(window))
+                self.assertAlmostEqual(series.window_mean(seconds, t), sum(window) / len(window))
+                changes = sum(1 for a, b in zip(window, window[1:]) if a != b)
+                self.assertEqual(series.window_changes(seconds, t), changes)
+        self.assertEqual(len(series), 50)
+
+    def test_stable_since_tracks_last_change(self):
+        series = RingSeries(8)
+        for t, value in [(1, 0), (2, 1), (3, 1), (4, 1)]:
+            series.append(t, value)
+        self.assertEqual(series.stable_since(), 2)
+        self.assertEqual(series.latest(), 1)
+
+
+class TestStateHistory(unittest.TestCase):
+    def test_state_records_signals_with_bounded_memory(self):
+        clock = iter(range(1000)).__next__
+        state = WorkstationState(history=StateHistory(seconds=1, rate_hz=10, clock=clock), max_defects=3)
+        for i in range(25):
+            state.update("handL_GridCell", (i % 2, 4))
+            state.add_defect(f"defect {i}")
+
+        cells = state.history.get("handL_GridCell")
+        self.assertEqual(len(cells), 10)
+        self.assertEqual(decode_cell(cells.latest()), (0, 4))
+        self.assertEqual(list(state.data["Defects"]), ["defect 22", "defect 23", "defect 24"])
+        self.assertEqual(encode_cell(None), -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
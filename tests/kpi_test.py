@@ -0,0 +1,67 @@
+import unittest
+
+from core.kpi import KpiAggregator
+from offline_brain import OfflineBrainTestCase
+from utils.clock import VirtualClock
+
+
+class TestKpiAggregator(unittest.TestCase):
+    def setUp(self):
+        # Virtual time starts 20 s into a minute and 800 s into an hour
+        self.clock = VirtualClock()
+        self.kpis = KpiAggregator(self.clock.time, bucket_seconds=60, sliding_buckets=3)
+
+    def test_state_time_is_split_across_buckets(self):
+        self.kpis.on_state("executing_task")
+        self.clock.advance(70)
+        self.kpis.record_completion("produtoA", 70.0)
+        self.kpis.on_state("cleaning")
+        self.clock.advance(20)
+
+        rollup = self.kpis.rollup()
+        self.assertEqual(rollup["minute"]["state_seconds"], {"executing_task": 40.0})
+        self.assertEqual(rollup["minute"]["start"], self.clock.epoch)
+        self.assertEqual(rollup["shift"]["state_seconds"], {"executing_task": 70.0, "cleaning": 20.0})
+        self.assertEqual(rollup["shift"]["units"], 1)
+        self.assertEqual(rollup["shift"]["by_product"]["produtoA"], {"units": 1, "seconds": 70.0, "mean_seconds": 70.0})
+        self.assertEqual(rollup["shift"]["throughput_per_hour"], 40.0)
+
+    def test_sliding_window_forgets_while_tumbling_windows_keep(self):
+        self.kpis.on_state("waiting_for_task")
+        self.kpis.record_completion("produtoA", 5.0)
+        self.clock.advance(300)
+        self.kpis.record_completion("produtoB", 5.0)
+
+        rollup = self.kpis.rollup()
+        self.assertEqual(rollup["last_hour"]["units"], 1)
+        self.assertAlmostEqual(rollup["last_hour"]["state_seconds"]["waiting_for_task"], 180 - 40)
+        self.assertEqual(rollup["hour"]["units"], 2)
+        self.assertEqual(rollup["shift"]["units"], 2)
+
+        # Into the next clock hour: the hour window starts over
+        self.clock.advance(2800 - 300 + 30)
+        rollup = self.kpis.rollup()
+        self.assertEqual(rollup["hour"]["units"], 0)
+        self.assertEqual(rollup["hour"]["state_seconds"], {"waiting_for_task": 30.0})
+        self.assertEqual(len(self.kpis.closed), 2)
+
+    def test_rule_failures_count_regressions_within_a_subtask(self):
+        for passed in (False, False, True, False, False, True, True, False):
+            self.kpis.record_rule("r1", passed, "s1")
+        self.kpis.record_rule("r2", False, "s1")
+        # A new subtask starts with its rules failing again
+        self.kpis.record_rule("r1", False, "s2")
+        self.assertEqual(self.kpis.rollup()["shift"]["rule_failures"], {"r1": 2})
+
+
+class TestBrainKpis(OfflineBrainTestCase):
+    overrides = {"kpis": {"enabled": True, "publish_interval": 60}}
+
+    def test_rollups_are_published_on_schedule(self):
+        self.run_for(150)
+
+        rollups = self.messages("management/kpis")
+        self.assertEqual(len(rollups), 2)
+        shift = rollups[-1]["windows"]["shift"]
+        self.assertAlmostEqual(sum(shift["state_seconds"].values()), 120.0, places=0)
+        self.assertIn("waiting_for_task", shift["state_seconds"])
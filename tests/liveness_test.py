@@ -0,0 +1,79 @@
+import json
+import unittest
+
+from core.liveness import LivenessWatchdog, RateMeter
+from core.state_machine import WorkstationStates
+from offline_brain import OfflineBrainTestCase
+from utils.clock import VirtualClock
+
+
+class TestRateMeter(unittest.TestCase):
+    def test_ewma_of_inter_arrival_time(self):
+        clock = VirtualClock()
+        meter = RateMeter(clock.monotonic, alpha=0.5)
+        self.assertEqual(meter.fps, 0.0)
+        for _ in range(20):
+            meter.mark()
+            clock.advance(0.1)
+        self.assertAlmostEqual(meter.fps, 10.0)
+        clock.advance(0.2)
+        meter.mark()  # one gap of 0.3 s
+        self.assertAlmostEqual(meter.interval, 0.2)
+
+
+class TestLivenessWatchdog(unittest.TestCase):
+    def test_flips_stale_and_back_once_each(self):
+        clock = VirtualClock()
+        changes = []
+        watchdog = LivenessWatchdog(clock.monotonic, lambda name, stale, status: changes.append((name, stale)))
+        hands = watchdog.add_stream("hands", 1.0)
+        watchdog.add_stream("candies", 5.0)
+
+        clock.advance(1.5)  # nothing heard since start
+        watchdog.check()
+        hands.mark()
+        watchdog.check()
+        clock.advance(0.5)
+        watchdog.check()
+        clock.advance(0.6)
+        watchdog.check()
+        watchdog.check()
+
+        self.assertEqual(changes, [("hands", True), ("hands", False), ("hands", True)])
+        self.assertEqual(watchdog.stale, {"hands"})
+        self.assertTrue(watchdog.rates()["hands"]["stale"])
+        self.assertFalse(watchdog.rates()["candies"]["stale"])
+
+
+class TestBrainLiveness(OfflineBrainTestCase):
+    overrides = {"liveness": {
+        "enabled": True, "check_interval": 0.5, "report_interval": 0,
+        "streams": {"hands": {"max_gap": 1.0}, "candies": {"max_gap": 2.0}}}}
+
+    def frames(self, hand_in_cell=True):
+        hands = {"handR_Wrist_x": 0.5, "handR_Wrist_y": 0.5} if hand_in_cell else {}
+        self.broker.publish("hands/position", json.dumps(hands))
+        self.broker.publish("objdet/results", "{}")
+
+    def test_stale_streams_are_degraded_and_hold_cleaning(self):
+        brain = self.brain
+        brain.state_machine.transition_to(WorkstationStates.CLEANING, brain.context)
+        self.frames(hand_in_cell=True)
+        brain.state.update("CombinationValid", True)
+        self.run_for(3.0)
+
+        data = brain.state.data
+        self.assertEqual(data["StaleStreams"], ["candies", "hands"])
+        self.assertFalse(data["handR_Present"])
+        self.assertIsNone(data["handR_GridCell"])
+        self.assertFalse(data["CombinationValid"])
+        # No hands and no candies, but only because nothing is reporting
+        self.assertEqual(brain.state_machine.current_state, WorkstationStates.CLEANING)
+
+        stale = [(e["stream"], e["stale"]) for e in self.messages() if e.get("type") == "stream_liveness"]
+        self.assertEqual(stale, [("hands", True), ("candies", True)])
+
+        self.frames(hand_in_cell=False)
+        self.run_for(0.6)
+        self.assertEqual(data["StaleStreams"], [])
+        self.assertEqual(brain.state_machine.current_state, WorkstationStates.WAITING_FOR_TASK)
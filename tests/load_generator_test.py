@@ -0,0 +1,49 @@
+import json
+import threading
+import time
+import unittest
+
+from io_handlers.fake_broker import FakeBroker
+from tools.load_generator import SaturationTest, detection_frames, find_saturation
+
+
+class TestQueuedBroker(unittest.TestCase):
+    def test_full_inbox_drops_messages(self):
+        broker = FakeBroker(queue_size=2)
+        release = threading.Event()
+        handled = []
+        client = broker.client_factory()
+        client.on_message = lambda c, userdata, msg: (release.wait(2.0), handled.append(msg.payload))
+        client.connect()
+        client.subscribe("objdet/results")
+
+        for i in range(5):
+            broker.publish("objdet/results", str(i))
+        release.set()
+        deadline = time.monotonic() + 2.0
+        while client.delivered + client.dropped < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        client.disconnect()
+        self.assertIn(client.dropped, (2, 3))
+        self.assertEqual(client.delivered, 5 - client.dropped)
+
+
+class TestSaturation(unittest.TestCase):
+    def test_low_rate_meets_the_slo(self):
+        payload = json.loads(detection_frames(3)[0]())
+        self.assertIn("timestamp", payload)
+        self.assertIn("yolo_2_score", payload)
+
+        test = SaturationTest(detections=3)
+        try:
+            test.start()
+            report = find_saturation(test, start_rate=20, factor=2, max_rate=40, step_seconds=0.3, slo_ms=1000)
+        finally:
+            test.stop()
+        self.assertEqual(len(report["steps"]), 2)
+        self.assertEqual(report["saturation_rate"], 40.0)
+        self.assertEqual(report["steps"][0]["dropped"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
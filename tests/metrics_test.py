@@ -0,0 +1,45 @@
+import unittest
+
+from utils.metrics import MetricsRegistry, MetricsReporter
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_render(self):
+        counter = self.registry.counter("msgs_total", "Messages", ["topic"])
+        counter.inc(topic="hands/position")
+        counter.inc(2, topic="hands/position")
+        text = self.registry.render()
+        self.assertIn("# TYPE msgs_total counter", text)
+        self.assertIn('msgs_total{topic="hands/position"} 3', text)
+
+    def test_registering_twice_returns_same_metric(self):
+        first = self.registry.counter("a_total", "A")
+        self.assertIs(first, self.registry.counter("a_total", "A"))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_count 3", text)
+
+    def test_gauge_function(self):
+        queue = [1, 2, 3]
+        self.registry.gauge("depth", "Depth").set_function(lambda: len(queue))
+        self.assertIn("depth 3", self.registry.render())
+
+    def test_reporter_includes_counter_values(self):
+        sent = []
+        self.registry.counter("c_total", "C").inc(4)
+        MetricsReporter(self.registry, sent.append).report()
+        self.assertEqual(sent[0]["values"]["c_total"], {"_": 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
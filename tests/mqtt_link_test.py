@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+import paho.mqtt.client as mqtt
+
+from io_handlers.mqtt_link import Backoff
+from io_handlers.publishers.base_publisher import BasePublisher
+from io_handlers.publishers.outbox import Outbox
+
+
+class FakeResult:
+    def __init__(self, rc):
+        self.rc = rc
+
+
+class FakeClient:
+    def __init__(self):
+        self.published = []
+        self.fail = False
+        self.on_connect = None
+        self.on_disconnect = None
+
+    def username_pw_set(self, username, password):
+        pass
+
+    def publish(self, topic, payload, qos=0):
+        if self.fail:
+            return FakeResult(mqtt.MQTT_ERR_QUEUE_SIZE)
+        self.published.append((topic, payload, qos))
+        return FakeResult(mqtt.MQTT_ERR_SUCCESS)
+
+    def disconnect(self):
+        pass
+
+
+class TestBackoff(unittest.TestCase):
+    def test_delays_grow_up_to_the_cap_and_reset(self):
+        backoff = Backoff(base=0.5, cap=4.0, rng=lambda: 1.0)
+        self.assertEqual([backoff.next() for _ in range(5)], [0.5, 1.0, 2.0, 4.0, 4.0])
+        backoff.reset()
+        self.assertEqual(backoff.next(), 0.5)
+
+        jittered = Backoff(base=0.5, cap=4.0)
+        for _ in range(20):
+            self.assertLessEqual(jittered.next(), 4.0)
+
+
+class TestOutbox(unittest.TestCase):
+    def test_spills_to_disk_and_drains_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "outbox.jsonl")
+            outbox = Outbox(max_messages=2, spill_path=path)
+            for i in range(5):
+                outbox.append("t", str(i))
+            self.assertEqual(len(outbox), 5)
+            self.assertEqual(outbox.spilled, 3)
+
+            drained = [outbox.pop()[1] for _ in range(3)]
+            outbox.append("t", "5")
+            drained += [outbox.pop()[1] for _ in range(3)]
+            self.assertEqual(drained, ["0", "1", "2", "3", "4", "5"])
+            self.assertIsNone(outbox.pop())
+            self.assertFalse(os.path.exists(path))
+
+    def test_torn_spill_line_is_dropped_and_later_spills_survive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "outbox.jsonl")
+            outbox = Outbox(max_messages=1, spill_path=path)
+            for i in range(3):
+                outbox.append("t", str(i))
+            outbox.close()
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('{"topic": "t", "pay')  # crash mid-write
+
+            restarted = Outbox(max_messages=1, spill_path=path)
+            self.assertEqual(len(restarted), 2)
+            restarted.append("t", "3")
+            drained = [restarted.pop()[1] for _ in range(3)]
+            self.assertEqual(drained, ["1", "2", "3"])
+            self.assertIsNone(restarted.pop())
+            self.assertFalse(os.path.exists(path))
+
+    def test_undecodable_spill_line_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "outbox.jsonl")
+            outbox = Outbox(max_messages=1, spill_path=path)
+            for i in range(3):
+                outbox.append("t", str(i))
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("not json\n")
+            outbox.append("t", "3")
+            self.assertEqual([outbox.pop()[1] for _ in range(3)], ["0", "1", "2"])
+            self.assertEqual(outbox.pop()[1], "3")
+            self.assertIsNone(outbox.pop())
+
+    def test_drops_oldest_without_spill(self):
+        outbox = Outbox(max_messages=2)
+        for i in range(3):
+            outbox.append("t", str(i))
+        self.assertEqual(outbox.dropped, 1)
+        self.assertEqual(outbox.pop()[1], "1")
+
+
+class TestPublisherOutbox(unittest.TestCase):
+    def test_offline_publishes_are_sent_in_order_on_connect(self):
+        publisher = BasePublisher(state=None, client_factory=FakeClient)
+        publisher.outbox = Outbox(max_messages=10)
+        publisher.publish("done", {"n": 1}, qos=1)
+        publisher.publish("done", {"n": 2})
+        self.assertEqual(publisher.client.published, [])
+
+        publisher.link._handle_connect(publisher.client, None, {}, 0)
+        publisher.publish("done", {"n": 3})
+        self.assertEqual(publisher.client.published, [
+            ("done", '{"n": 1}', 1), ("done", '{"n": 2}', 0), ("done", '{"n": 3}', 0)])
+        self.assertEqual(len(publisher.outbox), 0)
+
+    def test_failed_send_while_connected_is_retried_on_the_next_publish(self):
+        publisher = BasePublisher(state=None, client_factory=FakeClient)
+        publisher.outbox = Outbox(max_messages=10)
+        publisher.link._handle_connect(publisher.client, None, {}, 0)
+        publisher.client.fail = True
+        publisher.publish("done", {"n": 1})
+        self.assertEqual(len(publisher.outbox), 1)
+
+        # Still connected, so no on_connect drains the outbox: the next publish does
+        publisher.client.fail = False
+        publisher.publish("done", {"n": 2})
+        self.assertEqual(publisher.client.published, [("done", '{"n": 1}', 0), ("done", '{"n": 2}', 0)])
+        self.assertEqual(len(publisher.outbox), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
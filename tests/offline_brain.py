@@ -0,0 +1,40 @@
+import json
+import unittest
+
+from io_handlers.fake_broker import FakeBroker
+from tools.offline import start_offline_brain
+from utils.clock import VirtualClock
+from utils.config import CONFIG
+
+
+class OfflineBrainTestCase(unittest.TestCase):
+    """
+    A brain on a VirtualClock behind a FakeBroker, rebuilt for every test.
+    Subclasses set `overrides` (config sections merged over the offline
+    defaults) or override `brain_overrides()` when they depend on setUp state.
+    """
+
+    overrides = {}
+
+    def brain_overrides(self):
+        return self.overrides
+
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.broker = FakeBroker(clock=self.clock.time)
+        self.brain = start_offline_brain(self.broker, self.clock, self.brain_overrides())
+
+    def tearDown(self):
+        self.brain.shutdown()
+        CONFIG.reset()
+
+    def run_for(self, seconds, tick=None):
+        """Run the loop (brain.tick by default) for `seconds` of virtual time."""
+        scheduler = self.brain.scheduler
+        scheduler.call_later(seconds, scheduler.stop)
+        scheduler.run(tick or self.brain.tick, self.brain.state_machine.get_tick_interval)
+
+    def messages(self, topic=None):
+        """Decoded payloads the brain published, optionally only on `topic`."""
+        return [json.loads(payload) for t, message_topic, payload, qos in self.broker.published
+                if topic is None or message_topic == topic]
@@ -0,0 +1,70 @@
+import unittest
+
+from core.product_index import ProductIndex
+from core.state import WorkstationState
+from utils.config_compiler import compile_config
+
+PRODUCTS = {
+    "produtoA": (1, 3, 1),
+    "produtoB": (2, 4, 2),
+    "produtoG": (3, 3, 0),
+}
+
+
+class TestProductIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ProductIndex(("Blue", "Green", "Red"), PRODUCTS)
+
+    def test_exact_lookup(self):
+        self.assertEqual(self.index.lookup({"Blue": 3, "Green": 3}), "produtoG")
+        self.assertEqual(self.index.lookup({"Blue": 3, "Green": 3, "Red": 0}), "produtoG")
+        self.assertIsNone(self.index.lookup({"Blue": 3, "Green": 3, "Yellow": 1}))
+
+    def test_nearest_and_deficits(self):
+        match = self.index.identify({"Blue": 2, "Green": 4, "Red": 1}, expected={"Blue": 1, "Green": 3, "Red": 1})
+        self.assertEqual(match["product"], "produtoB")
+        self.assertFalse(match["exact"])
+        self.assertEqual(match["distance"], 1)
+        self.assertEqual(match["deficits"], {"Blue": -1, "Green": -1})
+        self.assertEqual(match["guidance"], "remove 1 Blue, remove 1 Green")
+
+    def test_unknown_colors_count_towards_distance(self):
+        match = self.index.identify({"Blue": 1, "Green": 3, "Red": 1, "Yellow": 2})
+        self.assertEqual((match["product"], match["distance"]), ("produtoA", 2))
+        self.assertEqual(match["guidance"], "remove 2 Yellow")
+
+
+class TestStateIdentification(unittest.TestCase):
+    def test_state_reports_identified_product(self):
+        state = WorkstationState()
+        state.product_index = ProductIndex.from_bundle(compile_config(cache_dir=None))
+        state.update("ExpectedConfig", {"Blue": 1, "Green": 3, "Red": 1})
+        state.update("DetectedCandies", {"Blue": 2, "Green": 2, "Red": 2})
+
+        self.assertFalse(state.data["CombinationValid"])
+        self.assertEqual(state.data["IdentifiedProduct"], "produtoF")
+        self.assertEqual(state.data["ProductMatch"]["guidance"], "add 1 Green, remove 1 Blue, remove 1 Red")
+
+    def test_repeated_frames_log_the_guidance_once(self):
+        state = WorkstationState()
+        state.product_index = ProductIndex.from_bundle(compile_config(cache_dir=None))
+        state.update("ExpectedConfig", {"Blue": 1, "Green": 3, "Red": 1})
+        with self.assertLogs("core.state", level="INFO") as logs:
+            for _ in range(5):
+                state.update("DetectedCandies", {"Blue": 2, "Green": 2, "Red": 2})
+        self.assertEqual(len([line for line in logs.output if "Tray looks like" in line]), 1)
+
+    def test_cleared_tray_is_identified_too(self):
+        state = WorkstationState()
+        state.product_index = ProductIndex.from_bundle(compile_config(cache_dir=None))
+        state.update("DetectedCandies", {"Blue": 1, "Green": 3, "Red": 1})
+        self.assertEqual(state.data["IdentifiedProduct"], "produtoA")
+
+        state.update("ExpectedConfig", {"Blue": 2, "Green": 4, "Red": 2})
+        state.update("DetectedCandies", {})
+        self.assertIsNone(state.data["IdentifiedProduct"])
+        self.assertEqual(state.data["ProductMatch"]["guidance"], "add 2 Blue, add 4 Green, add 2 Red")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+
+from io_handlers.fake_broker import FakeBroker
+from io_handlers.session_recorder import SessionRecorder, read_session, write_session
+from tools.replay import SessionReplay, compare_streams
+from utils.config import CONFIG
+
+
+def candies(*colors):
+    payload = {}
+    for i, color in enumerate(colors):
+        payload.update({f"yolo_{i}_class": color, f"yolo_{i}_x1": 400, f"yolo_{i}_y1": 300,
+                        f"yolo_{i}_x2": 420, f"yolo_{i}_y2": 320, f"yolo_{i}_score": 0.9})
+    return json.dumps(payload)
+
+
+class TestSessionRecorder(unittest.TestCase):
+    def test_round_trip_and_truncated_tail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "s.wbs")
+            recorder = SessionRecorder(path)
+            recorder.record("hands/position", b'{"a": 1}', t=10.0)
+            recorder.record("objdet/results", "{}", t=10.5)
+            recorder.close()
+            with open(path, "ab") as f:
+                f.write(b"\x00\x01")
+
+            self.assertEqual(list(read_session(path)), [
+                (10.0, "hands/position", b'{"a": 1}'), (10.5, "objdet/results", b"{}")])
+
+            # The next session cuts the torn record off instead of appending behind it
+            recorder = SessionRecorder(path)
+            recorder.record("objdet/results", b'{"b": 2}', t=20.0)
+            recorder.close()
+            self.assertEqual([message[0] for message in read_session(path)], [10.0, 10.5, 20.0])
+
+
+class TestFakeBroker(unittest.TestCase):
+    def test_delivers_to_matching_subscribers_and_records_publishes(self):
+        broker = FakeBroker(clock=lambda: 1.0)
+        received = []
+        subscriber = broker.client_factory()
+        subscriber.on_message = lambda client, userdata, msg: received.append((msg.topic, msg.payload))
+        subscriber.connect()
+        subscriber.subscribe("tasks/#")
+        publisher = broker.client_factory()
+        publisher.connect()
+
+        publisher.publish("tasks/publish", '{"n": 1}', qos=1)
+        broker.publish("hands/position", "{}")
+        self.assertEqual(received, [("tasks/publish", b'{"n": 1}')])
+        self.assertEqual(broker.take_published(), [(1.0, "tasks/publish", b'{"n": 1}', 1)])
+
+
+class TestSessionReplay(unittest.TestCase):
+    SESSION = [
+        (100.0, "tasks/publish", json.dumps({"tasks": {"produtoA": ["T2A"]}})),
+        (100.5, "objdet/results", candies("Blue", "Green")),
+        (101.0, "objdet/results", candies("Blue", "Green", "Green", "Green", "Red")),
+    ]
+
+    def replay(self):
+        replay = SessionReplay(self.SESSION, settle=1.0)
+        try:
+            return replay.run()
+        finally:
+            replay.close()
+
+    def tearDown(self):
+        CONFIG.reset()
+
+    def test_replay_is_deterministic_and_matches_its_golden(self):
+        first = self.replay()
+        topics = {topic for _, topic, _ in first}
+        self.assertIn("projector/control", topics)
+        self.assertIn("management/interface", topics)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            golden = os.path.join(tmp, "golden.wbs")
+            write_session(golden, first)
+            self.assertEqual(compare_streams(self.replay(), list(read_session(golden))), [])
+
+        changed = first[:-1] + [(0.0, "projector/control", b'{"clear": false}')]
+        self.assertEqual(len(compare_streams(changed, first)), 1)
+
+    def test_gaps_in_the_recording_trip_the_stream_watchdog(self):
+        def liveness_events(overrides=None):
+            replay = SessionReplay(self.SESSION, settle=3.0, overrides=overrides)
+            try:
+                published = replay.run()
+            finally:
+                replay.close()
+            events = [json.loads(payload) for _, topic, payload in published if topic == "management/interface"]
+            return [(e["stream"], e["stale"]) for e in events if e.get("type") == "stream_liveness"]
+
+        self.assertIn(("candies", True), liveness_events())
+        self.assertEqual(liveness_events({"liveness": {"enabled": False}}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
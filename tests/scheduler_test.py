@@ -0,0 +1,80 @@
+import unittest
+
+from core.scheduler import TickScheduler
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTickScheduler(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+        self.scheduler = TickScheduler(default_interval=0.1, clock=self.time.clock, sleep=self.time.sleep)
+
+    def run_ticks(self, count, work=0.0, get_interval=None):
+        starts = []
+
+        def tick():
+            starts.append(round(self.time.now, 6))
+            self.time.now += work
+            if len(starts) == count:
+                self.scheduler.stop()
+
+        self.scheduler.run(tick, get_interval)
+        return starts
+
+    def test_cadence_does_not_drift_with_tick_duration(self):
+        starts = self.run_ticks(5, work=0.03)
+        self.assertEqual(starts, [0.0, 0.1, 0.2, 0.3, 0.4])
+
+    def test_overrun_skips_missed_slots(self):
+        starts = self.run_ticks(3, work=0.25)
+        self.assertEqual(starts, [0.0, 0.3, 0.6])
+        self.assertEqual(self.scheduler.stats.overruns, 3)
+
+    def test_interval_is_taken_from_callback(self):
+        starts = self.run_ticks(3, get_interval=lambda: 0.05)
+        self.assertEqual(starts, [0.0, 0.05, 0.1])
+
+    def test_timers_fire_between_ticks(self):
+        fired = []
+        self.scheduler.call_later(0.15, lambda: fired.append(round(self.time.now, 6)))
+        cancelled = self.scheduler.call_later(0.15, lambda: fired.append("cancelled"))
+        cancelled.cancel()
+        self.run_ticks(3)
+        self.assertEqual(fired, [0.15])
+
+    def test_repeating_timer(self):
+        fired = []
+        self.scheduler.call_every(0.1, lambda: fired.append(round(self.time.now, 6)))
+        self.run_ticks(4)
+        self.assertEqual(fired, [0.1, 0.2, 0.3])
+
+    def test_repeating_timer_survives_a_failing_callback(self):
+        fired = []
+
+        def callback():
+            fired.append(round(self.time.now, 6))
+            if len(fired) == 2:
+                raise RuntimeError("boom")
+
+        self.scheduler.call_every(0.1, callback)
+        self.run_ticks(6)
+        self.assertEqual(fired, [0.1, 0.2, 0.3, 0.4, 0.5])
+
+    def test_repeating_timer_needs_a_positive_interval(self):
+        for interval in (0, -1.0):
+            with self.assertRaises(ValueError):
+                self.scheduler.call_every(interval, lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from core.scheduler import TickScheduler
+from tools.simulate import simulate
+from utils.clock import VirtualClock
+from utils.config import CONFIG
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_scheduler_runs_on_virtual_time(self):
+        clock = VirtualClock()
+        scheduler = TickScheduler(default_interval=0.5, clock=clock.monotonic, sleep=clock.sleep)
+        ticks = []
+        scheduler.call_later(3600, scheduler.stop)
+        scheduler.run(lambda: ticks.append(clock.monotonic()))
+        self.assertEqual(len(ticks), 7201)  # t = 0, 0.5, ... 3600
+        self.assertEqual(clock.time(), clock.epoch + 3600)
+
+
+class TestSimulation(unittest.TestCase):
+    SETTINGS = {"units": 6, "products": {"produtoA": 1, "produtoB": 1}, "seed": 3}
+
+    def tearDown(self):
+        CONFIG.reset()
+
+    def test_shift_completes_and_is_reproducible(self):
+        report = simulate(self.SETTINGS)
+        self.assertEqual(report["subtasks_completed"], 6)
+        self.assertGreater(report["virtual_seconds"], 6 * 15)
+        self.assertEqual(report["cleanings"], 6)
+        self.assertGreater(report["state_seconds"]["executing_task"], report["state_seconds"]["cleaning"])
+
+        again = simulate(self.SETTINGS)
+        for key in ("virtual_seconds", "subtask_seconds", "state_seconds"):
+            self.assertEqual(again[key], report[key])
+
+    def test_clean_shift_has_no_rule_failures(self):
+        report = simulate({**self.SETTINGS, "error_rate": 0})
+        self.assertEqual(report["subtasks_completed"], 6)
+        self.assertEqual(report["rule_failures"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
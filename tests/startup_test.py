@@ -0,0 +1,48 @@
+import time
+import unittest
+
+from io_handlers.publishers.base_publisher import BasePublisher
+from utils.startup import StartupReport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupReport(unittest.TestCase):
+    def test_phases_and_links_are_timed(self):
+        clock = FakeClock()
+        report = StartupReport(clock)
+        with report.phase("config"):
+            clock.now += 0.02
+        with report.phase("connections"):
+            clock.now += 0.005
+        clock.now += 0.3
+        report.links_settled(["hand_consumer"])
+
+        summary = report.as_dict()
+        self.assertEqual(summary["phases_ms"], {"config": 20.0, "connections": 5.0})
+        self.assertEqual(summary["ready_ms"], 25.0)
+        self.assertEqual(summary["links_up_ms"], 325.0)
+        self.assertEqual(summary["links_down"], ["hand_consumer"])
+
+
+class TestNonBlockingConnect(unittest.TestCase):
+    def test_start_returns_without_a_broker(self):
+        publisher = BasePublisher(state=None)
+        publisher.link.broker_conf = {"broker_ip": "127.0.0.1", "broker_port": 1}
+        started = time.perf_counter()
+        publisher.start()
+        try:
+            self.assertLess(time.perf_counter() - started, 0.5)
+            self.assertFalse(publisher.connected.is_set())
+        finally:
+            publisher.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import unittest
+from collections import deque
+
+from core.state import WorkstationState
+from core.state_sync import StateSync
+from offline_brain import OfflineBrainTestCase
+
+
+class TestStateSync(unittest.TestCase):
+    def setUp(self):
+        self.state = WorkstationState()
+        self.published = []
+        self.sync = StateSync(self.state, self.published.append, history=3, exclude=["handL_data", "handR_data"])
+
+    def test_deltas_carry_only_changed_keys_and_coalesce(self):
+        first = self.sync.flush()
+        self.assertEqual(first["version"], 1)
+        self.assertNotIn("handL_data", first["changes"])
+        self.assertEqual(first["changes"]["Defects"], [])
+        self.assertIsNone(self.sync.flush())
+
+        self.state.update("handR_GridCell", (1, 2))
+        self.state.update("handR_GridCell", (2, 2))
+        self.state.add_defect("torn wrapper")
+        delta = self.sync.flush()
+        self.assertEqual(delta, {"base": 1, "version": 2, "removed": [],
+                                 "changes": {"handR_GridCell": [2, 2], "Defects": ["torn wrapper"]}})
+        self.assertEqual(len(self.published), 2)
+
+    def test_since_merges_kept_deltas_and_falls_back_to_snapshot(self):
+        self.sync.flush()
+        for cell in ((0, 0), (0, 1), (0, 2)):
+            self.state.update("handR_GridCell", cell)
+            self.sync.flush()
+        self.state.data["Extra"] = 1
+        self.sync.flush()
+        del self.state.data["Extra"]
+        self.state.update("CombinationValid", True)
+        self.sync.flush()  # version 6; versions 4-6 are kept
+
+        self.assertEqual(self.sync.since(3), {"base": 3, "version": 6, "removed": ["Extra"],
+                                              "changes": {"handR_GridCell": [0, 2], "CombinationValid": True}})
+        self.assertEqual(self.sync.since(6)["changes"], {})
+        self.assertIsNone(self.sync.since(2))
+        self.assertIsNone(self.sync.since(7))
+
+        snapshot = self.sync.snapshot()
+        self.assertEqual(snapshot["version"], 6)
+        self.assertEqual(snapshot["state"]["handR_GridCell"], [0, 2])
+        self.assertNotIn("Extra", snapshot["state"])
+        json.dumps(snapshot)
+
+    def test_plain_values_are_json_ready(self):
+        self.state.data["Defects"] = deque(["a"], maxlen=2)
+        self.sync.exclude = set()
+        state = self.sync.snapshot()["state"]
+        self.assertEqual(state["Defects"], ["a"])
+        self.assertIsInstance(state["handL_data"], dict)
+
+
+class TestBrainStateSync(OfflineBrainTestCase):
+    overrides = {"state_sync": {"enabled": True, "interval": 0.5}, "liveness": {"enabled": False}}
+
+    def test_interval_deltas_and_get_state_requests(self):
+        self.run_for(1.0, tick=lambda: None)
+        self.broker.publish("objdet/results", json.dumps({
+            "yolo_0_class": "red", "yolo_0_x1": 400, "yolo_0_y1": 300,
+            "yolo_0_x2": 420, "yolo_0_y2": 320, "yolo_0_score": 0.9}))
+        self.run_for(1.0, tick=lambda: None)
+
+        deltas = self.messages("brain/state/delta")
+        self.assertEqual([delta["version"] for delta in deltas], [1, 2])
+        self.assertEqual(deltas[1]["changes"]["DetectedCandies"], {"Red": 1})
+
+        self.broker.publish("brain/commands", json.dumps({"command": "get_state", "since": 1, "request_id": "a"}))
+        self.broker.publish("brain/commands", json.dumps({"command": "get_state", "request_id": "b"}))
+        self.broker.publish("brain/commands", json.dumps(
+            {"command": "get_state", "since": 0, "request_id": "c", "reply_to": "brain/state/response/dash-1"}))
+        self.broker.publish("brain/commands", json.dumps(
+            {"command": "get_state", "since": 2, "request_id": "d", "reply_to": "tasks/publish"}))
+        self.assertEqual(self.messages("brain/state/response"), [])  # answered on the loop thread
+        self.brain.run_commands()
+        responses = self.messages("brain/state/response")
+        self.assertEqual([(r["type"], r["request_id"], r["version"]) for r in responses],
+                         [("state_delta", "a", 2), ("state_snapshot", "b", 2), ("state_delta", "d", 2)])
+        self.assertEqual(responses[1]["state"]["DetectedCandies"], {"Red": 1})
+        self.assertEqual(self.messages("brain/state/response/dash-1")[0]["changes"]["DetectedCandies"], {"Red": 1})
+        self.assertEqual(self.messages("tasks/publish"), [])
@@ -0,0 +1,129 @@
+import json
+import unittest
+
+from core.subtask_queue import ChangeoverSubtaskQueue, SubtaskInstance, as_sort_number
+from core.task_manager import TaskManager
+from offline_brain import OfflineBrainTestCase
+
+TASKS = {
+    "Task1": {"subtasks": {"T1A": {}, "T1B": {}}},
+    "Task2": {"dependencies": ["Task1"], "subtasks": {"T2A": {}}},
+}
+
+CONFIG_A = {"Blue": 1, "Green": 3, "Red": 1}
+CONFIG_B = {"Blue": 2, "Green": 4, "Red": 2}
+
+
+def entry(seq, task_id, subtask_id, config=None, priority=0, deadline=None):
+    return SubtaskInstance(f"test-{seq}", seq, task_id, subtask_id, None, config, priority, deadline)
+
+
+def drain(queue):
+    order = []
+    while len(queue):
+        order.append(queue.pop().seq)
+    return order
+
+
+class TestChangeoverSubtaskQueue(unittest.TestCase):
+    def test_groups_identical_configs(self):
+        queue = ChangeoverSubtaskQueue(TASKS)
+        queue.push(entry(0, "Task1", "T1A"))
+        queue.push(entry(1, "Task1", "T1B"))
+        queue.push(entry(2, "Task1", "T1A"))
+        queue.push(entry(3, "Task1", "T1B"))
+        self.assertEqual(drain(queue), [0, 2, 1, 3])
+
+    def test_dependencies_are_respected(self):
+        queue = ChangeoverSubtaskQueue(TASKS)
+        queue.push(entry(0, "Task2", "T2A", CONFIG_A))
+        queue.push(entry(1, "Task1", "T1A"))
+        self.assertEqual(drain(queue), [1, 0])
+
+    def test_priority_beats_grouping(self):
+        queue = ChangeoverSubtaskQueue(TASKS)
+        queue.push(entry(0, "Task1", "T1A"))
+        queue.push(entry(1, "Task1", "T1A"))
+        self.assertEqual(queue.pop().seq, 0)
+        queue.push(entry(2, "Task1", "T1B", priority=5))
+        self.assertEqual(drain(queue), [2, 1])
+
+    def test_deadline_orders_equal_priority(self):
+        queue = ChangeoverSubtaskQueue(TASKS)
+        queue.push(entry(0, "Task2", "T2A", CONFIG_A, deadline=200))
+        queue.push(entry(1, "Task2", "T2A", CONFIG_B, deadline=100))
+        self.assertEqual(drain(queue), [1, 0])
+
+    def test_head_is_pinned_until_popped(self):
+        queue = ChangeoverSubtaskQueue(TASKS)
+        queue.push(entry(0, "Task1", "T1A"))
+        self.assertEqual(queue.peek().seq, 0)
+        queue.push(entry(1, "Task1", "T1B", priority=9))
+        self.assertEqual(queue.peek().seq, 0)
+        self.assertEqual([e.seq for e in queue], [0, 1])
+
+
+class TestTaskManagerScheduling(unittest.TestCase):
+    def test_cleaning_skipped_for_same_group(self):
+        manager = TaskManager(TASKS, {"mode": "changeover", "skip_cleaning_same_config": True})
+        manager.enqueue_subtask("Task2", "T2A", "produtoA", CONFIG_A)
+        manager.enqueue_subtask("Task2", "T2A", "produtoB", CONFIG_B)
+        manager.enqueue_subtask("Task2", "T2A", "produtoA", CONFIG_A)
+
+        manager.get_current_subtask()
+        manager.advance()
+        self.assertFalse(manager.needs_cleaning())
+        manager.get_current_subtask()
+        manager.advance()
+        self.assertTrue(manager.needs_cleaning())
+        self.assertEqual(manager.get_stats()["changeovers"], 0)
+
+    def test_same_subtask_keeps_per_product_config(self):
+        manager = TaskManager(TASKS)
+        manager.enqueue_subtask("Task2", "T2A", "produtoA", CONFIG_A)
+        manager.enqueue_subtask("Task2", "T2A", "produtoB", CONFIG_B)
+        first, second = list(manager.subtask_queue)
+        self.assertNotEqual(first.instance_id, second.instance_id)
+        self.assertEqual(manager.get_current_instance().config, CONFIG_A)
+        manager.get_current_subtask()
+        manager.advance()
+        manager.clear()
+        self.assertEqual(manager.get_current_instance().config, CONFIG_B)
+        self.assertEqual(manager.last_completed.product, "produtoA")
+
+    def test_enqueue_many_skips_invalid_subtasks(self):
+        manager = TaskManager(TASKS)
+        enqueued = manager.enqueue_many([
+            {"task_id": "Task1", "subtask_id": "T1A"},
+            {"task_id": "Task1", "subtask_id": "T9Z"},
+            {"task_id": "Task2", "subtask_id": "T2A", "product": "produtoA", "config": CONFIG_A},
+        ])
+        self.assertEqual(enqueued, 2)
+        self.assertEqual([e.seq for e in manager.subtask_queue], [0, 1])
+        self.assertEqual(manager.total_enqueued, 2)
+
+
+class TestAssignmentSortValues(OfflineBrainTestCase):
+    overrides = {"scheduling": {"mode": "changeover"}}
+
+    def test_as_sort_number(self):
+        self.assertEqual(as_sort_number("2.5"), 2.5)
+        self.assertEqual(as_sort_number(3), 3)
+        self.assertIsNone(as_sort_number(None))
+        for bad in ("high", True, [1], float("nan")):
+            with self.assertRaises(ValueError):
+                as_sort_number(bad)
+
+    def test_bad_priority_drops_only_that_item(self):
+        self.broker.publish("tasks/publish", json.dumps({
+            "tasks": {"produtoA": ["T2A"], "produtoB": ["T2A"]},
+            "priority": {"produtoA": "high", "produtoB": "2"},
+            "deadline": 100,
+        }))
+        entries = list(self.brain.task_manager.subtask_queue)
+        self.assertEqual([(e.product, e.priority, e.deadline) for e in entries], [("produtoB", 2.0, 100)])
+        self.assertEqual(self.brain.task_manager.get_current_instance().product, "produtoB")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+
+from core.subtask_queue import SubtaskInstance
+from core.task_journal import TaskJournal
+from core.task_manager import TaskManager
+
+TASKS = {
+    "Task1": {"subtasks": {"T1A": {"task_name": "Wrap Red Candies"}}},
+    "Task2": {"dependencies": ["Task1"], "subtasks": {"T2A": {"task_name": "Assemble Candy Boxes"}}},
+}
+
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_manager(self, snapshot_every=1000, mode="fifo"):
+        return TaskManager(TASKS, {"mode": mode}, journal=TaskJournal(self.path, snapshot_every=snapshot_every))
+
+    def test_queue_and_timing_survive_restart(self):
+        manager = self.make_manager()
+        manager.enqueue_subtask("Task1", "T1A", "produtoA", {"Red": 1})
+        manager.enqueue_subtask("Task2", "T2A", "produtoB", {"Blue": 2})
+        manager.enqueue_subtask("Task2", "T2A", "produtoC", {"Red": 3})
+        manager.get_current_subtask()
+        manager.advance()
+        manager.clear()
+        manager.get_current_subtask()
+        start_time = manager.current_subtask_start_time
+        manager.journal.close()
+
+        recovered = self.make_manager()
+        self.assertEqual([e.product for e in recovered.subtask_queue], ["produtoB", "produtoC"])
+        self.assertEqual(recovered.get_stats()["completed"], 1)
+        self.assertEqual(recovered.get_stats()["total"], 3)
+        self.assertEqual(recovered.current_subtask_start_time, start_time)
+
+        recovered.enqueue_subtask("Task1", "T1A", "produtoD", {"Red": 1})
+        self.assertEqual(list(recovered.subtask_queue)[-1].seq, 3)
+
+    def test_compaction_keeps_state(self):
+        manager = self.make_manager(snapshot_every=3)
+        for product in ("produtoA", "produtoB", "produtoC", "produtoD"):
+            manager.enqueue_subtask("Task2", "T2A", product, {"Blue": 1})
+        manager.get_current_subtask()
+        manager.advance()
+        manager.journal.close()
+        self.assertTrue(os.path.exists(self.path + ".snapshot"))
+
+        recovered = self.make_manager()
+        self.assertEqual([e.product for e in recovered.subtask_queue], ["produtoB", "produtoC", "produtoD"])
+        self.assertEqual(recovered.completed_count, 1)
+
+    def test_appends_after_a_torn_tail_survive_the_next_restart(self):
+        manager = self.make_manager()
+        manager.enqueue_subtask("Task2", "T2A", "produtoA", {"Blue": 1})
+        manager.journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"e":"enqueue","seq":1,"task_i')  # crash mid-write
+
+        recovered = self.make_manager()
+        recovered.enqueue_subtask("Task2", "T2A", "produtoB", {"Blue": 1})
+        recovered.enqueue_subtask("Task2", "T2A", "produtoC", {"Blue": 1})
+        recovered.journal.close()
+
+        again = self.make_manager()
+        self.assertEqual([e.product for e in again.subtask_queue], ["produtoA", "produtoB", "produtoC"])
+        self.assertEqual(again.get_stats()["total"], 3)
+
+    def test_failed_batch_is_neither_queued_nor_journaled(self):
+        manager = self.make_manager(mode="changeover")
+        with self.assertRaises(ValueError):
+            manager.enqueue_many([
+                {"task_id": "Task1", "subtask_id": "T1A", "product": "produtoA"},
+                {"task_id": "Task1", "subtask_id": "T1A", "product": "produtoB", "priority": "high"},
+            ])
+        self.assertEqual(len(manager.subtask_queue), 0)
+        manager.enqueue_subtask("Task1", "T1A", "produtoC")
+        self.assertEqual([e.product for e in manager.subtask_queue], ["produtoC"])
+        manager.journal.close()
+
+        recovered = self.make_manager(mode="changeover")
+        self.assertEqual([e.product for e in recovered.subtask_queue], ["produtoC"])
+
+    def test_recovery_skips_entries_the_queue_rejects(self):
+        journal = TaskJournal(self.path)
+        journal.record_enqueue([
+            SubtaskInstance("old-0", 0, "Task1", "T1A", "produtoA", priority="high"),
+            SubtaskInstance("old-1", 1, "Task1", "T1A", "produtoB", priority=1),
+        ])
+        journal.close()
+
+        recovered = self.make_manager(mode="changeover")
+        self.assertEqual([e.product for e in recovered.subtask_queue], ["produtoB"])
+        self.assertEqual(recovered.get_stats()["total"], 1)
+        recovered.journal.close()
+        self.assertEqual([e.product for e in self.make_manager(mode="changeover").subtask_queue], ["produtoB"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from core.evaluator import RuleEvaluator
+from core.state import WorkstationState
+from core.temporal import TemporalPredicates, rewrite_condition, temporal_terms
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTemporalRules(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.state = WorkstationState()
+        self.temporal = TemporalPredicates(self.state, clock=self.clock)
+        self.evaluator = RuleEvaluator(temporal=self.temporal)
+
+    def at(self, t, key, value):
+        self.clock.now = t
+        self.state.update(key, value)
+
+    def evaluate(self, condition, t):
+        self.clock.now = t
+        return self.evaluator.evaluate_rule(condition, self.state)
+
+    def test_rewrite(self):
+        self.assertEqual(rewrite_condition("stable(CombinationValid, 1.5s) and absent(handL_Present, 200ms)"),
+                         "stable('CombinationValid', 1.5) and absent('handL_Present', 0.2)")
+        self.assertEqual(temporal_terms("count_changes(DetectedCandies, 5s) < 3"),
+                         [("count_changes", "DetectedCandies", 5.0)])
+
+    def test_stable(self):
+        condition = "stable(CombinationValid, 1.5s)"
+        self.temporal.register([condition])
+        self.at(1.0, "CombinationValid", True)
+        self.assertFalse(self.evaluate(condition, 2.0))
+        self.assertTrue(self.evaluate(condition, 2.5))
+        self.at(2.6, "CombinationValid", False)
+        self.at(2.7, "CombinationValid", True)
+        self.assertFalse(self.evaluate(condition, 3.0))
+
+    def test_count_changes_expire(self):
+        condition = "count_changes(DetectedCandies, 5s) < 3"
+        self.temporal.register([condition])
+        for t, count in [(0, 1), (1, 2), (2, 2), (3, 3)]:
+            self.at(t, "DetectedCandies", {"Red": count})
+        self.assertFalse(self.evaluate(condition, 3.5))
+        self.assertTrue(self.evaluate(condition, 5.5))
+
+    def test_absent(self):
+        condition = "absent(handL_Present, 2s) and CombinationValid == False"
+        self.temporal.register([condition])
+        self.at(0.0, "handL_Present", True)
+        self.at(1.0, "handL_Present", False)
+        self.assertFalse(self.evaluate(condition, 2.5))
+        self.assertTrue(self.evaluate(condition, 3.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
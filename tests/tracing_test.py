@@ -0,0 +1,48 @@
+import unittest
+
+from utils.tracing import Tracer, Trace, producer_timestamp
+
+
+class TestTracer(unittest.TestCase):
+    def test_producer_timestamp_accepts_milliseconds(self):
+        self.assertEqual(producer_timestamp({"timestamp": 1700000000123}), 1700000000.123)
+        self.assertEqual(producer_timestamp({"timestamp": 1700000000.5}), 1700000000.5)
+        self.assertIsNone(producer_timestamp({"handL_Wrist_x": 0.3}))
+
+    def test_trace_completes_on_decision_and_publish(self):
+        tracer = Tracer(slow_threshold=0.0)
+        trace = Trace("hands/position", received_at=1.0, received_wall=100.0)
+        trace.producer_ts = 99.9
+        trace.state_updated_at = 1.001
+
+        tracer.begin_tick(trace)
+        tracer.mark_decision("waiting_confirmation->task_completed")
+        tracer.mark_publish("projector/control")
+        tracer.end_tick()
+
+        hops = trace.hops()
+        self.assertEqual(set(hops), {"network", "handler", "queue", "decision", "publish", "total", "end_to_end"})
+        self.assertAlmostEqual(hops["handler"], 0.001)
+        self.assertEqual(trace.published_topic, "projector/control")
+
+    def test_publish_without_decision_is_not_attributed(self):
+        tracer = Tracer()
+        trace = Trace("objdet/results")
+        tracer.begin_tick(trace)
+        tracer.mark_publish("projector/control")
+        tracer.end_tick()
+        self.assertIsNone(trace.published_at)
+
+    def test_trace_is_picked_up_once(self):
+        tracer = Tracer()
+        trace = Trace("hands/position")
+        tracer.begin_tick(trace)
+        tracer.end_tick()
+        tracer.begin_tick(trace)
+        tracer.mark_decision("idle->waiting_for_task")
+        tracer.end_tick()
+        self.assertIsNone(trace.decided_at)
+
+
+if __name__ == "__main__":
+    unittest.main()